@@ -1,11 +0,0 @@
-# Alembic initialization file
-
-generic_message = """
-Alembic version control migration for Concert Ticket System.
-
-Usage:
-  alembic upgrade head       - Apply all migrations
-  alembic downgrade -1       - Rollback last migration
-  alembic current            - Show current revision
-  alembic history            - Show migration history
-"""
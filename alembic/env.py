@@ -5,6 +5,8 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 import os
 from app.settings import settings
+from app.models.base import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
 
 # This is the Alembic Config object
 config = context.config
@@ -16,10 +18,8 @@ if config.config_file_name is not None:
 # Set the sqlalchemy.url value from settings
 config.set_main_option("sqlalchemy.url", settings.database_url)
 
-# Add your model's MetaData object here
-# from app.models import Base
-# target_metadata = Base.metadata
-target_metadata = None
+# Model metadata, so `alembic check` / autogenerate can detect drift
+target_metadata = Base.metadata
 
 
 def run_migrations_offline() -> None:
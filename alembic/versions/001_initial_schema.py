@@ -4,6 +4,11 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+revision = "001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
 # Define enum types
 def upgrade():
     """Create all tables with new schema."""
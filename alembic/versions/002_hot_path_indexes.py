@@ -0,0 +1,61 @@
+"""Composite indexes for hot queries; drop redundant single-column indexes
+
+- tickets (concert_id, status): per-concert listings and sold/verified counts;
+  replaces ix_tickets_concert_id, which is its leftmost prefix.
+- scans (ticket_id, scan_type): scan history and attendance counts; replaces
+  ix_scans_ticket_id.
+- transfers (to_user_id, status): pending transfers of the current user.
+- ix_tickets_ticket_number, ix_users_username, ix_users_email duplicated the
+  indexes behind their unique constraints; ix_<table>_id duplicated the
+  primary keys.
+
+On PostgreSQL indexes are built and dropped CONCURRENTLY so ticket sales
+and scans are not blocked while the migration runs.
+"""
+
+from alembic import op
+
+revision = "002_hot_path_indexes"
+down_revision = "001_initial_schema"
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = [
+    ("ix_tickets_concert_id_status", "tickets", ["concert_id", "status"]),
+    ("ix_scans_ticket_id_scan_type", "scans", ["ticket_id", "scan_type"]),
+    ("ix_transfers_to_user_id_status", "transfers", ["to_user_id", "status"]),
+    ("ix_transfers_from_user_id", "transfers", ["from_user_id"]),
+]
+
+REDUNDANT_INDEXES = [
+    ("ix_tickets_concert_id", "tickets", ["concert_id"]),
+    ("ix_scans_ticket_id", "scans", ["ticket_id"]),
+    ("ix_tickets_ticket_number", "tickets", ["ticket_number"]),
+    ("ix_users_username", "users", ["username"]),
+    ("ix_users_email", "users", ["email"]),
+    ("ix_users_id", "users", ["id"]),
+    ("ix_concerts_id", "concerts", ["id"]),
+    ("ix_tickets_id", "tickets", ["id"]),
+    ("ix_scans_id", "scans", ["id"]),
+    ("ix_refunds_id", "refunds", ["id"]),
+    ("ix_transfers_id", "transfers", ["id"]),
+]
+
+
+def upgrade():
+    """Create the composite indexes first, then drop the ones they replace."""
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade():
+    """Restore the single-column indexes and drop the composite ones."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        for name, table, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
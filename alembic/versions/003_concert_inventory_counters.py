@@ -0,0 +1,48 @@
+"""Inventory counters on concerts
+
+Adds tickets_total, tickets_sold_confirmed, tickets_verified and
+tickets_transferred, backfilled from tickets. Afterwards the application
+keeps them up to date; `python -m app.utils.inventory` rebuilds them.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003_concert_inventory_counters"
+down_revision = "002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    "tickets_total": None,
+    "tickets_sold_confirmed": ("sold", "sold_confirmed"),
+    "tickets_verified": ("verified",),
+    "tickets_transferred": ("transferred",),
+}
+
+
+def upgrade():
+    """Add the counter columns and backfill them with one pass per counter."""
+    for column in COUNTERS:
+        op.add_column(
+            "concerts",
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    for column, statuses in COUNTERS.items():
+        status_filter = ""
+        if statuses:
+            values = ", ".join(f"'{status}'" for status in statuses)
+            # Compare as lowercase text: the enum type may not contain every
+            # value, and Enum(TicketStatus) stores member names ('SOLD_CONFIRMED')
+            status_filter = f" AND LOWER(CAST(tickets.status AS VARCHAR)) IN ({values})"
+        op.execute(
+            f"UPDATE concerts SET {column} = ("
+            f"SELECT COUNT(*) FROM tickets WHERE tickets.concert_id = concerts.id{status_filter})"
+        )
+
+
+def downgrade():
+    """Drop the counter columns."""
+    for column in reversed(list(COUNTERS)):
+        op.drop_column("concerts", column)
@@ -0,0 +1,27 @@
+"""Per-concert ticket number sequence
+
+Adds concerts.ticket_number_seq, the last sequence handed out by the
+"sequence" ticket number generator. Existing tickets keep their 12-character
+numbers; sequence codes are 9+ characters, so the two never collide.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004_ticket_number_sequence"
+down_revision = "003_concert_inventory_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add the sequence column, starting every concert at 0."""
+    op.add_column(
+        "concerts",
+        sa.Column("ticket_number_seq", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    """Drop the sequence column."""
+    op.drop_column("concerts", "ticket_number_seq")
@@ -0,0 +1,44 @@
+"""Per-minute scan rollup
+
+Creates scan_minute_counts and backfills it from scans. Afterwards the
+application upserts into it with every scan; `python -m
+app.utils.scan_rollup` rebuilds it.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005_scan_minute_counts"
+down_revision = "004_ticket_number_sequence"
+branch_labels = None
+depends_on = None
+
+MINUTE_SQL = {
+    "postgresql": "CAST(FLOOR(EXTRACT(EPOCH FROM scans.scanned_at) / 60) AS INTEGER)",
+    "sqlite": "CAST(strftime('%s', scans.scanned_at) AS INTEGER) / 60",
+}
+
+
+def upgrade():
+    """Create the rollup table and fill it with one INSERT ... SELECT."""
+    op.create_table(
+        "scan_minute_counts",
+        sa.Column("concert_id", sa.Integer(), sa.ForeignKey("concerts.id"), primary_key=True),
+        sa.Column("minute", sa.Integer(), primary_key=True),
+        sa.Column("location", sa.String(), primary_key=True),
+        sa.Column("scan_type", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    minute = MINUTE_SQL[op.get_context().dialect.name]
+    op.execute(
+        "INSERT INTO scan_minute_counts (concert_id, minute, location, scan_type, count) "
+        f"SELECT tickets.concert_id, {minute}, COALESCE(scans.location, ''), "
+        "LOWER(CAST(scans.scan_type AS VARCHAR)), COUNT(*) "
+        "FROM scans JOIN tickets ON scans.ticket_id = tickets.id "
+        "GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade():
+    """Drop the rollup table."""
+    op.drop_table("scan_minute_counts")
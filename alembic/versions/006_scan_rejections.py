@@ -0,0 +1,36 @@
+"""Refused scan attempts
+
+Creates scan_rejections, which create_scan fills when it refuses a scan
+(a verify user rescanning a verified ticket). The scanner throughput
+report derives reject rates from it.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006_scan_rejections"
+down_revision = "005_scan_minute_counts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the table and its per-concert, per-user index."""
+    op.create_table(
+        "scan_rejections",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("concert_id", sa.Integer(), sa.ForeignKey("concerts.id")),
+        sa.Column("ticket_id", sa.Integer(), nullable=True),
+        sa.Column("scanned_by_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("rejected_at", sa.DateTime()),
+        sa.Column("reason", sa.String()),
+    )
+    op.create_index(
+        "ix_scan_rejections_concert_id_user_id", "scan_rejections", ["concert_id", "scanned_by_user_id"]
+    )
+
+
+def downgrade():
+    """Drop the table."""
+    op.drop_index("ix_scan_rejections_concert_id_user_id", table_name="scan_rejections")
+    op.drop_table("scan_rejections")
@@ -0,0 +1,40 @@
+"""Change log and sync watermarks
+
+Creates change_events, the append-only log that scans and ticket status
+changes write in their own transaction, and sync_watermarks, the last
+event central applied from each edge node (see app.utils.replication).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007_change_events"
+down_revision = "006_scan_rejections"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create both tables."""
+    op.create_table(
+        "change_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("node", sa.String(), nullable=False),
+        sa.Column("concert_id", sa.Integer(), nullable=True),
+        sa.Column("ticket_number", sa.String(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("node", sa.String(), primary_key=True),
+        sa.Column("last_event_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade():
+    """Drop both tables."""
+    op.drop_table("sync_watermarks")
+    op.drop_table("change_events")
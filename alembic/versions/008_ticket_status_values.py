@@ -0,0 +1,29 @@
+"""Ticket status values for sales and transfers
+
+Adds SOLD (mark-sold, and back from a transfer) and TRANSFERRED (transfer
+pending) to the PostgreSQL ticketstatus type. Other databases store the
+status as text and need nothing.
+"""
+
+from alembic import op
+
+revision = "008_ticket_status_values"
+down_revision = "007_change_events"
+branch_labels = None
+depends_on = None
+
+NEW_VALUES = ("SOLD", "TRANSFERRED")
+
+
+def upgrade():
+    """Add the enum values (stored as member names, like the existing ones)."""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    # ALTER TYPE ... ADD VALUE cannot be used in the same transaction as the new value
+    with op.get_context().autocommit_block():
+        for value in NEW_VALUES:
+            op.execute(f"ALTER TYPE ticketstatus ADD VALUE IF NOT EXISTS '{value}'")
+
+
+def downgrade():
+    """Nothing to do: PostgreSQL cannot drop a value from an enum type."""
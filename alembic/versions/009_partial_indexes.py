@@ -0,0 +1,40 @@
+"""Partial index for pending transfers
+
+Replaces transfers (to_user_id, status) with transfers (to_user_id) WHERE
+status = 'PENDING'. The pending-transfers list is the only query on
+to_user_id, and pending transfers are a small, short-lived fraction of the
+table, so the partial index stays small as accepted and rejected
+transfers accumulate.
+
+On PostgreSQL indexes are built and dropped CONCURRENTLY, as in 002.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009_partial_indexes"
+down_revision = "008_ticket_status_values"
+branch_labels = None
+depends_on = None
+
+PENDING = sa.text("status = 'PENDING'")
+
+
+def upgrade():
+    """Create the partial index, then drop the composite one it replaces."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transfers_pending_to_user_id", "transfers", ["to_user_id"], unique=False,
+            postgresql_where=PENDING, sqlite_where=PENDING, postgresql_concurrently=True,
+        )
+        op.drop_index("ix_transfers_to_user_id_status", table_name="transfers", postgresql_concurrently=True)
+
+
+def downgrade():
+    """Restore the composite index and drop the partial one."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transfers_to_user_id_status", "transfers", ["to_user_id", "status"], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_transfers_pending_to_user_id", table_name="transfers", postgresql_concurrently=True)
@@ -1,23 +1,54 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.settings import settings
+from app.utils.edge import install_pragmas, is_edge
+from app.utils.metrics import instrument_engine, timed_pool
+from app.utils.read_routing import db_read_routing_total, use_replica
+
+
+def _create_engine(url: str, **kwargs):
+    edge = is_edge(url)
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        # Use NullPool for serverless/neon; edge nodes keep their SQLite
+        # connections, so the page cache and mmap outlive a request
+        poolclass=timed_pool(AsyncAdaptedQueuePool if edge else NullPool),
+        **kwargs
+    )
+    instrument_engine(engine)
+    if edge:
+        install_pragmas(engine, settings.edge_sqlite_pragmas)
+    return engine
+
+
+def _session_factory(bind, **info):
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+        info=info,
+    )
+
+
+def create_read_session(url: str):
+    """Session factory for a read replica; Postgres replicas also get read-only transactions."""
+    options = {"postgresql_readonly": True} if url.startswith("postgresql") else {}
+    return _session_factory(_create_engine(url, execution_options=options), replica=True)
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    future=True,
-    poolclass=NullPool,  # Use NullPool for serverless/neon
-)
+engine = _create_engine(settings.database_url)
 
 # Create async session factory
-async_session = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-)
+async_session = _session_factory(engine)
+
+# Optional read replica (settings.read_database_url); None routes every read to the primary
+read_session = create_read_session(settings.read_database_url) if settings.read_database_url else None
 
 
 async def get_db():
@@ -27,3 +58,19 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only handlers.
+
+    Uses the replica for safe methods unless the caller wrote within the
+    read-your-writes window (see app.utils.read_routing); otherwise the primary.
+    """
+    replica = read_session is not None and use_replica(request.scope)
+    db_read_routing_total.inc(target="replica" if replica else "primary")
+    async with (read_session if replica else async_session)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
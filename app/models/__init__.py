@@ -1,7 +1,9 @@
 from .concert import Concert
 from .ticket import Ticket
-from .scan import Scan
+from .scan import Scan, ScanRejection
 from .user import User
 from .transfer import Transfer
+from .scan_rollup import ScanMinuteCount
+from .change_event import ChangeEvent, SyncWatermark
 
-__all__ = ["Concert", "Ticket", "Scan", "User", "Transfer"]
+__all__ = ["Concert", "Ticket", "Scan", "ScanRejection", "User", "Transfer", "ScanMinuteCount", "ChangeEvent", "SyncWatermark"]
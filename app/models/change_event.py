@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+from app.models.base import Base
+
+
+class ChangeEvent(Base):
+    """
+    Append-only change log (outbox), written in the same transaction as the change.
+
+    `id` orders the log and is the replication watermark (see
+    app.utils.replication). Rows carry natural keys (ticket number, username)
+    in `payload`, so they mean the same thing on another database.
+    """
+    __tablename__ = "change_events"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String, nullable=False)  # e.g. "scan.created", "ticket.status_changed"
+    # Node that wrote the row (settings.node_name); events replicated from an
+    # edge are rewritten by central with the edge in payload["origin"]
+    node = Column(String, nullable=False)
+    concert_id = Column(Integer, nullable=True)  # no FK: events outlive deleted rows
+    ticket_number = Column(String, nullable=True)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SyncWatermark(Base):
+    """Last change event id applied from each edge node."""
+    __tablename__ = "sync_watermarks"
+
+    node = Column(String, primary_key=True)
+    last_event_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
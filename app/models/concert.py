@@ -7,11 +7,20 @@ from app.models.base import Base
 class Concert(Base):
     __tablename__ = "concerts"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, index=True)
     date = Column(DateTime)
     venue = Column(String)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Inventory counters, maintained in the same transaction as ticket writes
+    # (see app.utils.inventory); `python -m app.utils.inventory` rebuilds them
+    tickets_total = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_sold_confirmed = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_verified = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_transferred = Column(Integer, nullable=False, default=0, server_default="0")
+    # Last ticket sequence handed out (app.utils.ticket_numbers); never decremented
+    ticket_number_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
     tickets = relationship("Ticket", back_populates="concert", cascade="all, delete-orphan")
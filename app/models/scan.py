@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Enum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Enum, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import enum
@@ -12,9 +12,13 @@ class ScanType(str, enum.Enum):
 
 class Scan(Base):
     __tablename__ = "scans"
+    __table_args__ = (
+        # Scan history per ticket and attendance checks by scan type
+        Index("ix_scans_ticket_id_scan_type", "ticket_id", "scan_type"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    ticket_id = Column(Integer, ForeignKey("tickets.id"), index=True)
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"))
     scan_type = Column(Enum(ScanType))
     scanned_at = Column(DateTime, default=datetime.utcnow)
     scanned_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # User who performed scan
@@ -23,3 +27,18 @@ class Scan(Base):
 
     ticket = relationship("Ticket", back_populates="scans")
     scanned_by_user = relationship("User", back_populates="scans")
+
+
+class ScanRejection(Base):
+    """A scan attempt that was refused (e.g. re-verifying a verified ticket); kept for throughput reports."""
+    __tablename__ = "scan_rejections"
+    __table_args__ = (
+        Index("ix_scan_rejections_concert_id_user_id", "concert_id", "scanned_by_user_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    concert_id = Column(Integer, ForeignKey("concerts.id"))
+    ticket_id = Column(Integer, nullable=True)  # no FK: the row outlives deleted tickets
+    scanned_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    rejected_at = Column(DateTime, default=datetime.utcnow)
+    reason = Column(String)
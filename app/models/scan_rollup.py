@@ -0,0 +1,18 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from app.models.base import Base
+
+
+class ScanMinuteCount(Base):
+    """
+    Scans per concert, minute, location and scan type.
+
+    Maintained alongside every scan insert (see app.utils.scan_rollup), so
+    timelines read a few hundred rows instead of the raw scans.
+    """
+    __tablename__ = "scan_minute_counts"
+
+    concert_id = Column(Integer, ForeignKey("concerts.id"), primary_key=True)
+    minute = Column(Integer, primary_key=True)  # minutes since the Unix epoch (UTC)
+    location = Column(String, primary_key=True, default="")  # "" when the scan had none
+    scan_type = Column(String, primary_key=True)  # ScanType value
+    count = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import enum
@@ -7,6 +7,8 @@ import enum
 
 class TicketStatus(str, enum.Enum):
     CREATED = "created"              # Initial state
+    SOLD = "sold"                    # Sold by an admin (mark-sold) or back from a transfer
+    TRANSFERRED = "transferred"      # Transfer to another user pending
     SOLD_CONFIRMED = "sold_confirmed"  # Seller scanned (Stage 1)
     VERIFIED = "verified"             # Venue scanned and valid (Stage 2)
     DUPLICATE = "duplicate"           # Attempted duplicate scan detected
@@ -14,10 +16,14 @@ class TicketStatus(str, enum.Enum):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Per-concert listings and status counts; also serves concert_id-only lookups
+        Index("ix_tickets_concert_id_status", "concert_id", "status"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    concert_id = Column(Integer, ForeignKey("concerts.id"), index=True)
-    ticket_number = Column(String, unique=True, index=True)
+    id = Column(Integer, primary_key=True)
+    concert_id = Column(Integer, ForeignKey("concerts.id"))
+    ticket_number = Column(String, unique=True)  # unique constraint doubles as the lookup index
     qr_code_data = Column(String)  # Encoded QR data (unique identifier)
     status = Column(Enum(TicketStatus), default=TicketStatus.CREATED)
     buyer_name = Column(String, nullable=True)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index, bindparam, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 import enum
@@ -14,11 +14,19 @@ class TransferStatus(str, enum.Enum):
 
 class Transfer(Base):
     __tablename__ = "transfers"
+    __table_args__ = (
+        # Pending transfers for the current user; partial, so accepted and
+        # rejected transfers (nearly all of them) are not in the index
+        Index(
+            "ix_transfers_pending_to_user_id", "to_user_id",
+            postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     ticket_id = Column(Integer, ForeignKey("tickets.id"), index=True)
     from_user_id = Column(Integer, ForeignKey("users.id"), index=True)
-    to_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    to_user_id = Column(Integer, ForeignKey("users.id"))
     status = Column(Enum(TransferStatus), default=TransferStatus.PENDING)
     notes = Column(Text, nullable=True)
     initiated_at = Column(DateTime, default=datetime.utcnow)
@@ -29,3 +37,14 @@ class Transfer(Base):
     ticket = relationship("Ticket")
     from_user = relationship("User", foreign_keys=[from_user_id], viewonly=True)
     to_user = relationship("User", foreign_keys=[to_user_id], viewonly=True)
+
+
+def is_pending():
+    """
+    `status = 'PENDING'` with the value inlined rather than bound, so the
+    planner can match ix_transfers_pending_to_user_id (PostgreSQL's generic
+    plans for prepared statements cannot match a partial index on a parameter).
+    """
+    return Transfer.status == bindparam(
+        "pending_status", TransferStatus.PENDING, type_=Transfer.status.type, literal_execute=True
+    )
@@ -3,11 +3,17 @@ from .concerts import router as concert_router
 from .tickets import router as ticket_router
 from .scans import router as scan_router
 from .transfers import router as transfer_router
+from .metrics import router as metrics_router
+from .sync import router as sync_router
+from .events import router as event_router
 
 __all__ = [
     "auth_router",
     "concert_router",
     "ticket_router",
     "scan_router",
-    "transfer_router"
+    "transfer_router",
+    "metrics_router",
+    "sync_router",
+    "event_router"
 ]
@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
 from app.utils.auth import get_password_hash, verify_password, create_access_token, decode_token
+from app.utils.user_cache import get_user_cached, invalidate_user
 from app.settings import settings
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
@@ -48,6 +49,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    invalidate_user(db_user.username)
     
     return db_user
 
@@ -117,8 +119,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    result = await db.execute(select(User).filter(User.username == username))
-    user = result.scalars().first()
+    user = await get_user_cached(db, username)
     
     if not user:
         raise HTTPException(
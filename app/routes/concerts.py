@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.concert import Concert
-from app.schemas.concert import ConcertCreate, ConcertResponse
+from app.models.scan import ScanRejection
+from app.models.scan_rollup import ScanMinuteCount
+from app.schemas.concert import ConcertCreate, ConcertInventory, ConcertResponse
 from app.routes.auth import get_admin_user
+from app.utils.change_log import record_concert_deleted
+from app.utils.concert_cache import get_concert_cached, invalidate_concert, list_concerts_cached
+from app.utils.export import EXPORT_FORMATS, EXPORT_INCLUDES, export_statement, stream_export
+from app.utils.single_flight import coalesce
+from app.utils.ticket_cache import invalidate_ticket
 
 router = APIRouter(prefix="/api/concerts", tags=["concerts"])
 
@@ -21,6 +31,7 @@ async def create_concert(
     db.add(db_concert)
     await db.commit()
     await db.refresh(db_concert)
+    invalidate_concert(db_concert.id)
     return db_concert
 
 
@@ -45,24 +56,91 @@ async def update_concert(
     
     await db.commit()
     await db.refresh(concert)
+    invalidate_concert(concert_id)
     return concert
 
 
 @router.get("/{concert_id}", response_model=ConcertResponse)
 async def get_concert(concert_id: int, db: AsyncSession = Depends(get_db)):
     """Get concert by ID."""
-    result = await db.execute(select(Concert).filter(Concert.id == concert_id))
-    concert = result.scalars().first()
+    concert = await get_concert_cached(db, concert_id)
     if not concert:
         raise HTTPException(status_code=404, detail="Concert not found")
     return concert
 
 
+@router.get("/{concert_id}/inventory", response_model=ConcertInventory)
+async def get_concert_inventory(concert_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Ticket counts for a concert, read from its maintained counters (not cached)."""
+    result = await db.execute(
+        select(
+            Concert.tickets_total,
+            Concert.tickets_sold_confirmed,
+            Concert.tickets_verified,
+            Concert.tickets_transferred,
+        ).filter(Concert.id == concert_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Concert not found")
+    sold = row.tickets_sold_confirmed + row.tickets_verified + row.tickets_transferred
+    return ConcertInventory(
+        concert_id=concert_id,
+        total=row.tickets_total,
+        sold_confirmed=row.tickets_sold_confirmed,
+        verified=row.tickets_verified,
+        transferred=row.tickets_transferred,
+        sold=sold,
+        available=row.tickets_total - sold,
+    )
+
+
+@router.get("/{concert_id}/export")
+async def export_concert(
+    concert_id: int,
+    format: str = Query("csv", description="csv or ndjson"),
+    include: Optional[str] = Query(None, description="Comma-separated extras; currently only 'scans'"),
+    current_user = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream every ticket of a concert (and optionally its scans) as CSV or NDJSON (admin only).
+
+    Rows are read through a server-side cursor and written out in batches,
+    so memory use does not grow with the number of tickets.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    includes = {item.strip() for item in include.split(",") if item.strip()} if include else set()
+    unknown = includes - set(EXPORT_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported include '{', '.join(sorted(unknown))}'. Use: {', '.join(EXPORT_INCLUDES)}"
+        )
+
+    concert = await get_concert_cached(db, concert_id)
+    if not concert:
+        raise HTTPException(status_code=404, detail="Concert not found")
+
+    include_scans = "scans" in includes
+    # The session stays open until the response has been sent
+    result = await db.stream(export_statement(concert_id, include_scans))
+    return StreamingResponse(
+        stream_export(result, format, include_scans),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename=concert-{concert_id}-export.{format}"}
+    )
+
+
 @router.get("/")
+@coalesce()
 async def list_concerts(db: AsyncSession = Depends(get_db)):
     """List all concerts."""
-    result = await db.execute(select(Concert))
-    return result.scalars().all()
+    return await list_concerts_cached(db)
 
 
 @router.delete("/{concert_id}")
@@ -77,8 +155,16 @@ async def delete_concert(
     if not concert:
         raise HTTPException(status_code=404, detail="Concert not found")
     
-    # Delete cascade will remove tickets automatically via foreign key
+    # Delete cascade will remove tickets automatically via foreign key; the
+    # rollup and rejections have no relationship on Concert, so their rows go explicitly
+    record_concert_deleted(db, concert, current_user.username)
+    await db.execute(delete(ScanMinuteCount).where(ScanMinuteCount.concert_id == concert_id))
+    await db.execute(delete(ScanRejection).where(ScanRejection.concert_id == concert_id))
     await db.delete(concert)
     await db.commit()
+    invalidate_concert(concert_id)
+    # The cascade removed its tickets: drop them from the status cache and the
+    # QR ETag number map (one message for all; concert deletes are rare)
+    invalidate_ticket()
     
     return {"message": f"Concert '{concert.name}' deleted successfully", "concert_id": concert_id}
@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database import get_read_db
+from app.models.change_event import ChangeEvent
+from app.models.user import User
+from app.schemas.event import EventFeed
+from app.routes.auth import get_admin_user
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+@router.get("", response_model=EventFeed)
+async def list_events(
+    after: int = Query(0, ge=0, description="Return events with a greater id (the previous page's next_after)"),
+    limit: int = Query(500, ge=1, le=5000),
+    type: Optional[List[str]] = Query(None, description="Only these event types"),
+    concert_id: Optional[int] = None,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Change feed (admin only): events in id order, one page at a time.
+    Start at after=0 and pass next_after back until has_more is false;
+    storing next_after lets a consumer resume where it stopped.
+    """
+    query = select(ChangeEvent).filter(ChangeEvent.id > after)
+    if type:
+        query = query.filter(ChangeEvent.type.in_(type))
+    if concert_id is not None:
+        query = query.filter(ChangeEvent.concert_id == concert_id)
+    result = await db.execute(query.order_by(ChangeEvent.id).limit(limit + 1))
+    events = list(result.scalars())
+    has_more = len(events) > limit
+    events = events[:limit]
+    return EventFeed(
+        events=events,
+        next_after=events[-1].id if events else after,
+        has_more=has_more,
+    )
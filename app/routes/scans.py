@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import distinct, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
+from typing import Optional
 
-from app.database import get_db
-from app.models.scan import Scan, ScanType
+from app.database import get_db, get_read_db
+from app.models.scan import Scan, ScanRejection, ScanType
 from app.models.ticket import Ticket, TicketStatus
 from app.models.user import User
-from app.schemas.scan import ScanCreate, ScanResponse
-from app.routes.auth import get_current_user, get_scanner_user
+from app.schemas.scan import ScanCreate, ScannerReport, ScanResponse, ScanTimeline, TimelinePoint
+from app.routes.auth import get_admin_user, get_current_user, get_scanner_user
+from app.utils import inventory
+from app.utils.change_log import record_scan_created, record_status_changed
+from app.utils.concert_cache import get_concert_cached
+from app.utils.scan_rollup import TIMELINE_BUCKETS, TIMELINE_GROUPINGS, record_scan, timeline
+from app.utils.scanner_report import DEFAULT_IDLE_MINUTES, get_scanner_report
+from app.utils.single_flight import coalesce
+from app.utils.ticket_cache import invalidate_ticket
 
 router = APIRouter(prefix="/api/scans", tags=["scans"])
 
@@ -24,16 +33,26 @@ async def create_scan(
     Verification users (verify*) can only scan once per ticket.
     Sales users (sales*) can scan multiple times.
     """
-    result = await db.execute(select(Ticket).filter(Ticket.id == scan.ticket_id))
+    # Row lock: concurrent scans of one ticket must not both count the transition
+    result = await db.execute(select(Ticket).filter(Ticket.id == scan.ticket_id).with_for_update())
     ticket = result.scalars().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    old_status = ticket.status
     
     # Check if current user is a verification user
     is_verify_user = current_user.username.startswith('verify')
     
     # Verification users cannot rescan already-verified tickets
     if is_verify_user and ticket.status == TicketStatus.VERIFIED:
+        # Kept for the scanner throughput report's reject rate
+        db.add(ScanRejection(
+            concert_id=ticket.concert_id,
+            ticket_id=ticket.id,
+            scanned_by_user_id=current_user.id,
+            reason="already_verified",
+        ))
+        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ticket already verified - cannot rescan"
@@ -43,6 +62,7 @@ async def create_scan(
     db_scan = Scan(
         ticket_id=scan.ticket_id,
         scan_type=scan.scan_type,
+        scanned_at=datetime.utcnow(),
         scanned_by_user_id=current_user.id,
         location=scan.location,
         notes=scan.notes
@@ -54,7 +74,7 @@ async def create_scan(
         # Verify users mark ticket as VERIFIED (immutable afterwards)
         ticket.status = TicketStatus.VERIFIED
         ticket.verified_by_user_id = current_user.id
-        ticket.verified_at = datetime.utcnow()
+        ticket.verified_at = db_scan.scanned_at
     else:
         # Sales users use scan_type to update status
         if scan.scan_type == ScanType.SALE_CONFIRMATION:
@@ -65,13 +85,19 @@ async def create_scan(
             ticket.status = TicketStatus.VERIFIED
     
     ticket.updated_at = datetime.utcnow()
+    await inventory.record_status_change(db, ticket.concert_id, old_status, ticket.status)
+    await record_scan(db, ticket.concert_id, db_scan.scanned_at, scan.location, scan.scan_type)
+    # Change log (replication, event feed), committed with the scan
+    record_scan_created(db, db_scan, ticket, current_user.username)
+    record_status_changed(db, ticket, old_status, current_user.username, db_scan.scanned_at)
     await db.commit()
-    await db.refresh(db_scan)
+    invalidate_ticket(ticket.id)
+    # Every column was set client-side (id from the INSERT), so no refresh is needed
     return db_scan
 
 
 @router.get("/ticket/{ticket_id}")
-async def get_ticket_scans(ticket_id: int, db: AsyncSession = Depends(get_db)):
+async def get_ticket_scans(ticket_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get all scans for a specific ticket."""
     result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id))
     ticket = result.scalars().first()
@@ -84,31 +110,76 @@ async def get_ticket_scans(ticket_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/concert/{concert_id}/attendance")
-async def get_concert_attendance(concert_id: int, db: AsyncSession = Depends(get_db)):
+@coalesce("concert_id")
+async def get_concert_attendance(concert_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get attendance statistics for a concert."""
-    # Get all scans for tickets belonging to this concert
+    # Count in SQL: both queries are answered from the composite indexes
+    # (tickets.concert_id/status, scans.ticket_id/scan_type) without table reads
     result = await db.execute(
-        select(Scan).join(Ticket).filter(
+        select(func.count(distinct(Scan.ticket_id))).join(Ticket).filter(
             (Ticket.concert_id == concert_id) &
             (Scan.scan_type == ScanType.ATTENDANCE_VERIFY)
         )
     )
-    attendance_scans = result.scalars().all()
+    total_attended = result.scalar()
     
-    attended_tickets = set(scan.ticket_id for scan in attendance_scans)
-    
-    # Get all sold tickets for this concert
     result = await db.execute(
-        select(Ticket).filter(
+        select(func.count()).select_from(Ticket).filter(
             (Ticket.concert_id == concert_id) &
             (Ticket.status.in_([TicketStatus.SOLD_CONFIRMED, TicketStatus.VERIFIED]))
         )
     )
-    sold_tickets = result.scalars().all()
+    total_sold = result.scalar()
     
     return {
         "concert_id": concert_id,
-        "total_sold": len(sold_tickets),
-        "total_attended": len(attended_tickets),
-        "attendance_rate": f"{len(attended_tickets) / len(sold_tickets) * 100:.1f}%" if sold_tickets else "0%"
+        "total_sold": total_sold,
+        "total_attended": total_attended,
+        "attendance_rate": f"{total_attended / total_sold * 100:.1f}%" if total_sold else "0%"
     }
+
+
+@router.get("/concert/{concert_id}/timeline", response_model=ScanTimeline)
+async def get_concert_timeline(
+    concert_id: int,
+    bucket: str = Query("1m", description="Bucket width: 1m, 5m, 15m or 1h"),
+    by: Optional[str] = Query(None, description="Split by location or scan_type"),
+    scan_type: Optional[str] = Query(None, description="Only count this scan type"),
+    start: Optional[datetime] = Query(None, description="First bucket (UTC, inclusive)"),
+    end: Optional[datetime] = Query(None, description="Last bucket (UTC, exclusive)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Scans per time bucket for a concert, read from the per-minute rollup."""
+    if bucket not in TIMELINE_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"bucket must be one of {', '.join(TIMELINE_BUCKETS)}"
+        )
+    if by is not None and by not in TIMELINE_GROUPINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"by must be one of {', '.join(TIMELINE_GROUPINGS)}"
+        )
+    if not await get_concert_cached(db, concert_id):
+        raise HTTPException(status_code=404, detail="Concert not found")
+
+    points = await timeline(db, concert_id, bucket, by, scan_type, start, end)
+    return ScanTimeline(
+        concert_id=concert_id,
+        bucket=bucket,
+        by=by,
+        points=[TimelinePoint(start=bucket_start, key=key, count=count) for bucket_start, key, count in points],
+    )
+
+
+@router.get("/concert/{concert_id}/scanners", response_model=ScannerReport)
+async def get_scanner_throughput(
+    concert_id: int,
+    idle_minutes: float = Query(DEFAULT_IDLE_MINUTES, gt=0, le=240, description="Gap that ends an active window"),
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Per-scanner throughput for a concert (admin only); cached for a few seconds."""
+    if not await get_concert_cached(db, concert_id):
+        raise HTTPException(status_code=404, detail="Concert not found")
+    return await get_scanner_report(db, concert_id, idle_minutes)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.sync import ChangeBatch, SyncResult, SyncWatermarkResponse
+from app.routes.auth import get_admin_user
+from app.settings import settings
+from app.utils.replication import apply_changes, get_watermark
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("/watermark/{node}", response_model=SyncWatermarkResponse)
+async def get_sync_watermark(
+    node: str,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Last change event applied from an edge node (admin only); pushes resume after it."""
+    return SyncWatermarkResponse(node=node, watermark=await get_watermark(db, node))
+
+
+@router.post("/changes", response_model=SyncResult)
+async def receive_changes(
+    batch: ChangeBatch,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply a batch of change events pushed by an edge node (admin only).
+    Idempotent: events up to the node's watermark are ignored.
+    """
+    if batch.node == settings.node_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A node cannot replicate to itself"
+        )
+    events = [event.model_dump(mode="json") for event in batch.events]
+    return SyncResult(node=batch.node, **await apply_changes(db, batch.node, events))
@@ -1,22 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
-from uuid import uuid4
 from pydantic import BaseModel
-from typing import List
-from io import BytesIO
-import zipfile
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.ticket import Ticket, TicketStatus
-from app.models.concert import Concert
 from app.models.user import User
 from app.schemas.ticket import TicketCreate, TicketResponse, TicketMarkSold
-from app.utils.qr_generator import generate_qr_code
+from app.utils.qr_generator import (
+    MAX_SCALE,
+    MIN_SCALE,
+    QR_FORMATS,
+    QR_PAYLOAD_VERSION,
+    build_qr_payload,
+    build_qr_zip,
+    generate_qr_code,
+    negotiate_qr_format,
+    render_batch_qr_codes,
+    render_ticket_qr,
+)
+from app.utils import random_qr
+from app.utils.concert_cache import get_concert_cached
+from app.utils import inventory
+from app.utils.change_log import record_sold, record_status_changed, record_ticket_deleted
+from app.utils.bulk_sales import BulkSaleReport, InvalidUpload, bulk_mark_sold
+from app.utils.ticket_numbers import (
+    InvalidTicketNumber,
+    allocate_ticket_numbers,
+    get_ticket_number_generator,
+)
+from app.utils.print_sheets import (
+    MAX_DPI,
+    MAX_PER_PAGE,
+    MIN_DPI,
+    MIN_PER_PAGE,
+    SHEET_FORMATS,
+    get_print_pool,
+    stream_sheets,
+)
+from app.utils.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    cached_ticket_number,
+    etag_matches,
+    make_etag,
+    not_modified,
+    qr_etag,
+    remember_ticket_number,
+)
+from app.utils.ticket_cache import get_ticket_status, invalidate_ticket
 from app.routes.auth import get_current_user, get_admin_user, get_scanner_user
-from fastapi.responses import StreamingResponse
-import base64
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import csv
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
@@ -41,23 +79,22 @@ async def create_ticket(
     Create a new ticket for a concert.
     QR code is generated automatically (admin only).
     """
-    result = await db.execute(select(Concert).filter(Concert.id == concert_id))
-    concert = result.scalars().first()
+    concert = await get_concert_cached(db, concert_id)
     if not concert:
         raise HTTPException(status_code=404, detail="Concert not found")
 
-    ticket_number = str(uuid4())[:12].upper()
-    
-    # Generate QR code (image base64 + payload)
-    qr_base64, qr_data = generate_qr_code(0, ticket_number, concert_id)
-    
+    ticket_number, = await allocate_ticket_numbers(db, concert_id)
+
     db_ticket = Ticket(
         concert_id=concert_id,
         ticket_number=ticket_number,
-        qr_code_data=qr_base64,
         status=TicketStatus.CREATED
     )
     db.add(db_ticket)
+    # The QR payload carries the ticket id, so encode it once the INSERT assigned one
+    await db.flush()
+    db_ticket.qr_code_data, _ = generate_qr_code(db_ticket.id, ticket_number, concert_id)
+    await inventory.record_created(db, concert_id)
     await db.commit()
     await db.refresh(db_ticket)
     
@@ -80,28 +117,35 @@ async def create_batch_tickets(
             detail="Quantity must be between 1 and 5000"
         )
     
-    result = await db.execute(select(Concert).filter(Concert.id == concert_id))
-    concert = result.scalars().first()
+    concert = await get_concert_cached(db, concert_id)
     if not concert:
         raise HTTPException(status_code=404, detail="Concert not found")
 
     tickets = []
     ticket_numbers = []
     
-    for i in range(request.quantity):
-        ticket_number = str(uuid4())[:12].upper()
-        qr_base64, qr_data = generate_qr_code(i, ticket_number, concert_id)
-        
+    # Numbers are unique by construction, so one bad draw can't abort the batch
+    allocated = await allocate_ticket_numbers(db, concert_id, request.quantity)
+    for ticket_number in allocated:
         db_ticket = Ticket(
             concert_id=concert_id,
             ticket_number=ticket_number,
-            qr_code_data=qr_base64,
             status=TicketStatus.CREATED
         )
         tickets.append(db_ticket)
         ticket_numbers.append(ticket_number)
     
     db.add_all(tickets)
+    # QR payloads carry the ticket ids: INSERT first (one executemany), then
+    # encode; the images go out as one executemany UPDATE at commit
+    await db.flush()
+    # QR encoding for thousands of tickets is CPU bound; run it in the print worker pool
+    images = await asyncio.get_running_loop().run_in_executor(
+        get_print_pool(), render_batch_qr_codes, [(ticket.id, ticket.ticket_number) for ticket in tickets], concert_id
+    )
+    for db_ticket, qr_base64 in zip(tickets, images):
+        db_ticket.qr_code_data = qr_base64
+    await inventory.record_created(db, concert_id, len(tickets))
     await db.commit()
     
     return BatchCreateResponse(
@@ -112,13 +156,31 @@ async def create_batch_tickets(
 
 
 @router.get("/{ticket_id}/qr-code")
-async def get_qr_code(ticket_id: int, db: AsyncSession = Depends(get_db)):
+async def get_qr_code(
+    ticket_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
     """Get QR code image as base64."""
+    if if_none_match:
+        # Status is part of the body, so revalidate against the cached
+        # (ticket_number, status) pair instead of loading the base64 image
+        entry = await get_ticket_status(db, ticket_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        ticket_number, ticket_status = entry
+        etag = make_etag("qr-code", ticket_number, QR_PAYLOAD_VERSION, ticket_status)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+
     result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id))
     ticket = result.scalars().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
+    response.headers["ETag"] = make_etag("qr-code", ticket.ticket_number, QR_PAYLOAD_VERSION, ticket.status)
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
     return {
         "ticket_id": ticket.id,
         "ticket_number": ticket.ticket_number,
@@ -128,11 +190,14 @@ async def get_qr_code(ticket_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/dev/random-qr")
-async def dev_random_qr(size: int = 29, module_size: int = 10, border: int = 4):
+async def dev_random_qr(
+    size: int = Query(29, ge=random_qr.MIN_SIZE, le=random_qr.MAX_SIZE),
+    module_size: int = Query(10, ge=random_qr.MIN_MODULE_SIZE, le=random_qr.MAX_MODULE_SIZE),
+    border: int = Query(4, ge=random_qr.MIN_BORDER, le=random_qr.MAX_BORDER),
+):
     """Development endpoint: return a random QR-like PNG image."""
-    from app.utils.random_qr import get_png_bytes
-    png = get_png_bytes(size=size, module_size=module_size, border=border)
-    return StreamingResponse(BytesIO(png), media_type="image/png")
+    png = random_qr.get_png_bytes(size=size, module_size=module_size, border=border)
+    return Response(content=png, media_type="image/png")
 
 
 @router.post("/{ticket_id}/mark-sold", response_model=TicketResponse)
@@ -143,11 +208,12 @@ async def mark_ticket_sold(
     db: AsyncSession = Depends(get_db)
 ):
     """Mark a ticket as sold and add buyer information (admin only)."""
-    result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id))
+    result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id).with_for_update())
     ticket = result.scalars().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
+    old_status = ticket.status
     ticket.status = TicketStatus.SOLD
     ticket.buyer_name = data.buyer_name
     ticket.buyer_email = data.buyer_email
@@ -155,12 +221,34 @@ async def mark_ticket_sold(
     ticket.sold_at = datetime.utcnow()
     ticket.original_buyer_id = current_user.id
     ticket.current_holder_id = current_user.id
+    await inventory.record_status_change(db, ticket.concert_id, old_status, ticket.status)
+    record_status_changed(db, ticket, old_status, current_user.username, ticket.sold_at)
+    record_sold(db, ticket, current_user.username)
     
     await db.commit()
+    invalidate_ticket(ticket_id)
     await db.refresh(ticket)
     return ticket
 
 
+@router.post("/mark-sold/upload", response_model=BulkSaleReport)
+async def mark_tickets_sold_from_csv(
+    file: UploadFile = File(..., description="CSV with ticket_number, buyer_name, buyer_email, price (cents)"),
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Mark many tickets sold from a CSV upload (admin only).
+
+    Rows are validated and applied in chunks (one lookup and one bulk UPDATE
+    per chunk); bad rows are skipped and listed in the report by line number.
+    """
+    try:
+        return await bulk_mark_sold(db, file.file, current_user.id, seller_name=current_user.username)
+    except (InvalidUpload, UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid CSV upload: {exc}")
+
+
 @router.get("/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_db)):
     """Get ticket details by ID."""
@@ -172,7 +260,7 @@ async def get_ticket(ticket_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/concert/{concert_id}")
-async def list_concert_tickets(concert_id: int, db: AsyncSession = Depends(get_db)):
+async def list_concert_tickets(concert_id: int, db: AsyncSession = Depends(get_read_db)):
     """List all tickets for a concert."""
     result = await db.execute(select(Ticket).filter(Ticket.concert_id == concert_id))
     return result.scalars().all()
@@ -180,7 +268,15 @@ async def list_concert_tickets(concert_id: int, db: AsyncSession = Depends(get_d
 
 @router.get("/number/{ticket_number}", response_model=TicketResponse)
 async def get_ticket_by_number(ticket_number: str, db: AsyncSession = Depends(get_db)):
-    """Get ticket by ticket number (useful for QR scanner)."""
+    """
+    Get ticket by ticket number (useful for QR scanner). Typed numbers may be
+    lowercase, hyphenated or use O/I/L for 0/1/1; a mistyped sequence number
+    is a 400 without a database lookup.
+    """
+    try:
+        ticket_number = get_ticket_number_generator().canonical(ticket_number)
+    except InvalidTicketNumber as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     result = await db.execute(select(Ticket).filter(Ticket.ticket_number == ticket_number))
     ticket = result.scalars().first()
     if not ticket:
@@ -188,16 +284,37 @@ async def get_ticket_by_number(ticket_number: str, db: AsyncSession = Depends(ge
     return ticket
 
 
+def _resolve_qr_format(format: Optional[str], accept: Optional[str]) -> str:
+    """Query parameter wins over the Accept header; unknown formats are a 400."""
+    if format is None:
+        return negotiate_qr_format(accept)
+    format = format.lower()
+    if format not in QR_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(QR_FORMATS)}"
+        )
+    return format
+
+
+def _render_ticket_qr(ticket: Ticket, fmt: str, scale: Optional[int]) -> tuple[bytes, str]:
+    """Return (bytes, media_type) for a ticket's QR in the requested format."""
+    return render_ticket_qr(ticket.id, ticket.ticket_number, ticket.concert_id, ticket.qr_code_data, fmt, scale)
+
+
 @router.get("/concert/{concert_id}/qr-codes/download")
 async def download_all_qr_codes(
     concert_id: int,
+    format: str = Query("png", description="png, svg or webp"),
+    scale: Optional[int] = Query(None, ge=MIN_SCALE, le=MAX_SCALE, description="Pixels per module"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Download all QR codes for a concert as ZIP file."""
+    fmt = _resolve_qr_format(format, None)
+
     # Get concert
-    result = await db.execute(select(Concert).filter(Concert.id == concert_id))
-    concert = result.scalars().first()
+    concert = await get_concert_cached(db, concert_id)
     if not concert:
         raise HTTPException(status_code=404, detail="Concert not found")
     
@@ -208,31 +325,113 @@ async def download_all_qr_codes(
     if not tickets:
         raise HTTPException(status_code=404, detail="No tickets found for this concert")
     
-    # Create ZIP file in memory
-    zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for ticket in tickets:
-            if ticket.qr_code_data:
-                # Decode base64 and add to zip
-                qr_image_data = base64.b64decode(ticket.qr_code_data)
-                filename = f"QR_{ticket.ticket_number}.png"
-                zip_file.writestr(filename, qr_image_data)
-    
-    zip_buffer.seek(0)
-    
+    # Encoding and compressing is CPU bound: build the archive in the print
+    # worker pool so gate scans on this event loop are not held up
+    rows = [
+        (ticket.id, ticket.ticket_number, ticket.concert_id, ticket.qr_code_data)
+        for ticket in tickets
+        if ticket.qr_code_data
+    ]
+    archive = await asyncio.get_running_loop().run_in_executor(
+        get_print_pool(), build_qr_zip, rows, fmt, scale
+    )
+
     return StreamingResponse(
-        iter([zip_buffer.getvalue()]),
+        iter([archive]),
         media_type="application/zip",
         headers={"Content-Disposition": f"attachment; filename=qr-codes-{concert.name}.zip"}
     )
 
 
+@router.get("/concert/{concert_id}/print-sheets")
+async def download_print_sheets(
+    concert_id: int,
+    format: str = Query("pdf", description="pdf (multi-page) or png (ZIP of page images)"),
+    per_page: int = Query(12, ge=MIN_PER_PAGE, le=MAX_PER_PAGE),
+    dpi: int = Query(300, ge=MIN_DPI, le=MAX_DPI),
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Download print-ready A4 sheets of QR codes with ticket number and concert name.
+
+    Pages are rendered in worker processes and streamed as they complete;
+    tickets are read one page at a time with keyset pagination.
+    """
+    if format not in SHEET_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{format}'. Use one of: {', '.join(SHEET_FORMATS)}"
+        )
+
+    concert = await get_concert_cached(db, concert_id)
+    if not concert:
+        raise HTTPException(status_code=404, detail="Concert not found")
+
+    result = await db.execute(select(Ticket.id).filter(Ticket.concert_id == concert_id).limit(1))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="No tickets found for this concert")
+
+    last_id = 0
+
+    async def fetch_page(page_number: int):
+        nonlocal last_id
+        result = await db.execute(
+            select(Ticket.id, Ticket.ticket_number)
+            .filter((Ticket.concert_id == concert_id) & (Ticket.id > last_id))
+            .order_by(Ticket.id)
+            .limit(per_page)
+        )
+        rows = result.all()
+        if rows:
+            last_id = rows[-1].id
+        return [
+            (row.ticket_number, build_qr_payload(row.id, row.ticket_number, concert_id))
+            for row in rows
+        ]
+
+    extension = "pdf" if format == "pdf" else "zip"
+    return StreamingResponse(
+        stream_sheets(fetch_page, concert.name, format, per_page, dpi),
+        media_type=SHEET_FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename=print-sheets-{concert.name}.{extension}"}
+    )
+
+
 @router.get("/{ticket_id}/download-qr")
 async def download_single_qr(
     ticket_id: int,
+    format: Optional[str] = Query(None, description="png, svg or webp; overrides the Accept header"),
+    scale: Optional[int] = Query(None, ge=MIN_SCALE, le=MAX_SCALE, description="Pixels per module"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Download a single QR code as PNG image."""
+    """
+    Download a single QR code as PNG, SVG or WebP (chosen by `format` or `Accept`).
+
+    The image never changes, so it is served with a strong ETag and an
+    immutable Cache-Control. Revalidations are answered with 304 from the
+    in-process ticket number map, or after a ticket_number-only probe.
+    """
+    fmt = _resolve_qr_format(format, accept)
+    variant = f"{fmt}:{scale or 'stored'}"
+
+    if if_none_match:
+        ticket_number = cached_ticket_number(ticket_id)
+        if ticket_number is None:
+            result = await db.execute(select(Ticket.ticket_number).filter(Ticket.id == ticket_id))
+            ticket_number = result.scalar()
+            if ticket_number is None:
+                raise HTTPException(status_code=404, detail="Ticket not found")
+            remember_ticket_number(ticket_id, ticket_number)
+        etag = qr_etag(ticket_number, variant)
+        if etag_matches(if_none_match, etag):
+            response = not_modified(etag, IMMUTABLE_CACHE_CONTROL)
+            # A 304 carries the Vary the 200 would have (RFC 9110 15.4.5)
+            response.headers["Vary"] = "Accept"
+            return response
+
     result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id))
     ticket = result.scalars().first()
     if not ticket:
@@ -241,13 +440,18 @@ async def download_single_qr(
     if not ticket.qr_code_data:
         raise HTTPException(status_code=404, detail="No QR code for this ticket")
     
-    # Decode base64 to PNG bytes
-    qr_image_data = base64.b64decode(ticket.qr_code_data)
+    remember_ticket_number(ticket.id, ticket.ticket_number)
+    content, media_type = _render_ticket_qr(ticket, fmt, scale)
     
-    return StreamingResponse(
-        BytesIO(qr_image_data),
-        media_type="image/png",
-        headers={"Content-Disposition": f"attachment; filename=QR_{ticket.ticket_number}.png"}
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=QR_{ticket.ticket_number}.{fmt}",
+            "Vary": "Accept",
+            "ETag": qr_etag(ticket.ticket_number, variant),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        }
     )
 
 
@@ -258,13 +462,16 @@ async def delete_ticket(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a ticket (admin only)."""
-    result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id))
+    result = await db.execute(select(Ticket).filter(Ticket.id == ticket_id).with_for_update())
     ticket = result.scalars().first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
     ticket_number = ticket.ticket_number
+    await inventory.record_deleted(db, ticket.concert_id, ticket.status)
+    record_ticket_deleted(db, ticket, current_user.username)
     await db.delete(ticket)
     await db.commit()
+    invalidate_ticket(ticket_id)
     
     return {"message": f"Ticket {ticket_number} deleted successfully", "ticket_id": ticket_id}
@@ -3,12 +3,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
 
-from app.database import get_db
-from app.models.transfer import Transfer, TransferStatus
+from app.database import get_db, get_read_db
+from app.models.transfer import Transfer, TransferStatus, is_pending
 from app.models.ticket import Ticket, TicketStatus
 from app.models.user import User
 from app.schemas.transfer import TransferCreate, TransferRespond, TransferResponse
 from app.routes.auth import get_current_user
+from app.utils import inventory
+from app.utils.change_log import (
+    TRANSFER_ACCEPTED,
+    TRANSFER_INITIATED,
+    TRANSFER_REJECTED,
+    record_status_changed,
+    record_transfer,
+)
+from app.utils.ticket_cache import invalidate_ticket
 
 router = APIRouter(prefix="/api/transfers", tags=["transfers"])
 
@@ -21,7 +30,9 @@ async def initiate_transfer(
 ):
     """Initiate a ticket transfer to another user."""
     # Check if ticket exists
-    result = await db.execute(select(Ticket).filter(Ticket.id == transfer_data.ticket_id))
+    result = await db.execute(
+        select(Ticket).filter(Ticket.id == transfer_data.ticket_id).with_for_update()
+    )
     ticket = result.scalars().first()
     
     if not ticket:
@@ -56,8 +67,15 @@ async def initiate_transfer(
     )
     
     db.add(db_transfer)
+    old_status = ticket.status
     ticket.status = TicketStatus.TRANSFERRED
+    await inventory.record_status_change(db, ticket.concert_id, old_status, ticket.status)
+    # The event needs the transfer id
+    await db.flush()
+    record_transfer(db, TRANSFER_INITIATED, db_transfer, ticket, current_user.username)
+    record_status_changed(db, ticket, old_status, current_user.username, db_transfer.initiated_at)
     await db.commit()
+    invalidate_ticket(ticket.id)
     await db.refresh(db_transfer)
     
     return db_transfer
@@ -66,13 +84,12 @@ async def initiate_transfer(
 @router.get("/pending", response_model=list[TransferResponse])
 async def get_pending_transfers(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get pending transfers for current user."""
     result = await db.execute(
         select(Transfer).filter(
-            (Transfer.to_user_id == current_user.id) &
-            (Transfer.status == TransferStatus.PENDING)
+            (Transfer.to_user_id == current_user.id) & is_pending()
         )
     )
     transfers = result.scalars().all()
@@ -111,12 +128,17 @@ async def accept_transfer(
     transfer.completed_at = datetime.utcnow()
     
     # Update ticket ownership
-    result = await db.execute(select(Ticket).filter(Ticket.id == transfer.ticket_id))
+    result = await db.execute(select(Ticket).filter(Ticket.id == transfer.ticket_id).with_for_update())
     ticket = result.scalars().first()
     ticket.current_holder_id = current_user.id
+    old_status = ticket.status
     ticket.status = TicketStatus.SOLD
+    await inventory.record_status_change(db, ticket.concert_id, old_status, ticket.status)
+    record_transfer(db, TRANSFER_ACCEPTED, transfer, ticket, current_user.username)
+    record_status_changed(db, ticket, old_status, current_user.username, transfer.completed_at)
     
     await db.commit()
+    invalidate_ticket(ticket.id)
     await db.refresh(transfer)
     
     return transfer
@@ -153,11 +175,16 @@ async def reject_transfer(
     transfer.status = TransferStatus.REJECTED
     
     # Revert ticket status
-    result = await db.execute(select(Ticket).filter(Ticket.id == transfer.ticket_id))
+    result = await db.execute(select(Ticket).filter(Ticket.id == transfer.ticket_id).with_for_update())
     ticket = result.scalars().first()
+    old_status = ticket.status
     ticket.status = TicketStatus.SOLD
+    await inventory.record_status_change(db, ticket.concert_id, old_status, ticket.status)
+    record_transfer(db, TRANSFER_REJECTED, transfer, ticket, current_user.username)
+    record_status_changed(db, ticket, old_status, current_user.username, datetime.utcnow())
     
     await db.commit()
+    invalidate_ticket(ticket.id)
     await db.refresh(transfer)
     
     return transfer
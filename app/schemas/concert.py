@@ -20,3 +20,14 @@ class ConcertResponse(ConcertBase):
 
     class Config:
         from_attributes = True
+
+
+class ConcertInventory(BaseModel):
+    concert_id: int
+    total: int
+    sold_confirmed: int
+    verified: int
+    transferred: int
+    # Tickets that left the "created" state: sold_confirmed + verified + transferred
+    sold: int
+    available: int
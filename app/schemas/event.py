@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class EventOut(BaseModel):
+    id: int
+    type: str
+    node: str
+    concert_id: Optional[int] = None
+    ticket_number: Optional[str] = None
+    payload: Dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class EventFeed(BaseModel):
+    events: List[EventOut]
+    next_after: int  # pass as `after` for the next page
+    has_more: bool
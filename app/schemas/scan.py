@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -29,3 +29,44 @@ class ScanResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TimelinePoint(BaseModel):
+    start: datetime
+    key: Optional[str] = None  # location or scan type when split with `by`
+    count: int
+
+
+class ScanTimeline(BaseModel):
+    concert_id: int
+    bucket: str
+    by: Optional[str] = None
+    points: List[TimelinePoint]
+
+
+class ScannerWindow(BaseModel):
+    start: datetime
+    end: datetime
+    scans: int
+
+
+class ScannerThroughput(BaseModel):
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    scans: int
+    duplicates: int  # ticket already had a scan of the same type
+    rejected: int  # attempts refused by the scan endpoint
+    duplicate_rate: float
+    reject_rate: float
+    scans_per_minute: float  # per active minute
+    active_seconds: float
+    mean_gap_seconds: Optional[float] = None  # between scans inside active windows
+    max_gap_seconds: Optional[float] = None
+    windows: List[ScannerWindow]
+
+
+class ScannerReport(BaseModel):
+    concert_id: int
+    idle_minutes: float
+    generated_at: datetime
+    scanners: List[ScannerThroughput]
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class ChangeEventIn(BaseModel):
+    id: int  # the event's id on the edge node (its watermark position)
+    type: str
+    created_at: Optional[datetime] = None
+    payload: Dict[str, Any]
+
+
+class ChangeBatch(BaseModel):
+    node: str = Field(..., min_length=1)
+    events: List[ChangeEventIn] = Field(..., max_length=10000)
+
+
+class SyncWatermarkResponse(BaseModel):
+    node: str
+    watermark: int  # last event id applied from the node
+
+
+class SyncResult(SyncWatermarkResponse):
+    applied: int
+    skipped: int  # unknown ticket or scan type, or a status change that lost a conflict
+    duplicate: int  # already applied by an earlier push
@@ -1,14 +1,89 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 
 class Settings(BaseSettings):
     # Development: SQLite, Production: PostgreSQL (from environment)
     database_url: str = "sqlite+aiosqlite:///./test_concert.db"
     env: str = "development"
+    # "edge" for a venue edge node on SQLite: connect pragmas below, pooled
+    # connections and one writer task for all writes (see app.utils.edge)
+    database_profile: str = "default"
+    edge_sqlite_pragmas: Dict[str, str] = {
+        "journal_mode": "wal",
+        "synchronous": "normal",  # WAL stays consistent; a power cut may lose the last commits
+        "mmap_size": "268435456",
+        "cache_size": "-65536",  # KiB, i.e. 64 MiB
+        "busy_timeout": "5000",
+    }
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Same SQL statement run this many times in one request is logged as a likely N+1
+    repeated_query_threshold: int = 3
+    # Ticket QR rendering: "fast" (1-bit numpy rasterizer) or "pil" (qrcode image factory)
+    qr_renderer: str = "fast"
+    # zlib level for the fast renderer: 6 gives the same bytes as PIL, rendering
+    # ~1.6x faster over 500 tickets but no faster over 50 (benchmarks.qr_render);
+    # 9 saves another ~10% of bytes but renders ~2.7x slower than 6
+    qr_png_compress_level: int = 6
+    # Concert metadata read-through cache; writes invalidate explicitly
+    concert_cache_ttl_seconds: float = 300
+    # Authenticated user and ticket status caches (bounded staleness if a message is lost)
+    user_cache_ttl_seconds: float = 60
+    ticket_status_cache_ttl_seconds: float = 30
+    # Optional read replica for heavy GET handlers; a client's own writes pin it
+    # to the primary for read_your_writes_seconds (should exceed replica lag)
+    read_database_url: Optional[str] = None
+    read_your_writes_seconds: float = 5
+    # Proxies in front of the app that append to X-Forwarded-For (1 on Railway);
+    # the caller's address is the entry that many hops from the end
+    trusted_proxy_hops: int = 0
+    # Token buckets per route group: (requests per minute, burst) per user, or per
+    # address for anonymous callers; an address may use `rate_limit_ip_multiplier`
+    # times that across all of its users (see app.utils.rate_limit). Off by default:
+    # behind a proxy set trusted_proxy_hops first, or every anonymous caller
+    # shares the proxy's address
+    rate_limit_enabled: bool = False
+    rate_limits: Dict[str, Tuple[float, float]] = {
+        "login": (10, 5),
+        "scan": (600, 60),
+        "listing": (120, 30),
+        "export": (6, 3),
+    }
+    rate_limit_ip_multiplier: float = 10
+    # Admission control: 503 for these groups while the recent pool checkout time
+    # exceeds the threshold, keeping connections for scans
+    admission_checkout_wait_seconds: float = 0.5
+    admission_shed_groups: Tuple[str, ...] = ("listing", "export")
+    # Concurrency slots per lane (app.utils.lanes): gate = scans and ticket lookups,
+    # heavy = ZIP/print/export/batch/upload, default = the rest. Keep heavy + default
+    # below the database connection limit so the gate share is always free.
+    lane_slots: Dict[str, int] = {"gate": 32, "heavy": 2, "default": 48}
+    lane_queue_timeout_seconds: Dict[str, float] = {"gate": 2, "heavy": 30, "default": 10}
+    # Name of this instance in the change log; every edge node needs its own.
+    # Edges push their scans to central in batches of sync_batch_size events
+    # (see app.utils.replication)
+    node_name: str = "central"
+    sync_batch_size: int = 1000
+    # Reuse a coalesced GET result for this long after it finished (0: only share in-flight calls)
+    single_flight_ttl_seconds: float = 0
+    # Cache invalidation bus: "local" (single worker) or "postgres" (LISTEN/NOTIFY,
+    # required to run more than one worker); cache_bus_url defaults to database_url
+    cache_bus: str = "local"
+    cache_bus_url: Optional[str] = None
+    # Print sheet rendering: worker processes (0 = one per CPU) and pages rendered ahead
+    print_workers: int = 0
+    print_pages_in_flight: int = 4
+    # Scanner throughput report cache; scans never invalidate it
+    scanner_report_ttl_seconds: float = 15
+    # Ticket numbers: "sequence" (per-concert counter through a keyed permutation,
+    # Crockford base32 + check symbol) or "uuid" (legacy). Never change the key
+    # once tickets have been issued: new numbers could collide with old ones.
+    ticket_number_generator: str = "sequence"
+    ticket_number_key: str = "change-me-ticket-number-key"
+    # Rows per lookup/UPDATE/commit when marking tickets sold from a CSV upload
+    bulk_sale_chunk_size: int = 500
 
     class Config:
         env_file = ".env"
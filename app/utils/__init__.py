@@ -1,3 +1,10 @@
-from .qr_generator import generate_qr_code, decode_qr_data
-
 __all__ = ["generate_qr_code", "decode_qr_data"]
+
+
+def __getattr__(name):
+    # Resolved on first use so importing any app.utils submodule does not
+    # pull in qrcode/PIL/numpy at startup.
+    if name in __all__:
+        from . import qr_generator
+        return getattr(qr_generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,18 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.settings import settings
 
-# Use argon2 only - avoids bcrypt compatibility issues on Python 3.14+
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# passlib/argon2 and python-jose are imported on first use to keep cold start short
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Password hashing context, built on first use."""
+    from passlib.context import CryptContext
+
+    # Use argon2 only - avoids bcrypt compatibility issues on Python 3.14+
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -14,7 +21,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if len(plain_password) > 128:
         plain_password = plain_password[:128]
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
     except Exception:
         return False
 
@@ -24,7 +31,7 @@ def get_password_hash(password: str) -> str:
     # Truncate long passwords
     if len(password) > 128:
         password = password[:128]
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,12 +42,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode a JWT token."""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         return payload
@@ -0,0 +1,190 @@
+"""
+Bulk "mark sold" from an uploaded CSV.
+
+The file is read row by row and handled in chunks: each chunk is checked
+against the database with one `IN (...)` query, the valid rows are applied
+with one executemany UPDATE, its change events with one executemany INSERT,
+and the chunk is committed. Rows that fail
+are reported by line number and never block the rest of the file.
+
+Expected columns (header row required, extra columns ignored):
+    ticket_number, buyer_name, buyer_email, price   (price in cents)
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from pydantic import BaseModel
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.change_event import ChangeEvent
+from app.models.ticket import Ticket, TicketStatus
+from app.settings import settings
+from app.utils import inventory
+from app.utils.change_log import (
+    TICKET_SOLD,
+    TICKET_STATUS_CHANGED,
+    lock_change_log,
+    sale_payload,
+    status_change_payload,
+)
+from app.utils.ticket_cache import invalidate_ticket
+
+REQUIRED_COLUMNS = ("ticket_number", "buyer_name", "buyer_email", "price")
+# Only unsold tickets can be sold in bulk, so re-uploading a file is harmless
+SELLABLE_STATUSES = (TicketStatus.CREATED,)
+# Same status as a single mark-sold; SOLD_CONFIRMED is the seller's stage-1 scan
+SOLD_STATUS = TicketStatus.SOLD
+
+
+class BulkSaleError(BaseModel):
+    row: int
+    ticket_number: Optional[str] = None
+    error: str
+
+
+class BulkSaleReport(BaseModel):
+    processed: int = 0
+    updated: int = 0
+    errors: List[BulkSaleError] = []
+
+
+class InvalidUpload(ValueError):
+    """The upload is not a CSV with the required columns."""
+
+
+def read_rows(binary_file) -> Iterator[tuple]:
+    """Yield (line_number, row dict) lazily from a binary file object."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        header = [name.strip() for name in reader.fieldnames or []]
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise InvalidUpload(f"CSV is missing required column(s): {', '.join(missing)}")
+        reader.fieldnames = header
+        for row in reader:
+            yield reader.line_num, row
+    finally:
+        # Leave the upload's file open; FastAPI closes it
+        text.detach()
+
+
+def _parse_row(row: Dict[str, str]) -> dict:
+    """Validate one row on its own; raises ValueError with a readable message."""
+    values = {column: (row.get(column) or "").strip() for column in REQUIRED_COLUMNS}
+    for column in REQUIRED_COLUMNS:
+        if not values[column]:
+            raise ValueError(f"{column} is required")
+    if "@" not in values["buyer_email"]:
+        raise ValueError("buyer_email is not an email address")
+    try:
+        price = int(values["price"])
+    except ValueError:
+        raise ValueError("price must be an integer number of cents") from None
+    if price < 0:
+        raise ValueError("price must not be negative")
+    values["price"] = price
+    return values
+
+
+async def _apply_chunk(
+    db: AsyncSession, chunk: List[tuple], seller_id: int, report: BulkSaleReport, seller_name: Optional[str] = None
+) -> None:
+    numbers = [values["ticket_number"] for _, values in chunk]
+    result = await db.execute(
+        select(Ticket.id, Ticket.ticket_number, Ticket.status, Ticket.concert_id)
+        .filter(Ticket.ticket_number.in_(numbers))
+        .with_for_update()
+    )
+    tickets = {row.ticket_number: row for row in result}
+
+    now = datetime.utcnow()
+    updates, events = [], []
+    sold_per_concert: Dict[tuple, int] = {}
+    for line, values in chunk:
+        ticket = tickets.get(values["ticket_number"])
+        if ticket is None:
+            report.errors.append(BulkSaleError(row=line, ticket_number=values["ticket_number"], error="ticket not found"))
+            continue
+        if ticket.status not in SELLABLE_STATUSES:
+            report.errors.append(BulkSaleError(
+                row=line, ticket_number=ticket.ticket_number,
+                error=f"ticket is {getattr(ticket.status, 'value', ticket.status)}, not sellable",
+            ))
+            continue
+        updates.append({
+            "id": ticket.id,
+            "status": SOLD_STATUS,
+            "buyer_name": values["buyer_name"],
+            "buyer_email": values["buyer_email"],
+            "price": values["price"],
+            "sold_at": now,
+            "sold_by_user_id": seller_id,
+            "updated_at": now,
+        })
+        key = (ticket.concert_id, ticket.status)
+        sold_per_concert[key] = sold_per_concert.get(key, 0) + 1
+        about = {"ticket_id": ticket.id, "ticket_number": ticket.ticket_number}
+        for type, payload in (
+            (TICKET_STATUS_CHANGED, status_change_payload(ticket.status, SOLD_STATUS, seller_name, now)),
+            (TICKET_SOLD, sale_payload(values["buyer_name"], values["buyer_email"], values["price"], now, seller_name)),
+        ):
+            events.append({
+                "type": type,
+                "node": settings.node_name,
+                "concert_id": ticket.concert_id,
+                "ticket_number": ticket.ticket_number,
+                "payload": {**about, **payload},
+                "created_at": now,
+            })
+
+    if updates:
+        # ORM bulk UPDATE by primary key: one executemany for the whole chunk
+        await db.execute(update(Ticket), updates)
+        for (concert_id, old_status), count in sold_per_concert.items():
+            await inventory.record_status_change(db, concert_id, old_status, SOLD_STATUS, count)
+        await lock_change_log(db)
+        await db.execute(insert(ChangeEvent), events)
+    await db.commit()
+    for row in updates:
+        invalidate_ticket(row["id"])
+    report.updated += len(updates)
+
+
+async def bulk_mark_sold(
+    db: AsyncSession,
+    binary_file,
+    seller_id: int,
+    chunk_size: Optional[int] = None,
+    seller_name: Optional[str] = None,
+) -> BulkSaleReport:
+    """Apply a bulk sale upload; raises InvalidUpload if the header is unusable."""
+    chunk_size = chunk_size or settings.bulk_sale_chunk_size
+    report = BulkSaleReport()
+    seen: Set[str] = set()
+    chunk: List[tuple] = []
+    for line, row in read_rows(binary_file):
+        report.processed += 1
+        try:
+            values = _parse_row(row)
+        except ValueError as exc:
+            report.errors.append(BulkSaleError(row=line, ticket_number=row.get("ticket_number") or None, error=str(exc)))
+            continue
+        if values["ticket_number"] in seen:
+            report.errors.append(BulkSaleError(
+                row=line, ticket_number=values["ticket_number"], error="duplicate ticket_number in upload"
+            ))
+            continue
+        seen.add(values["ticket_number"])
+        chunk.append((line, values))
+        if len(chunk) >= chunk_size:
+            await _apply_chunk(db, chunk, seller_id, report, seller_name)
+            chunk = []
+    if chunk:
+        await _apply_chunk(db, chunk, seller_id, report, seller_name)
+    report.errors.sort(key=lambda error: error.row)
+    return report
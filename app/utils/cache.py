@@ -0,0 +1,280 @@
+"""
+Small in-process caches with TTL, explicit invalidation and metrics.
+
+Writers invalidate through an `InvalidationChannel` rather than touching
+caches directly. Without a transport the channel only reaches caches in
+this process; with `cache_bus = "postgres"` messages are also broadcast
+over LISTEN/NOTIFY, so several workers can keep their caches coherent.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+cache_requests_total = registry.counter(
+    "cache_requests_total", "Cache lookups by cache name and result.", ("cache", "result"),
+)
+cache_invalidations_total = registry.counter(
+    "cache_invalidations_total", "Cache invalidations by cache name.", ("cache",),
+)
+
+cache_bus_messages_total = registry.counter(
+    "cache_bus_messages_total", "Invalidation messages sent to / received from other workers.",
+    ("direction",),
+)
+cache_bus_resets_total = registry.counter(
+    "cache_bus_resets_total", "Full cache resets after the invalidation bus reconnected.",
+)
+
+
+class TTLCache:
+    """
+    Dict-backed cache whose entries expire after `ttl` seconds.
+
+    `generation` is bumped on every invalidation; callers that load a value
+    take the generation before querying and pass it to `set()`, so a load
+    that raced with a write is not stored.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            cache_requests_total.inc(cache=self.name, result="hit")
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        cache_requests_total.inc(cache=self.name, result="miss")
+        return default
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop one key, or everything when `key` is None."""
+        self.generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        cache_invalidations_total.inc(cache=self.name)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            # Still full: drop the oldest tenth (dicts keep insertion order)
+            for key in list(self._entries)[: max(1, self.max_entries // 10)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class InvalidationTransport:
+    """
+    Carries encoded invalidation messages between workers.
+
+    `start()` registers the callback for incoming messages and the callback
+    run after a reconnect (messages may have been missed, so subscribers
+    drop everything). `send()` is called from request handlers and must not
+    block.
+    """
+
+    async def start(self, on_message: Callable[[str], None], on_reset: Callable[[], None]) -> None:
+        raise NotImplementedError
+
+    def send(self, payload: str) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class InvalidationChannel:
+    """
+    Fan-out of invalidation messages: topic -> callbacks(key).
+
+    Publishing always reaches subscribers in this process synchronously, so
+    a worker sees its own writes immediately. With a transport attached the
+    message is also broadcast to other workers; each worker ignores its own
+    messages when they come back.
+    """
+
+    def __init__(self, transport: Optional[InvalidationTransport] = None):
+        self.origin = uuid.uuid4().hex
+        self.transport = transport
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, callback: Callable[[Any], None]) -> None:
+        self._subscribers[topic].append(callback)
+
+    def _deliver(self, topic: str, key: Any) -> None:
+        for callback in self._subscribers.get(topic, ()):
+            callback(key)
+
+    def publish(self, topic: str, key: Any = None) -> None:
+        """Invalidate `key` (None for everything) under `topic`; keys must be JSON values."""
+        self._deliver(topic, key)
+        if self.transport is not None:
+            self.transport.send(json.dumps([self.origin, topic, key]))
+            cache_bus_messages_total.inc(direction="sent")
+
+    def _receive(self, payload: str) -> None:
+        try:
+            origin, topic, key = json.loads(payload)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed invalidation message: %.200s", payload)
+            return
+        if origin == self.origin:
+            return
+        cache_bus_messages_total.inc(direction="received")
+        self._deliver(topic, key)
+
+    def _reset(self) -> None:
+        cache_bus_resets_total.inc()
+        for topic in list(self._subscribers):
+            self._deliver(topic, None)
+
+    async def start(self) -> None:
+        if self.transport is not None:
+            await self.transport.start(self._receive, self._reset)
+
+    async def stop(self) -> None:
+        if self.transport is not None:
+            await self.transport.stop()
+
+
+class MemoryBroker:
+    """In-memory stand-in for a shared bus: every started transport gets every message."""
+
+    def __init__(self):
+        self.transports: List["MemoryTransport"] = []
+
+    def broadcast(self, payload: str) -> None:
+        for transport in list(self.transports):
+            transport.on_message(payload)
+
+
+class MemoryTransport(InvalidationTransport):
+    """Transport over a `MemoryBroker`; lets tests run several 'workers' in one process."""
+
+    def __init__(self, broker: MemoryBroker):
+        self.broker = broker
+        self.on_message: Callable[[str], None] = lambda payload: None
+
+    async def start(self, on_message, on_reset) -> None:
+        self.on_message = on_message
+        self.broker.transports.append(self)
+
+    def send(self, payload: str) -> None:
+        self.broker.broadcast(payload)
+
+    async def stop(self) -> None:
+        if self in self.broker.transports:
+            self.broker.transports.remove(self)
+
+
+class PostgresNotifyTransport(InvalidationTransport):
+    """
+    PostgreSQL LISTEN/NOTIFY transport on one dedicated asyncpg connection.
+
+    Outgoing messages are queued and sent by a background task, so
+    `publish()` never waits on the network. If the connection drops, it is
+    re-established with backoff and subscribers are reset, since NOTIFYs
+    sent in the meantime are lost.
+    """
+
+    def __init__(self, dsn: str, channel: str = "cache_invalidation"):
+        self.dsn = dsn
+        self.channel = channel
+        self._connection = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _connect(self, on_message) -> None:
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(
+            self.channel, lambda connection, pid, channel, payload: on_message(payload)
+        )
+        # A dropped listener would silently miss invalidations: reconnect even if idle
+        self._connection.add_termination_listener(lambda connection: self.send(None))
+
+    async def start(self, on_message, on_reset) -> None:
+        self._queue = asyncio.Queue()
+        await self._connect(on_message)
+        self._task = asyncio.create_task(self._run(on_message, on_reset))
+
+    def send(self, payload: Optional[str]) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(payload)
+
+    async def _run(self, on_message, on_reset) -> None:
+        """Send queued payloads; `None` in the queue only asks for a reconnect."""
+        delay = 0.5
+        while True:
+            payload = await self._queue.get()
+            while True:
+                try:
+                    if self._connection is None or self._connection.is_closed():
+                        await self._connect(on_message)
+                        on_reset()
+                    if payload is not None:
+                        await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    delay = 0.5
+                    break
+                except Exception as exc:
+                    logger.warning("Cache invalidation bus unavailable (%s); retrying in %.1fs", exc, delay)
+                    self._connection = None
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+
+def postgres_dsn(database_url: str) -> str:
+    """Turn an SQLAlchemy URL (postgresql+asyncpg://...) into a plain libpq DSN."""
+    scheme, sep, rest = database_url.partition("://")
+    return scheme.split("+", 1)[0] + sep + rest
+
+
+def make_transport(backend: str, url: str) -> Optional[InvalidationTransport]:
+    """Transport for the `cache_bus` setting: "local" (none) or "postgres"."""
+    if backend == "local":
+        return None
+    if backend == "postgres":
+        return PostgresNotifyTransport(postgres_dsn(url))
+    raise ValueError(f"Unknown cache bus backend {backend!r}; expected 'local' or 'postgres'")
+
+
+invalidation_channel = InvalidationChannel()
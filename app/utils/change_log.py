@@ -0,0 +1,156 @@
+"""
+Change log (transactional outbox).
+
+Write paths add a `ChangeEvent` to their session next to the change itself,
+so the event commits or rolls back with it. The log feeds edge -> central
+replication (app.utils.replication) and `GET /api/events` for downstream
+consumers. Payloads use natural keys (ticket number, username) and ISO
+timestamps; ids are included for local consumers but differ between
+databases.
+
+Readers page through the log by id, which is only safe if ids become
+visible in order. SQLite has one writer at a time. Postgres assigns ids at
+INSERT but publishes rows at COMMIT, so two writers can commit out of order
+and a reader that already moved past the later id would never see the
+earlier one. Every transaction that writes events therefore takes a
+transaction-level advisory lock just before inserting them (at flush, right
+before commit), which orders event writers without holding the lock for
+the rest of their work.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.change_event import ChangeEvent
+from app.models.scan import Scan
+from app.models.ticket import Ticket
+from app.settings import settings
+
+SCAN_CREATED = "scan.created"
+TICKET_STATUS_CHANGED = "ticket.status_changed"
+TICKET_SOLD = "ticket.sold"
+TICKET_DELETED = "ticket.deleted"
+TRANSFER_INITIATED = "transfer.initiated"
+TRANSFER_ACCEPTED = "transfer.accepted"
+TRANSFER_REJECTED = "transfer.rejected"
+CONCERT_DELETED = "concert.deleted"
+
+# pg_advisory_xact_lock key serializing change log writers (any constant works)
+LOG_LOCK_KEY = 7_310_422_001
+
+
+def _value(member):
+    return getattr(member, "value", member)
+
+
+def _isoformat(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment else None
+
+
+def _lock_statement(sync_session: Session):
+    if sync_session.get_bind().dialect.name == "postgresql":
+        return select(func.pg_advisory_xact_lock(LOG_LOCK_KEY))
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_before_event_insert(session, flush_context, instances):
+    """Order event writers on Postgres (see the module docstring)."""
+    if any(isinstance(obj, ChangeEvent) for obj in session.new):
+        statement = _lock_statement(session)
+        if statement is not None:
+            session.execute(statement)
+
+
+async def lock_change_log(db: AsyncSession) -> None:
+    """Take the writer lock before inserting events with a Core INSERT (no flush involved)."""
+    statement = _lock_statement(db.sync_session)
+    if statement is not None:
+        await db.execute(statement)
+
+
+def record_change(
+    db: AsyncSession,
+    type: str,
+    payload: dict,
+    ticket: Optional[Ticket] = None,
+    concert_id: Optional[int] = None,
+    node: Optional[str] = None,
+) -> ChangeEvent:
+    """Add one event to the session (flushed with the change); about `ticket` if given."""
+    if ticket is not None:
+        concert_id = ticket.concert_id
+        payload = {"ticket_id": ticket.id, "ticket_number": ticket.ticket_number, **payload}
+    event = ChangeEvent(
+        type=type,
+        node=node or settings.node_name,
+        concert_id=concert_id,
+        ticket_number=ticket.ticket_number if ticket is not None else None,
+        payload=payload,
+    )
+    db.add(event)
+    return event
+
+
+def record_scan_created(db: AsyncSession, scan: Scan, ticket: Ticket, username: Optional[str]) -> ChangeEvent:
+    return record_change(db, SCAN_CREATED, {
+        "scan_type": _value(scan.scan_type),
+        "scanned_at": _isoformat(scan.scanned_at),
+        "scanned_by": username,
+        "location": scan.location,
+        "notes": scan.notes,
+    }, ticket)
+
+
+def record_status_changed(
+    db: AsyncSession, ticket: Ticket, old_status, username: Optional[str], at: datetime
+) -> Optional[ChangeEvent]:
+    """Log `ticket`'s transition from `old_status` to its current status; nothing if unchanged."""
+    if _value(old_status) == _value(ticket.status):
+        return None
+    return record_change(db, TICKET_STATUS_CHANGED, status_change_payload(old_status, ticket.status, username, at), ticket)
+
+
+def status_change_payload(old_status, new_status, username: Optional[str], at: datetime) -> dict:
+    return {"from": _value(old_status), "to": _value(new_status), "at": _isoformat(at), "by": username}
+
+
+def sale_payload(buyer_name, buyer_email, price, sold_at: datetime, username: Optional[str]) -> dict:
+    return {
+        "buyer_name": buyer_name,
+        "buyer_email": buyer_email,
+        "price": price,
+        "sold_at": _isoformat(sold_at),
+        "by": username,
+    }
+
+
+def record_sold(db: AsyncSession, ticket: Ticket, username: Optional[str]) -> ChangeEvent:
+    return record_change(db, TICKET_SOLD, sale_payload(
+        ticket.buyer_name, ticket.buyer_email, ticket.price, ticket.sold_at, username
+    ), ticket)
+
+
+def record_transfer(db: AsyncSession, type: str, transfer, ticket: Ticket, username: Optional[str]) -> ChangeEvent:
+    return record_change(db, type, {
+        "transfer_id": transfer.id,
+        "from_user_id": transfer.from_user_id,
+        "to_user_id": transfer.to_user_id,
+        "by": username,
+    }, ticket)
+
+
+def record_ticket_deleted(db: AsyncSession, ticket: Ticket, username: Optional[str]) -> ChangeEvent:
+    return record_change(db, TICKET_DELETED, {"status": _value(ticket.status), "by": username}, ticket)
+
+
+def record_concert_deleted(db: AsyncSession, concert, username: Optional[str]) -> ChangeEvent:
+    """One event for the concert; its tickets go with it and get no events of their own."""
+    return record_change(db, CONCERT_DELETED, {
+        "name": concert.name,
+        "tickets_total": concert.tickets_total,
+        "by": username,
+    }, concert_id=concert.id)
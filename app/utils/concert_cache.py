@@ -0,0 +1,70 @@
+"""
+Read-through cache for concert metadata.
+
+Concerts change rarely but are resolved by almost every ticket route, so
+lookups are served from a TTL cache of `ConcertResponse` snapshots.
+Writers call `invalidate_concert()` after committing.
+"""
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.concert import Concert
+from app.schemas.concert import ConcertResponse
+from app.settings import settings
+from app.utils.cache import TTLCache, invalidation_channel
+from app.utils.read_routing import is_replica_session
+
+CONCERT_TOPIC = "concerts"
+_ALL = "__all__"
+
+concert_cache = TTLCache("concerts", ttl=settings.concert_cache_ttl_seconds)
+
+
+async def get_concert_cached(db: AsyncSession, concert_id: int) -> Optional[ConcertResponse]:
+    """Return a concert snapshot, loading it on a miss; None if it does not exist."""
+    concert = concert_cache.get(concert_id)
+    if concert is not None:
+        return concert
+
+    generation = concert_cache.generation
+    result = await db.execute(select(Concert).filter(Concert.id == concert_id))
+    row = result.scalars().first()
+    if row is None:
+        return None
+    concert = ConcertResponse.model_validate(row)
+    # A lagging replica could hand back a row older than the last invalidation
+    if not is_replica_session(db):
+        concert_cache.set(concert_id, concert, generation)
+    return concert
+
+
+async def list_concerts_cached(db: AsyncSession) -> List[ConcertResponse]:
+    """Return snapshots of every concert."""
+    concerts = concert_cache.get(_ALL)
+    if concerts is not None:
+        return concerts
+
+    generation = concert_cache.generation
+    result = await db.execute(select(Concert))
+    concerts = [ConcertResponse.model_validate(row) for row in result.scalars().all()]
+    if not is_replica_session(db):
+        concert_cache.set(_ALL, concerts, generation)
+    return concerts
+
+
+def invalidate_concert(concert_id: Optional[int] = None) -> None:
+    """Invalidate one concert (and the list) in every subscribed cache."""
+    invalidation_channel.publish(CONCERT_TOPIC, concert_id)
+
+
+def _on_invalidate(concert_id) -> None:
+    if concert_id is None:
+        concert_cache.invalidate()
+    else:
+        concert_cache.invalidate(concert_id)
+        concert_cache.invalidate(_ALL)
+
+
+invalidation_channel.subscribe(CONCERT_TOPIC, _on_invalidate)
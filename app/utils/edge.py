@@ -0,0 +1,164 @@
+"""
+Venue edge-node profile for SQLite.
+
+An edge node is a small instance at the venue that keeps the gates working
+when the uplink fails. With `settings.database_profile = "edge"`:
+
+- every SQLite connection gets `settings.edge_sqlite_pragmas` on connect
+  (WAL, synchronous=NORMAL, mmap, a larger page cache, busy_timeout), and
+  connections are pooled instead of reopened per session so the page cache
+  and the mmap survive between requests;
+- write requests run one at a time on a single writer task. WAL lets
+  readers run alongside a writer, but only one transaction may write: a
+  second one that read first and then tries to write fails at once with
+  "database is locked" (busy_timeout does not apply to that upgrade).
+  Queueing the writes turns those failures into a short wait. Only the
+  handler holds the writer: the request body is read before the request
+  queues, and the response is buffered and sent after the writer moves
+  on, so a slow upload or a slow client does not hold up the gates.
+
+Edge nodes run a single worker process, so one writer task per process is
+one writer per database file.
+"""
+import asyncio
+import contextvars
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.settings import settings
+from app.utils.metrics import registry, route_template
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Writes that never touch the database (login only verifies a password hash);
+# serializing them would hold every scan behind the hash
+UNSERIALIZED_ROUTES = frozenset({("POST", "/api/auth/login")})
+
+edge_writer_queue = registry.gauge("edge_writer_queue", "Write requests waiting for the edge writer task.")
+edge_write_wait_seconds = registry.histogram(
+    "edge_write_wait_seconds", "Time write requests waited for the edge writer task.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+
+def is_edge(url: str) -> bool:
+    return settings.database_profile == "edge" and url.startswith("sqlite")
+
+
+def install_pragmas(engine, pragmas: Dict[str, str]) -> None:
+    """Run `PRAGMA name=value` for each entry on every new DBAPI connection of `engine`."""
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+class SerialWriter:
+    """Runs submitted coroutines one at a time, in submission order, on one task."""
+
+    def __init__(self, name: str = "edge-writer"):
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue), name=self.name)
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, context, future, queued_at = await queue.get()
+            edge_writer_queue.dec()
+            if future.cancelled():
+                # The caller went away before its turn; nothing was written
+                continue
+            edge_write_wait_seconds.observe(time.perf_counter() - queued_at)
+            # The caller's context (per-request metrics) follows the job. A job
+            # whose caller is cancelled mid-way still runs to completion.
+            job = loop.create_task(fn(), context=context)
+            await asyncio.wait([job])
+            if future.cancelled():
+                if not job.cancelled():
+                    job.exception()  # retrieved, so it is not logged as unhandled
+            elif job.cancelled():
+                future.cancel()
+            elif job.exception() is not None:
+                future.set_exception(job.exception())
+            else:
+                future.set_result(job.result())
+
+    async def run(self, fn: Callable[[], Awaitable]):
+        """Await `fn()` on the writer task, after every job submitted before it."""
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        edge_writer_queue.inc()
+        queue.put_nowait((fn, contextvars.copy_context(), future, time.perf_counter()))
+        return await future
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        # A task left on another (closed) loop is dropped, not awaited
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+writer = SerialWriter()
+
+
+async def read_body(receive) -> List[dict]:
+    """Receive the whole request body; the last message is a disconnect if the client left."""
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            return messages
+
+
+class EdgeWriteMiddleware:
+    """
+    On edge nodes, runs each write request (POST/PUT/PATCH/DELETE) on the writer task.
+
+    Write responses are small JSON documents, so buffering them is cheap;
+    request bodies are held in memory, one more reason to keep large CSV
+    uploads off edge nodes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not is_edge(settings.database_url)
+            or (scope["method"], scope.get("route_template") or route_template(scope)) in UNSERIALIZED_ROUTES
+        ):
+            await self.app(scope, receive, send)
+            return
+        body = await read_body(receive)
+        if body[-1]["type"] == "http.disconnect":
+            return  # the client left mid-upload; nothing to write or answer
+
+        async def replay_receive():
+            return body.pop(0) if body else await receive()
+
+        response = []
+
+        async def buffer_send(message):
+            response.append(message)
+
+        await writer.run(lambda: self.app(scope, replay_receive, buffer_send))
+        for message in response:
+            await send(message)
@@ -0,0 +1,145 @@
+"""
+Streaming CSV / NDJSON export of a concert's tickets (optionally with scans).
+
+Rows come from a server-side cursor in `yield_per` partitions and are
+encoded partition by partition, so memory stays flat however many tickets
+the concert has. With scans included the query is a LEFT JOIN ordered by
+ticket, which lets NDJSON group each ticket's scans without holding more
+than one ticket at a time.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import String, type_coerce
+from sqlalchemy.future import select
+
+from app.models.scan import Scan, ScanType
+from app.models.ticket import Ticket, TicketStatus
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_INCLUDES = ("scans",)
+EXPORT_BATCH_SIZE = 1000
+
+# Statuses are read as plain text so legacy values outside the enum still export
+TICKET_COLUMNS = [
+    ("ticket_id", Ticket.id),
+    ("ticket_number", Ticket.ticket_number),
+    ("status", type_coerce(Ticket.status, String)),
+    ("buyer_name", Ticket.buyer_name),
+    ("buyer_email", Ticket.buyer_email),
+    ("price", Ticket.price),
+    ("sold_at", Ticket.sold_at),
+    ("verified_at", Ticket.verified_at),
+    ("verified_by_user_id", Ticket.verified_by_user_id),
+    ("created_at", Ticket.created_at),
+    ("updated_at", Ticket.updated_at),
+]
+SCAN_COLUMNS = [
+    ("scan_id", Scan.id),
+    ("scan_type", type_coerce(Scan.scan_type, String)),
+    ("scanned_at", Scan.scanned_at),
+    ("scanned_by_user_id", Scan.scanned_by_user_id),
+    ("location", Scan.location),
+    ("notes", Scan.notes),
+]
+
+
+def export_statement(concert_id: int, include_scans: bool = False):
+    """SELECT for the export, streamed in `EXPORT_BATCH_SIZE` partitions."""
+    columns = TICKET_COLUMNS + (SCAN_COLUMNS if include_scans else [])
+    statement = select(*(column.label(name) for name, column in columns)).filter(
+        Ticket.concert_id == concert_id
+    )
+    if include_scans:
+        statement = statement.outerjoin(Scan, Scan.ticket_id == Ticket.id).order_by(Ticket.id, Scan.id)
+    else:
+        statement = statement.order_by(Ticket.id)
+    return statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+# Enum columns store member names; unknown (legacy) text passes through as is
+_ENUM_VALUES = {
+    **{member.name: member.value for member in TicketStatus},
+    **{member.name: member.value for member in ScanType},
+}
+
+
+_ENUM_COLUMNS = {"status", "scan_type"}
+
+
+def _value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _enum_value(value):
+    return _ENUM_VALUES.get(value, value)
+
+
+def _converters(names: Sequence[str]) -> list:
+    return [_enum_value if name in _ENUM_COLUMNS else _value for name in names]
+
+
+def _convert(converters, values) -> list:
+    return [convert(value) for convert, value in zip(converters, values)]
+
+
+def _csv_chunk(rows: Sequence[Sequence], converters: list, header: Optional[List[str]] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(_convert(converters, row) for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def stream_export(result, fmt: str, include_scans: bool = False) -> AsyncIterator[bytes]:
+    """
+    Encode a streamed export result (from `AsyncSession.stream`).
+
+    CSV has one line per ticket, or per (ticket, scan) with the scan columns
+    empty for unscanned tickets. NDJSON has one object per ticket with a
+    `scans` list when scans are included.
+    """
+    try:
+        encode = _encode_csv if fmt == "csv" else _encode_ndjson
+        async for chunk in encode(result, include_scans):
+            yield chunk
+    finally:
+        # Releases the server-side cursor if the client disconnects mid-stream
+        await result.close()
+
+
+async def _encode_csv(result, include_scans: bool) -> AsyncIterator[bytes]:
+    header = [name for name, _ in TICKET_COLUMNS + (SCAN_COLUMNS if include_scans else [])]
+    converters = _converters(header)
+    yield _csv_chunk([], converters, header)
+    async for partition in result.partitions():
+        yield _csv_chunk(partition, converters)
+
+
+async def _encode_ndjson(result, include_scans: bool) -> AsyncIterator[bytes]:
+    ticket_names = [name for name, _ in TICKET_COLUMNS]
+    scan_names = [name for name, _ in SCAN_COLUMNS]
+    ticket_converters, scan_converters = _converters(ticket_names), _converters(scan_names)
+    width = len(ticket_names)
+    current = None
+    async for partition in result.partitions():
+        lines = []
+        for row in partition:
+            if not include_scans:
+                lines.append(json.dumps(dict(zip(ticket_names, _convert(ticket_converters, row)))))
+                continue
+            # Rows are ordered by ticket: a new ticket id closes the previous object
+            if current is None or current["ticket_id"] != row[0]:
+                if current is not None:
+                    lines.append(json.dumps(current))
+                current = dict(zip(ticket_names, _convert(ticket_converters, row[:width])))
+                current["scans"] = []
+            if row[width] is not None:
+                current["scans"].append(dict(zip(scan_names, _convert(scan_converters, row[width:]))))
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+    if current is not None:
+        yield (json.dumps(current) + "\n").encode()
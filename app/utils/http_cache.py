@@ -0,0 +1,74 @@
+"""
+HTTP validators for ticket and QR responses.
+
+QR images are a pure function of the ticket number, the payload version
+and the requested variant, so their ETags can be computed without loading
+the image. Ticket ids map to ticket numbers forever (until the ticket is
+deleted), which lets repeat requests be answered with 304 before any
+database round trip.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Response
+
+from app.utils.qr_generator import QR_PAYLOAD_VERSION
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+_MAX_TICKET_NUMBERS = 100_000
+_ticket_numbers: "OrderedDict[int, str]" = OrderedDict()
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the given parts."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def qr_etag(ticket_number: str, variant: str) -> str:
+    """ETag for a rendered QR image of a ticket."""
+    return make_etag("qr", ticket_number, QR_PAYLOAD_VERSION, variant)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def cached_ticket_number(ticket_id: int) -> Optional[str]:
+    number = _ticket_numbers.get(ticket_id)
+    if number is not None:
+        _ticket_numbers.move_to_end(ticket_id)
+    return number
+
+
+def remember_ticket_number(ticket_id: int, ticket_number: str) -> None:
+    _ticket_numbers[ticket_id] = ticket_number
+    _ticket_numbers.move_to_end(ticket_id)
+    if len(_ticket_numbers) > _MAX_TICKET_NUMBERS:
+        _ticket_numbers.popitem(last=False)
+
+
+def forget_ticket(ticket_id: Optional[int] = None) -> None:
+    """Drop one ticket from the number map, or all of them when `ticket_id` is None."""
+    if ticket_id is None:
+        _ticket_numbers.clear()
+    else:
+        _ticket_numbers.pop(ticket_id, None)
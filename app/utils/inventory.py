@@ -0,0 +1,170 @@
+"""
+Per-concert ticket inventory counters.
+
+`Concert.tickets_*` hold the number of tickets in each tracked status so
+"sold 4,312 / 5,000" is a single-row read. Every ticket write adjusts them
+with an atomic `UPDATE concerts SET col = col + n` in the same session, so
+the counters commit or roll back together with the ticket change.
+
+If they ever drift (manual SQL, a path that forgot to record a change),
+rebuild them from `tickets`:
+
+    python -m app.utils.inventory              # all concerts
+    python -m app.utils.inventory 3 7          # selected concerts
+    python -m app.utils.inventory --check      # report drift, change nothing
+"""
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.concert import Concert
+from app.models.ticket import Ticket
+
+# Ticket status value -> counter column. "sold" is what mark-sold and
+# transfers write; it counts as a confirmed sale.
+STATUS_COUNTERS = {
+    "sold": "tickets_sold_confirmed",
+    "sold_confirmed": "tickets_sold_confirmed",
+    "verified": "tickets_verified",
+    "transferred": "tickets_transferred",
+}
+COUNTER_COLUMNS = ("tickets_total", "tickets_sold_confirmed", "tickets_verified", "tickets_transferred")
+
+
+def counter_for(status) -> Optional[str]:
+    """Counter column tracking `status` (enum member or value), if any."""
+    return STATUS_COUNTERS.get(getattr(status, "value", status))
+
+
+async def adjust_counters(db: AsyncSession, concert_id: int, deltas: Dict[str, int]) -> None:
+    """Apply counter deltas atomically; zero deltas are skipped."""
+    values = {
+        column: getattr(Concert, column) + delta
+        for column, delta in deltas.items()
+        if delta
+    }
+    if values:
+        await db.execute(update(Concert).where(Concert.id == concert_id).values(**values))
+
+
+async def record_created(db: AsyncSession, concert_id: int, count: int = 1, status=None) -> None:
+    deltas = defaultdict(int, tickets_total=count)
+    column = counter_for(status)
+    if column:
+        deltas[column] += count
+    await adjust_counters(db, concert_id, deltas)
+
+
+async def record_status_change(
+    db: AsyncSession, concert_id: int, old_status, new_status, count: int = 1
+) -> None:
+    deltas = defaultdict(int)
+    old_column, new_column = counter_for(old_status), counter_for(new_status)
+    if old_column == new_column:
+        return
+    if old_column:
+        deltas[old_column] -= count
+    if new_column:
+        deltas[new_column] += count
+    await adjust_counters(db, concert_id, deltas)
+
+
+async def record_deleted(db: AsyncSession, concert_id: int, status) -> None:
+    deltas = defaultdict(int, tickets_total=-1)
+    column = counter_for(status)
+    if column:
+        deltas[column] -= 1
+    await adjust_counters(db, concert_id, deltas)
+
+
+async def count_inventory(db: AsyncSession, concert_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Counters as they should be, computed from `tickets` with one GROUP BY."""
+    query = select(Ticket.concert_id, Ticket.status, func.count()).group_by(Ticket.concert_id, Ticket.status)
+    concerts = select(Concert.id)
+    if concert_ids is not None:
+        concert_ids = list(concert_ids)
+        query = query.filter(Ticket.concert_id.in_(concert_ids))
+        concerts = concerts.filter(Concert.id.in_(concert_ids))
+
+    expected = {
+        concert_id: dict.fromkeys(COUNTER_COLUMNS, 0)
+        for concert_id in (await db.execute(concerts)).scalars()
+    }
+    for concert_id, status, count in await db.execute(query):
+        counters = expected.get(concert_id)
+        if counters is None:
+            continue
+        counters["tickets_total"] += count
+        column = counter_for(status)
+        if column:
+            counters[column] += count
+    return expected
+
+
+async def repair_inventory(
+    db: AsyncSession,
+    concert_ids: Optional[Iterable[int]] = None,
+    dry_run: bool = False,
+) -> Dict[int, Dict[str, tuple]]:
+    """
+    Recompute the counters from `tickets` and fix any that drifted.
+
+    Returns {concert_id: {column: (stored, actual)}} for the concerts that
+    were wrong. Nothing is written when `dry_run` is set.
+    """
+    expected = await count_inventory(db, concert_ids)
+    stored = await db.execute(
+        select(Concert.id, *(getattr(Concert, column) for column in COUNTER_COLUMNS))
+        .filter(Concert.id.in_(list(expected)))
+    )
+    drift = {}
+    for row in stored:
+        concert_id, values = row[0], dict(zip(COUNTER_COLUMNS, row[1:]))
+        diff = {
+            column: (values[column], expected[concert_id][column])
+            for column in COUNTER_COLUMNS
+            if values[column] != expected[concert_id][column]
+        }
+        if diff:
+            drift[concert_id] = diff
+            if not dry_run:
+                await db.execute(
+                    update(Concert).where(Concert.id == concert_id).values(**expected[concert_id])
+                )
+    if not dry_run:
+        await db.commit()
+    return drift
+
+
+async def _main(concert_ids, dry_run) -> int:
+    from app.database import async_session, engine
+
+    try:
+        async with async_session() as db:
+            drift = await repair_inventory(db, concert_ids or None, dry_run=dry_run)
+    finally:
+        await engine.dispose()
+    for concert_id, diff in sorted(drift.items()):
+        changes = ", ".join(f"{column} {old} -> {new}" for column, (old, new) in diff.items())
+        print(f"concert {concert_id}: {changes}")
+    verb = "would be repaired" if dry_run else "repaired"
+    print(f"{len(drift)} concert(s) {verb}")
+    return 1 if dry_run and drift else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild concert inventory counters from tickets")
+    parser.add_argument("concert_ids", nargs="*", type=int, help="Concerts to repair (default: all)")
+    parser.add_argument("--check", action="store_true", help="Only report drift; exit 1 if any")
+    args = parser.parse_args(argv)
+    return asyncio.run(_main(args.concert_ids, args.check))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
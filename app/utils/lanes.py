@@ -0,0 +1,145 @@
+"""
+Priority lanes (bulkheads) for request concurrency.
+
+Every request runs in one lane, holding one of that lane's slots from the
+first byte until its response finished streaming:
+
+- "gate": ticket scans and lookups at the doors. Their slots are reserved,
+  so entry latency does not depend on what the back office is doing.
+- "heavy": ZIP downloads, print sheets, exports, batch creates, CSV
+  uploads and edge sync batches. A few fixed slots bound how much CPU,
+  event loop time and database connections they can take at once.
+- "default": everything else.
+
+Slot counts come from `settings.lane_slots`; a lane missing there is
+unbounded. Their sum should stay below what the database allows, so
+the gate lane's share of connections is always free. A request that
+cannot get a slot within the lane's queue timeout gets 503 + Retry-After.
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from app.settings import settings
+from app.utils.metrics import registry, route_template
+
+GATE, HEAVY, DEFAULT = "gate", "heavy", "default"
+
+# (method, route template) -> lane; everything else runs in DEFAULT
+ROUTE_LANES = {
+    ("POST", "/api/scans/"): GATE,
+    ("GET", "/api/tickets/number/{ticket_number}"): GATE,
+    ("GET", "/api/tickets/{ticket_id}"): GATE,
+    ("GET", "/api/tickets/concert/{concert_id}/qr-codes/download"): HEAVY,
+    ("GET", "/api/tickets/concert/{concert_id}/print-sheets"): HEAVY,
+    ("GET", "/api/concerts/{concert_id}/export"): HEAVY,
+    ("POST", "/api/tickets/batch/create/{concert_id}"): HEAVY,
+    ("POST", "/api/tickets/mark-sold/upload"): HEAVY,
+    ("POST", "/api/sync/changes"): HEAVY,
+}
+
+lane_slots = registry.gauge("lane_slots", "Concurrency slots per lane.", ("lane",))
+lane_in_use = registry.gauge("lane_in_use", "Requests holding a lane slot.", ("lane",))
+lane_waiting = registry.gauge("lane_waiting", "Requests queued for a lane slot.", ("lane",))
+lane_wait_seconds = registry.histogram(
+    "lane_wait_seconds", "Time requests queued for a lane slot.", ("lane",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+lane_rejections_total = registry.counter(
+    "lane_rejections_total", "Requests refused because no lane slot freed up in time.", ("lane",),
+)
+
+
+class LaneFull(Exception):
+    """No slot became free within the lane's queue timeout."""
+
+
+class Lane:
+    """A named semaphore with queueing metrics."""
+
+    def __init__(self, name: str, slots: int, queue_timeout: float):
+        self.name = name
+        self.slots = slots
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(slots)
+        lane_slots.set(slots, lane=name)
+
+    async def acquire(self) -> None:
+        """Take a slot, queueing up to `queue_timeout`; raises LaneFull."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            start = time.perf_counter()
+            lane_waiting.inc(lane=self.name)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                lane_rejections_total.inc(lane=self.name)
+                raise LaneFull(self.name) from None
+            finally:
+                lane_waiting.dec(lane=self.name)
+                lane_wait_seconds.observe(time.perf_counter() - start, lane=self.name)
+        lane_in_use.inc(lane=self.name)
+
+    def release(self) -> None:
+        lane_in_use.dec(lane=self.name)
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def build_lanes() -> Dict[str, Lane]:
+    return {
+        name: Lane(name, slots, settings.lane_queue_timeout_seconds.get(name, 1.0))
+        for name, slots in settings.lane_slots.items()
+    }
+
+
+lanes = build_lanes()
+
+
+def lane_for(scope) -> Optional[Lane]:
+    """The lane a request runs in; None when that lane is unbounded."""
+    route = scope.get("route_template") or route_template(scope)
+    return lanes.get(ROUTE_LANES.get((scope["method"], route), DEFAULT))
+
+
+class LaneMiddleware:
+    """Runs each request inside a slot of its lane; 503 + Retry-After if none frees up."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        lane = lane_for(scope) if scope["type"] == "http" else None
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await lane.acquire()
+        except LaneFull:
+            body = json.dumps({"detail": f"Too many {lane.name} requests in progress"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
@@ -0,0 +1,402 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Keeps counters, gauges and histograms in plain dicts so recording a sample
+is a couple of dict lookups. Everything is rendered on demand by
+`render_metrics()` for the `/metrics` endpoint.
+"""
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def count(self, **labels) -> int:
+        data = self._values.get(self._key(labels))
+        return sum(data[:-1]) if data else 0
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, data in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, fn) -> None:
+        """Register a callable run before each render to refresh gauges."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method", "route"),
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+db_query_seconds_per_request = registry.histogram(
+    "db_query_seconds_per_request", "Time spent in SQL per HTTP request.", ("route",),
+)
+db_queries_total = registry.counter("db_queries_total", "SQL statements executed.")
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "Latency of individual SQL statements.",
+)
+db_connections_checked_out = registry.gauge(
+    "db_connections_checked_out", "Database connections currently checked out of the pool.",
+)
+db_pool_size = registry.gauge("db_pool_size", "Configured pool size (0 for NullPool).")
+db_pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds", "Time to obtain a connection from the pool (queueing plus connect).",
+)
+db_pool_checkout_wait_seconds = registry.gauge(
+    "db_pool_checkout_wait_seconds", "Recent pool checkout time, exponentially decayed (admission control input).",
+)
+event_loop_lag_seconds = registry.gauge(
+    "event_loop_lag_seconds", "Most recent event loop scheduling delay.",
+)
+event_loop_lag_histogram = registry.histogram(
+    "event_loop_lag_histogram_seconds", "Distribution of event loop scheduling delay.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class DecayingAverage:
+    """
+    Exponentially weighted average whose weight also decays with time.
+
+    Without new samples the value falls towards zero with time constant
+    `tau`, so a signal used to shed requests cannot get stuck high just
+    because shedding stopped the samples.
+    """
+
+    def __init__(self, tau: float = 5.0, alpha: float = 0.2):
+        self.tau = tau
+        self.alpha = alpha
+        self._value = 0.0
+        self._at = time.monotonic()
+
+    def value(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return self._value * math.exp(-(now - self._at) / self.tau)
+
+    def observe(self, sample: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._value = self.value(now) * (1 - self.alpha) + sample * self.alpha
+        self._at = now
+
+
+pool_checkout_wait = DecayingAverage()
+
+
+def record_checkout_wait(elapsed: float) -> None:
+    db_pool_checkout_seconds.observe(elapsed)
+    pool_checkout_wait.observe(elapsed)
+
+
+def timed_pool(pool_class):
+    """
+    Subclass `pool_class` so every checkout is timed.
+
+    Pool events fire only after a connection was obtained, so the wait
+    itself is measured around `Pool.connect()`. A subclass (rather than a
+    patched instance) survives `engine.dispose()`, which recreates the pool.
+    """
+    class TimedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                record_checkout_wait(time.perf_counter() - start)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+class RequestStats:
+    """Per-request accumulator filled by the SQLAlchemy hooks."""
+
+    __slots__ = ("method", "route", "status", "queries", "query_time", "statements")
+
+    def __init__(self, method: str = "", route: str = ""):
+        self.method = method
+        self.route = route
+        self.status = 0
+        self.queries = 0
+        self.query_time = 0.0
+        # SQL text -> [executions, total seconds]; parameters are bound
+        # separately, so N+1 loops show up as one statement with a high count.
+        self.statements: Dict[str, list] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.queries += 1
+        self.query_time += elapsed
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+# Callables invoked with the finished RequestStats of every HTTP request. A
+# listener may remove itself while being called (the list is iterated as a copy).
+request_listeners: List[Callable[[RequestStats], None]] = []
+
+
+def route_template(scope) -> str:
+    """
+    Resolve the route path template for a request before it is dispatched.
+
+    Labels use the template (`/api/tickets/{ticket_id}`) rather than the raw
+    path so cardinality stays bounded; unknown paths share one label.
+    """
+    app = scope.get("app")
+    routes = getattr(getattr(app, "router", None), "routes", ())
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = scope["route_template"] = route_template(scope)
+        status_code = 500
+        stats = RequestStats(method, route)
+        token = current_request_stats.set(stats)
+        http_requests_in_flight.inc(method=method, route=route)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+            http_requests_in_flight.dec(method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(stats.queries, route=route)
+            db_query_seconds_per_request.observe(stats.query_time, route=route)
+            stats.status = status_code
+            for listener in list(request_listeners):
+                listener(stats)
+
+
+def instrument_engine(engine) -> None:
+    """Attach query timing and pool checkout hooks to an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        db_queries_total.inc()
+        db_query_duration_seconds.observe(elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        db_connections_checked_out.inc()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        db_connections_checked_out.dec()
+
+    def _collect_pool():
+        size = getattr(sync_engine.pool, "size", None)
+        db_pool_size.set(size() if callable(size) else 0)
+        db_pool_checkout_wait_seconds.set(pool_checkout_wait.value())
+
+    registry.add_collector(_collect_pool)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Measure how late the loop wakes us up; runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        event_loop_lag_seconds.set(lag)
+        event_loop_lag_histogram.observe(lag)
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format."""
+    return registry.render()
@@ -0,0 +1,256 @@
+"""
+Print-ready ticket sheets: N QR codes per page with ticket number and
+concert name, streamed as a multi-page PDF or a ZIP of PNG pages.
+
+Pages are rendered in worker processes (QR encoding is CPU bound) and
+written out in order as soon as each one completes, with at most a small
+window of pages in flight, so memory stays flat regardless of run size.
+"""
+import asyncio
+import io
+import math
+import os
+import zlib
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from app.settings import settings
+from app.utils.qr_generator import make_qr
+
+# numpy, PIL, zipfile and the process pool are loaded on first render
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from PIL import Image
+
+SHEET_FORMATS = {"pdf": "application/pdf", "png": "application/zip"}
+MIN_PER_PAGE, MAX_PER_PAGE = 1, 48
+MIN_DPI, MAX_DPI = 72, 300
+# A4 portrait in inches
+PAGE_WIDTH_IN, PAGE_HEIGHT_IN = 8.27, 11.69
+
+_pool: Optional["ProcessPoolExecutor"] = None
+
+
+def get_print_pool() -> "ProcessPoolExecutor":
+    """Process pool shared by all sheet renders; created on first use."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.print_workers or os.cpu_count())
+    return _pool
+
+
+def shutdown_print_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def grid_for(per_page: int, width: int, height: int) -> Tuple[int, int]:
+    """Columns and rows that fit `per_page` roughly square cells on the page."""
+    columns = max(1, round(math.sqrt(per_page * width / height)))
+    rows = math.ceil(per_page / columns)
+    return columns, rows
+
+
+def render_page(
+    concert_name: str,
+    tickets: List[Tuple[str, str]],
+    per_page: int,
+    dpi: int,
+    fmt: str,
+) -> bytes:
+    """
+    Render one sheet. Runs in a worker process, so it only takes plain values.
+
+    Args:
+        tickets: (ticket_number, qr_payload) pairs for this page
+        fmt: "pdf" returns the raw page object body, "png" returns PNG bytes
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = int(PAGE_WIDTH_IN * dpi), int(PAGE_HEIGHT_IN * dpi)
+    margin = dpi // 2
+    columns, rows = grid_for(per_page, width - 2 * margin, height - 2 * margin)
+    cell_w = (width - 2 * margin) // columns
+    cell_h = (height - 2 * margin) // rows
+    font_size = max(8, dpi // 10)
+    font = ImageFont.load_default(size=font_size)
+    text_h = 2 * font_size + font_size // 2
+
+    page = Image.new("1", (width, height), 1)
+    draw = ImageDraw.Draw(page)
+    for index, (ticket_number, payload) in enumerate(tickets):
+        column, row = index % columns, index // columns
+        x0, y0 = margin + column * cell_w, margin + row * cell_h
+        qr = make_qr(payload, border=2)
+        modules = np.array(qr.get_matrix(), dtype=bool)
+        box = max(1, min(cell_w - font_size, cell_h - text_h - font_size) // len(modules))
+        pixels = ~modules.repeat(box, axis=0).repeat(box, axis=1)
+        qr_x = x0 + (cell_w - pixels.shape[1]) // 2
+        page.paste(Image.fromarray(pixels), (qr_x, y0))
+        text_y = y0 + pixels.shape[0]
+        draw.text((x0 + cell_w // 2, text_y), ticket_number, fill=0, font=font, anchor="ma")
+        draw.text((x0 + cell_w // 2, text_y + font_size + font_size // 4), concert_name[:40],
+                  fill=0, font=font, anchor="ma")
+
+    if fmt == "png":
+        buffered = io.BytesIO()
+        page.save(buffered, format="PNG", compress_level=settings.qr_png_compress_level)
+        return buffered.getvalue()
+    return _pdf_page_payload(page, dpi)
+
+
+def _pdf_page_payload(page: "Image.Image", dpi: int) -> bytes:
+    """Encode a 1-bit page as the bytes PdfStreamWriter embeds as an image XObject."""
+    width, height = page.size
+    header = f"{width} {height} {dpi}\n".encode()
+    return header + zlib.compress(page.tobytes(), 6)
+
+
+class PdfStreamWriter:
+    """
+    Minimal incremental PDF writer: one full-page 1-bit image per page.
+
+    Objects 1 (catalog) and 2 (page tree) are written last, which PDF allows
+    because readers locate objects through the trailing xref table.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets = {}
+        self.next_id = 3
+        self.page_ids = []
+
+    def _emit(self, data: bytes) -> bytes:
+        self.offset += len(data)
+        return data
+
+    def _object(self, obj_id: int, body: bytes) -> bytes:
+        self.offsets[obj_id] = self.offset
+        return self._emit(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def start(self) -> bytes:
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def add_page(self, payload: bytes) -> bytes:
+        header, _, data = payload.partition(b"\n")
+        width, height, dpi = (int(value) for value in header.split())
+        points_w, points_h = width * 72 / dpi, height * 72 / dpi
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        self.page_ids.append(page_id)
+
+        image = (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode "
+            f"/Length {len(data)} >>\nstream\n"
+        ).encode() + data + b"\nendstream"
+        content = f"q {points_w:.2f} 0 0 {points_h:.2f} 0 0 cm /Im0 Do Q".encode()
+        content_obj = f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream"
+        page = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {points_w:.2f} {points_h:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        return (
+            self._object(image_id, image)
+            + self._object(content_id, content_obj)
+            + self._object(page_id, page)
+        )
+
+    def finish(self) -> bytes:
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        out = self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode())
+        out += self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref_offset = self.offset
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, self.next_id):
+            lines.append(f"{self.offsets[obj_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        return out + self._emit("".join(lines).encode())
+
+
+class _DrainableBuffer(io.RawIOBase):
+    """Unseekable sink for zipfile; `drain()` hands over what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_sheets(
+    fetch_page: Callable[[int], Awaitable[List[Tuple[str, str]]]],
+    concert_name: str,
+    fmt: str = "pdf",
+    per_page: int = 12,
+    dpi: int = 300,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the document chunk by chunk.
+
+    `fetch_page(n)` returns the (ticket_number, payload) pairs of page n (an
+    empty list ends the run). Up to `settings.print_pages_in_flight` pages
+    render in parallel; output order always follows page order.
+    """
+    import zipfile
+
+    loop = asyncio.get_running_loop()
+    pool = get_print_pool()
+    window = max(1, settings.print_pages_in_flight)
+    pending = deque()
+    page_number = 0
+    exhausted = False
+
+    async def fill():
+        nonlocal page_number, exhausted
+        while not exhausted and len(pending) < window:
+            tickets = await fetch_page(page_number)
+            if not tickets:
+                exhausted = True
+                break
+            pending.append(loop.run_in_executor(
+                pool, render_page, concert_name, tickets, per_page, dpi, fmt
+            ))
+            page_number += 1
+
+    try:
+        if fmt == "pdf":
+            writer = PdfStreamWriter()
+            yield writer.start()
+            await fill()
+            while pending:
+                payload = await pending.popleft()
+                await fill()
+                yield writer.add_page(payload)
+            yield writer.finish()
+            return
+
+        sink = _DrainableBuffer()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+            await fill()
+            index = 0
+            while pending:
+                png = await pending.popleft()
+                await fill()
+                index += 1
+                archive.writestr(f"sheet_{index:05d}.png", png)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        # Client went away mid-stream: don't leave queued pages rendering
+        for future in pending:
+            future.cancel()
@@ -1,46 +1,228 @@
-import qrcode
 import json
+from functools import lru_cache
 from io import BytesIO
 import base64
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
+from app.settings import settings
 
-def generate_qr_code(ticket_id: int, ticket_number: str, concert_id: int) -> tuple[str, str]:
-    """
-    Generate QR code for a ticket.
-    
-    Returns:
-        tuple: (qr_code_base64, qr_data_string)
-    """
-    # Create QR data payload
-    qr_data = {
+# qrcode, numpy and PIL are imported inside the functions that use them so
+# the app can start (and serve non-QR routes) without loading them.
+if TYPE_CHECKING:
+    import qrcode
+    from PIL import Image
+
+# "pil": qrcode's PIL image factory; "fast": numpy upscale of the module matrix
+QR_RENDERERS = ("pil", "fast")
+
+# Output formats for rendered variants, in server preference order
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+}
+MIN_SCALE, MAX_SCALE = 1, 40
+
+# Bump when the payload layout or rendering changes; invalidates cached images
+QR_PAYLOAD_VERSION = 1
+
+
+def build_qr_payload(ticket_id: int, ticket_number: str, concert_id: int) -> str:
+    """Return the JSON string encoded into a ticket's QR code."""
+    return json.dumps({
         "ticket_id": ticket_id,
         "ticket_number": ticket_number,
         "concert_id": concert_id,
-    }
-    
-    qr_data_string = json.dumps(qr_data)
-    
-    # Generate QR code
+    })
+
+
+def make_qr(data: str, box_size: int = 10, border: int = 4) -> "qrcode.QRCode":
+    """Encode `data` into a QRCode object (smallest version that fits)."""
+    import qrcode
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
+        box_size=box_size,
+        border=border,
     )
-    qr.add_data(qr_data_string)
+    qr.add_data(data)
     qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to base64
+    return qr
+
+
+def rasterize_qr(qr: "qrcode.QRCode", box_size: Optional[int] = None) -> "Image.Image":
+    """
+    Rasterize the module matrix (quiet zone included) into a mode "1" image.
+
+    Upscales with ndarray.repeat instead of drawing one rectangle per module.
+    """
+    import numpy as np
+    from PIL import Image
+
+    box_size = box_size or qr.box_size
+    modules = np.array(qr.get_matrix(), dtype=bool)
+    pixels = modules.repeat(box_size, axis=0).repeat(box_size, axis=1)
+    return Image.fromarray(~pixels)
+
+
+def render_qr_png(qr: "qrcode.QRCode", renderer: Optional[str] = None) -> bytes:
+    """Render an encoded QR code to PNG bytes with the selected renderer."""
+    renderer = renderer or settings.qr_renderer
+    if renderer not in QR_RENDERERS:
+        raise ValueError(f"Unknown QR renderer {renderer!r}; expected one of {QR_RENDERERS}")
+
     buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    qr_base64 = base64.b64encode(buffered.getvalue()).decode()
-    
+    if renderer == "fast":
+        rasterize_qr(qr).save(buffered, format="PNG", compress_level=settings.qr_png_compress_level)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def render_qr_svg(qr: "qrcode.QRCode", scale: int = 10) -> str:
+    """
+    Render the module matrix as SVG text without touching PIL.
+
+    Each row's runs of dark modules become one path segment, so the document
+    size grows with the number of runs rather than the number of modules.
+    """
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    segments = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                segments.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    pixels = size * scale
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path fill="#000" d="{"".join(segments)}"/></svg>'
+    )
+
+
+@lru_cache(maxsize=2048)
+def render_qr_variant(data: str, fmt: str = "png", scale: int = 10) -> Tuple[bytes, str]:
+    """
+    Encode `data` and render it in the requested format.
+
+    Results are memoized per (data, format, scale); ticket payloads never
+    change, so repeat downloads skip both encoding and rendering.
+
+    Returns:
+        tuple: (content_bytes, media_type)
+    """
+    if fmt not in QR_FORMATS:
+        raise ValueError(f"Unknown QR format {fmt!r}; expected one of {tuple(QR_FORMATS)}")
+    if not MIN_SCALE <= scale <= MAX_SCALE:
+        raise ValueError(f"scale must be between {MIN_SCALE} and {MAX_SCALE}, got {scale}")
+
+    qr = make_qr(data, box_size=scale)
+    if fmt == "svg":
+        return render_qr_svg(qr, scale).encode(), QR_FORMATS[fmt]
+
+    buffered = BytesIO()
+    image = rasterize_qr(qr)
+    if fmt == "webp":
+        # WebP has no 1-bit mode; lossless grayscale keeps the edges exact
+        image.convert("L").save(buffered, format="WEBP", lossless=True, quality=100, method=6)
+    else:
+        image.save(buffered, format="PNG", compress_level=settings.qr_png_compress_level)
+    return buffered.getvalue(), QR_FORMATS[fmt]
+
+
+def negotiate_qr_format(accept: Optional[str]) -> str:
+    """
+    Pick the QR output format for an Accept header.
+
+    Honours q-values; wildcards and unsupported types fall back to PNG.
+    """
+    if not accept:
+        return "png"
+    by_media_type = {media_type: fmt for fmt, media_type in QR_FORMATS.items()}
+    best, best_q = "png", 0.0
+    for item in accept.split(","):
+        media_type, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        fmt = by_media_type.get(media_type.strip().lower())
+        if fmt and q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def render_ticket_qr(
+    ticket_id: int,
+    ticket_number: str,
+    concert_id: int,
+    stored_png: Optional[str],
+    fmt: str = "png",
+    scale: Optional[int] = None,
+) -> Tuple[bytes, str]:
+    """Return (bytes, media_type) for a ticket's QR; `stored_png` is the saved base64 PNG."""
+    if fmt == "png" and scale is None and stored_png:
+        # The stored image is already a PNG; no need to re-encode
+        return base64.b64decode(stored_png), QR_FORMATS["png"]
+    return render_qr_variant(build_qr_payload(ticket_id, ticket_number, concert_id), fmt, scale or 10)
+
+
+def build_qr_zip(tickets: List[Tuple[int, str, int, Optional[str]]], fmt: str, scale: Optional[int]) -> bytes:
+    """
+    ZIP of QR images for (ticket_id, ticket_number, concert_id, stored_png) rows.
+
+    Takes plain values so it can run in a worker process.
+    """
+    import zipfile
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for ticket_id, ticket_number, concert_id, stored_png in tickets:
+            content, _ = render_ticket_qr(ticket_id, ticket_number, concert_id, stored_png, fmt, scale)
+            archive.writestr(f"QR_{ticket_number}.{fmt}", content)
+    return buffer.getvalue()
+
+
+def generate_qr_code(
+    ticket_id: int,
+    ticket_number: str,
+    concert_id: int,
+    renderer: Optional[str] = None,
+) -> tuple[str, str]:
+    """
+    Generate QR code for a ticket.
+
+    Args:
+        renderer: "fast" or "pil"; defaults to settings.qr_renderer
+
+    Returns:
+        tuple: (qr_code_base64, qr_data_string)
+    """
+    qr_data_string = build_qr_payload(ticket_id, ticket_number, concert_id)
+    qr = make_qr(qr_data_string)
+    qr_base64 = base64.b64encode(render_qr_png(qr, renderer)).decode()
+
     return qr_base64, qr_data_string
 
 
+def render_batch_qr_codes(tickets: List[Tuple[int, str]], concert_id: int) -> List[str]:
+    """Base64 PNGs for (ticket_id, ticket_number) pairs (plain values, so it can run in a worker process)."""
+    return [generate_qr_code(ticket_id, number, concert_id)[0] for ticket_id, number in tickets]
+
+
 def decode_qr_data(qr_data_string: str) -> Dict[str, Any]:
     """Decode QR data string back to dictionary."""
     return json.loads(qr_data_string)
@@ -0,0 +1,111 @@
+"""
+Per-request SQL query budget and N+1 detection.
+
+Builds on the per-request statement log kept by `app.utils.metrics`:
+every finished request is checked for statements that were executed
+repeatedly, and tests can capture requests to assert a query budget.
+"""
+import logging
+from contextlib import contextmanager
+from typing import List, Optional
+
+from app.settings import settings
+from app.utils.metrics import RequestStats, registry, request_listeners
+
+logger = logging.getLogger(__name__)
+
+db_repeated_statements_total = registry.counter(
+    "db_repeated_statements_total",
+    "Requests that executed the same SQL statement repeatedly (likely N+1).",
+    ("route",),
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when captured requests issue more SQL than allowed."""
+
+
+def repeated_statements(stats: RequestStats, threshold: Optional[int] = None) -> List[tuple]:
+    """Return (statement, executions) pairs executed at least `threshold` times."""
+    threshold = threshold or settings.repeated_query_threshold
+    return [
+        (statement, entry[0])
+        for statement, entry in stats.statements.items()
+        if entry[0] >= threshold
+    ]
+
+
+def detect_repeated_statements(stats: RequestStats) -> None:
+    """Request listener that logs and counts likely N+1 query patterns."""
+    repeated = repeated_statements(stats)
+    if not repeated:
+        return
+    db_repeated_statements_total.inc(route=stats.route)
+    for statement, count in repeated:
+        logger.warning(
+            "%s %s executed the same statement %d times: %s",
+            stats.method, stats.route, count, " ".join(statement.split())[:200],
+        )
+
+
+def install_detector() -> None:
+    """Enable N+1 detection for every request (idempotent)."""
+    if detect_repeated_statements not in request_listeners:
+        request_listeners.append(detect_repeated_statements)
+
+
+class QueryCapture:
+    """Requests observed while a `capture_queries()` block is active."""
+
+    def __init__(self):
+        self.requests: List[RequestStats] = []
+
+    def __call__(self, stats: RequestStats) -> None:
+        self.requests.append(stats)
+
+    @property
+    def queries(self) -> int:
+        return sum(stats.queries for stats in self.requests)
+
+    def report(self) -> str:
+        lines = []
+        for stats in self.requests:
+            lines.append(f"{stats.method} {stats.route} -> {stats.status}: {stats.queries} queries")
+            for statement, (count, elapsed) in stats.statements.items():
+                lines.append(f"  {count}x {elapsed * 1000:.2f}ms  {' '.join(statement.split())[:160]}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def capture_queries():
+    """Collect the SQL statements of every request finished inside the block."""
+    capture = QueryCapture()
+    request_listeners.append(capture)
+    try:
+        yield capture
+    finally:
+        request_listeners.remove(capture)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, allow_repeats: bool = False):
+    """
+    Fail if the requests made inside the block exceed `max_queries` in total.
+
+    Unless `allow_repeats` is set, any statement repeated within a single
+    request (see `repeated_statements`) fails the block as well.
+
+    Example:
+        with assert_query_budget(2):
+            client.get(f"/api/scans/ticket/{ticket_id}")
+    """
+    with capture_queries() as capture:
+        yield capture
+    if capture.queries > max_queries:
+        raise QueryBudgetExceeded(
+            f"expected at most {max_queries} queries, got {capture.queries}\n{capture.report()}"
+        )
+    if not allow_repeats:
+        for stats in capture.requests:
+            if repeated_statements(stats):
+                raise QueryBudgetExceeded(f"repeated statements detected\n{capture.report()}")
@@ -1,10 +1,78 @@
-import random
-from PIL import Image, ImageDraw
+from functools import lru_cache
 from io import BytesIO
 import base64
 
+# numpy and PIL are imported on first use; only the dev endpoint needs them
 
-def generate_random_qr_pattern(size=29, module_size=10, border=4):
+# Bounds for generated patterns; size covers QR versions 1 (21) to 40 (177)
+MIN_SIZE, MAX_SIZE = 21, 177
+MIN_MODULE_SIZE, MAX_MODULE_SIZE = 1, 40
+MIN_BORDER, MAX_BORDER = 0, 16
+MAX_BATCH = 1000
+
+
+@lru_cache(maxsize=None)
+def _finder():
+    """7x7 finder pattern: black ring, white ring, 3x3 black centre."""
+    import numpy as np
+
+    finder = np.ones((7, 7), dtype=bool)
+    finder[1:6, 1:6] = False
+    finder[2:5, 2:5] = True
+    return finder
+
+
+def validate_params(size=29, module_size=10, border=4):
+    """Raise ValueError if the pattern parameters are outside the supported bounds."""
+    for name, value, low, high in (
+        ("size", size, MIN_SIZE, MAX_SIZE),
+        ("module_size", module_size, MIN_MODULE_SIZE, MAX_MODULE_SIZE),
+        ("border", border, MIN_BORDER, MAX_BORDER),
+    ):
+        if not low <= value <= high:
+            raise ValueError(f"{name} must be between {low} and {high}, got {value}")
+
+
+def random_module_matrix(size=29, count=None, rng=None):
+    """
+    Build random module matrices with the three finder patterns applied.
+
+    Args:
+        size: Number of modules per side
+        count: Number of matrices to build; None returns a single 2-D matrix
+        rng: Optional numpy Generator (for reproducible output)
+
+    Returns:
+        Boolean array of shape (size, size) or (count, size, size); True is black
+    """
+    import numpy as np
+
+    rng = rng or np.random.default_rng()
+    shape = (1 if count is None else count, size, size)
+    modules = rng.integers(0, 2, size=shape, dtype=np.uint8).astype(bool)
+    finder = _finder()
+    modules[:, :7, :7] = finder
+    modules[:, :7, size - 7:] = finder
+    modules[:, size - 7:, :7] = finder
+    return modules[0] if count is None else modules
+
+
+def render_modules(modules, module_size=10, border=4):
+    """
+    Upscale module matrices into 1-bit pixel arrays.
+
+    Accepts a single (size, size) matrix or a (count, size, size) stack and
+    returns white-is-True pixel arrays of the same rank, ready for mode "1".
+    """
+    import numpy as np
+
+    pad = [(0, 0)] * (modules.ndim - 2) + [(border, border), (border, border)]
+    padded = np.pad(modules, pad, constant_values=False)
+    pixels = padded.repeat(module_size, axis=-2).repeat(module_size, axis=-1)
+    return ~pixels
+
+
+def generate_random_qr_pattern(size=29, module_size=10, border=4, rng=None):
     """
     Generate a random QR code-like pattern.
 
@@ -12,71 +80,54 @@ def generate_random_qr_pattern(size=29, module_size=10, border=4):
         size: Number of modules (blocks) per side (default 29 for QR code Version 3)
         module_size: Pixel size of each module/block
         border: Number of quiet zone modules around the pattern
+        rng: Optional numpy Generator
 
     Returns:
-        PIL Image object
+        PIL Image object (mode "1")
     """
-    # Total size including border
-    total_size = size + (border * 2)
-
-    # Create image
-    img_size = total_size * module_size
-    img = Image.new('RGB', (img_size, img_size), 'white')
-    draw = ImageDraw.Draw(img)
-
-    # Create random pattern
-    pattern = [[random.choice([0, 1]) for _ in range(size)] for _ in range(size)]
-
-    # Add position detection patterns (the three corner squares)
-    # Top-left
-    add_position_pattern(pattern, 0, 0)
-    # Top-right
-    add_position_pattern(pattern, size - 7, 0)
-    # Bottom-left
-    add_position_pattern(pattern, 0, size - 7)
-
-    # Draw the pattern
-    for y in range(size):
-        for x in range(size):
-            if pattern[y][x] == 1:
-                x_pos = (x + border) * module_size
-                y_pos = (y + border) * module_size
-                draw.rectangle(
-                    [x_pos, y_pos, x_pos + module_size - 1, y_pos + module_size - 1],
-                    fill='black'
-                )
-
-    return img
+    from PIL import Image
+
+    validate_params(size, module_size, border)
+    modules = random_module_matrix(size, rng=rng)
+    return Image.fromarray(render_modules(modules, module_size, border))
+
+
+def generate_random_qr_batch(count, size=29, module_size=10, border=4, rng=None):
+    """Generate `count` random QR-like images; module matrices are drawn in one vectorized call."""
+    from PIL import Image
+
+    validate_params(size, module_size, border)
+    if not 1 <= count <= MAX_BATCH:
+        raise ValueError(f"count must be between 1 and {MAX_BATCH}, got {count}")
+    modules = random_module_matrix(size, count=count, rng=rng)
+    # Upscale frame by frame: a stacked upscale of a large batch would hold
+    # count * (pixels per image) booleans in memory at once.
+    return [Image.fromarray(render_modules(frame, module_size, border)) for frame in modules]
 
 
 def add_position_pattern(pattern, x_offset, y_offset):
     """Add a QR code position detection pattern (7x7 square pattern)."""
-    # Outer 7x7 black square
+    finder = _finder()
     for y in range(7):
         for x in range(7):
             if y_offset + y < len(pattern) and x_offset + x < len(pattern[0]):
-                pattern[y_offset + y][x_offset + x] = 1
+                pattern[y_offset + y][x_offset + x] = int(finder[y, x])
 
-    # Inner 5x5 white square
-    for y in range(1, 6):
-        for x in range(1, 6):
-            if y_offset + y < len(pattern) and x_offset + x < len(pattern[0]):
-                pattern[y_offset + y][x_offset + x] = 0
 
-    # Center 3x3 black square
-    for y in range(2, 5):
-        for x in range(2, 5):
-            if y_offset + y < len(pattern) and x_offset + x < len(pattern[0]):
-                pattern[y_offset + y][x_offset + x] = 1
+def _to_png(img):
+    buf = BytesIO()
+    img.save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
 
 
 def get_png_bytes(size=29, module_size=10, border=4):
     """Return PNG image bytes for a generated random QR-like pattern."""
-    img = generate_random_qr_pattern(size=size, module_size=module_size, border=border)
-    buf = BytesIO()
-    img.save(buf, format='PNG')
-    buf.seek(0)
-    return buf.getvalue()
+    return _to_png(generate_random_qr_pattern(size=size, module_size=module_size, border=border))
+
+
+def get_png_bytes_batch(count, size=29, module_size=10, border=4):
+    """Return a list of PNG byte strings for `count` random QR-like patterns."""
+    return [_to_png(img) for img in generate_random_qr_batch(count, size, module_size, border)]
 
 
 def get_base64_png(size=29, module_size=10, border=4):
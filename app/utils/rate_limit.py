@@ -0,0 +1,173 @@
+"""
+Per-caller token buckets and load shedding for the expensive route groups.
+
+Each limited route belongs to a group (login, scan, listing, export) with a
+(requests per minute, burst) limit from `settings.rate_limits`. Callers are
+identified like in read routing: by their credentials, or by address when
+anonymous (from X-Forwarded-For behind `settings.trusted_proxy_hops` proxies). Authenticated callers also share a per-address bucket
+`rate_limit_ip_multiplier` times larger, so a script cannot escape its limit
+by rotating tokens, while a venue full of scanners behind one NAT address is
+not throttled as one user.
+
+Independently of the buckets, when the recent pool checkout time
+(`metrics.pool_checkout_wait`) exceeds `settings.admission_checkout_wait_seconds`,
+requests in `settings.admission_shed_groups` get 503 + Retry-After before
+they queue for a connection, so scans keep flowing while the database
+catches up.
+
+All state is per worker; limits are effectively multiplied by the number
+of workers.
+"""
+import json
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from app.settings import settings
+from app.utils.metrics import pool_checkout_wait, registry, route_template
+from app.utils.read_routing import client_address, client_key
+
+# (method, route template) -> group
+ROUTE_GROUPS = {
+    ("POST", "/api/auth/login"): "login",
+    ("POST", "/api/auth/register"): "login",
+    ("POST", "/api/scans/"): "scan",
+    ("GET", "/api/tickets/number/{ticket_number}"): "scan",
+    ("GET", "/api/concerts/"): "listing",
+    ("GET", "/api/concerts/{concert_id}/inventory"): "listing",
+    ("GET", "/api/tickets/concert/{concert_id}"): "listing",
+    ("GET", "/api/scans/ticket/{ticket_id}"): "listing",
+    ("GET", "/api/scans/concert/{concert_id}/attendance"): "listing",
+    ("GET", "/api/scans/concert/{concert_id}/timeline"): "listing",
+    ("GET", "/api/scans/concert/{concert_id}/scanners"): "listing",
+    ("GET", "/api/transfers/pending"): "listing",
+    ("GET", "/api/events"): "listing",
+    ("GET", "/api/concerts/{concert_id}/export"): "export",
+    ("GET", "/api/tickets/concert/{concert_id}/qr-codes/download"): "export",
+    ("GET", "/api/tickets/concert/{concert_id}/print-sheets"): "export",
+}
+
+rate_limit_rejections_total = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests refused before reaching a handler, by route group and reason (rate, overload).",
+    ("group", "reason"),
+)
+
+
+class TokenBucket:
+    """`burst` tokens, refilled at `rate` tokens per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def idle_full(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class RateLimiter:
+    """Token buckets keyed by (group, caller); full idle buckets are dropped when the map grows."""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def take(self, group: str, key: str, per_minute: float, burst: float, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get((group, key))
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            bucket = self._buckets[(group, key)] = TokenBucket(per_minute / 60, burst, now)
+        return bucket.take(now)
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key, bucket in self._buckets.items() if bucket.idle_full(now)]:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_buckets:
+            self._buckets.clear()
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+
+limiter = RateLimiter()
+
+
+def route_group(scope) -> Optional[str]:
+    """Rate limit group of the request's route, if it has one."""
+    route = scope.get("route_template") or route_template(scope)
+    return ROUTE_GROUPS.get((scope["method"], route))
+
+
+def check_request(scope, group: str, now: Optional[float] = None) -> Optional[Tuple[int, float, str]]:
+    """
+    Admission decision for one request of `group`.
+
+    Returns None to admit it, or (status, retry_after_seconds, reason).
+    """
+    if group in settings.admission_shed_groups:
+        wait = pool_checkout_wait.value(now)
+        if wait > settings.admission_checkout_wait_seconds:
+            return 503, max(1.0, wait), "overload"
+
+    limit = settings.rate_limits.get(group)
+    if not limit:
+        return None
+    per_minute, burst = limit
+    authenticated = any(name == b"authorization" for name, _ in scope.get("headers") or ())
+    retry = limiter.take(group, client_key(scope), per_minute, burst, now)
+    if not retry and authenticated:
+        multiplier = settings.rate_limit_ip_multiplier
+        retry = limiter.take(
+            group, "ip:" + client_address(scope), per_minute * multiplier, burst * multiplier, now
+        )
+    if retry:
+        return 429, retry, "rate"
+    return None
+
+
+class RateLimitMiddleware:
+    """Answers 429/503 with Retry-After for requests `check_request` refuses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        group = route_group(scope)
+        refused = check_request(scope, group) if group else None
+        if refused is None:
+            await self.app(scope, receive, send)
+            return
+
+        status, retry_after, reason = refused
+        rate_limit_rejections_total.inc(group=group, reason=reason)
+        detail = "Too many requests" if status == 429 else "Server busy, retry shortly"
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
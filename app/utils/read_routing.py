@@ -0,0 +1,117 @@
+"""
+Read-replica routing with read-your-writes.
+
+When `settings.read_database_url` is set, handlers that depend on
+`get_read_db` run their GETs against the replica. A client that just
+wrote (any successful POST/PUT/PATCH/DELETE) is pinned to the primary for
+`settings.read_your_writes_seconds`, so it never reads data older than its
+own write. Clients are identified by their Authorization header, or their
+address when anonymous (see `client_address` for proxied deployments).
+
+Writes are announced on the cache invalidation bus, so with
+`cache_bus = "postgres"` the pin holds on every worker. If the bus
+reconnects (messages may have been lost) every client is pinned for one
+window.
+"""
+import hashlib
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.settings import settings
+from app.utils.cache import TTLCache, invalidation_channel
+from app.utils.metrics import registry
+
+WRITER_TOPIC = "writers"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+db_read_routing_total = registry.counter(
+    "db_read_routing_total", "Sessions handed to read-only handlers, by database.", ("target",),
+)
+
+recent_writers = TTLCache("recent_writers", ttl=settings.read_your_writes_seconds)
+_pin_everyone_until = 0.0
+
+
+def client_address(scope) -> str:
+    """
+    The caller's address.
+
+    With `settings.trusted_proxy_hops` set, it is taken from X-Forwarded-For,
+    that many entries from the end (each trusted proxy appends the address it
+    received from); entries before it are client-supplied and ignored.
+    """
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        forwarded = [
+            value.decode("latin-1")
+            for name, value in scope.get("headers") or ()
+            if name == b"x-forwarded-for"
+        ]
+        entries = [entry.strip() for entry in ",".join(forwarded).split(",") if entry.strip()]
+        if entries:
+            return entries[-min(hops, len(entries))]
+    client = scope.get("client")
+    return client[0] if client else ""
+
+
+def client_key(scope) -> str:
+    """Short stable digest of the caller's credentials (or address)."""
+    identity = dict(scope.get("headers") or ()).get(b"authorization")
+    if not identity:
+        identity = client_address(scope).encode()
+    return hashlib.blake2b(identity, digest_size=8).hexdigest()
+
+
+def wrote_recently(scope) -> bool:
+    if time.monotonic() < _pin_everyone_until:
+        return True
+    return recent_writers.get(client_key(scope)) is not None
+
+
+def use_replica(scope) -> bool:
+    """Whether a request may read from the replica (safe method, no recent write)."""
+    return scope.get("method") in SAFE_METHODS and not wrote_recently(scope)
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """True for replica sessions; shared caches must not be filled from them."""
+    return db.info.get("replica", False)
+
+
+def record_write(scope) -> None:
+    invalidation_channel.publish(WRITER_TOPIC, client_key(scope))
+
+
+def _on_write(key) -> None:
+    global _pin_everyone_until
+    if key is None:
+        _pin_everyone_until = time.monotonic() + settings.read_your_writes_seconds
+    else:
+        recent_writers.set(key, True)
+
+
+invalidation_channel.subscribe(WRITER_TOPIC, _on_write)
+
+
+class ReadYourWritesMiddleware:
+    """Pins clients to the primary after each successful write (replica configured only)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not settings.read_database_url
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                record_write(scope)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,270 @@
+"""
+Edge -> central replication of scans and ticket status changes.
+
+An edge node logs every scan and ticket transition in `change_events`
+(app.utils.change_log). `push` sends the events after central's watermark
+for that node, in batches, to `POST /api/sync/changes`. Central applies a
+batch and advances the node's watermark in one transaction, so resending a
+batch (after a timeout, a crash, a retry) changes nothing.
+
+Conflicts are settled by a fixed order on ticket states, so the outcome
+does not depend on which edge syncs first (see `state_key`):
+
+- the higher status wins: created < sold, sold_confirmed, transferred < verified;
+- between two verifications the earliest wins (then the lower user id), so
+  verified_at/verified_by tell who let the holder in first;
+- otherwise the later change wins (then the higher status name).
+
+Scans are facts and are all kept: two gates verifying one ticket both show
+up in its scan history.
+
+    python -m app.utils.replication push --central https://central.example --token TOKEN
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.change_event import ChangeEvent, SyncWatermark
+from app.models.scan import Scan, ScanType
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import User
+from app.settings import settings
+from app.utils import inventory
+from app.utils.change_log import SCAN_CREATED, TICKET_STATUS_CHANGED, lock_change_log
+from app.utils.metrics import registry
+from app.utils.scan_rollup import EPOCH, epoch_minute, minute_start, record_scan
+from app.utils.ticket_cache import invalidate_ticket
+
+REPLICATED_TYPES = (SCAN_CREATED, TICKET_STATUS_CHANGED)
+STATUS_RANK = {"created": 0, "sold": 1, "sold_confirmed": 1, "transferred": 1, "verified": 2}
+
+sync_events_total = registry.counter(
+    "sync_events_total",
+    "Replicated change events received on central, by node and result (applied, duplicate, skipped).",
+    ("node", "result"),
+)
+
+
+def state_key(status: str, at: Optional[datetime], user_id: Optional[int]) -> tuple:
+    """Total order on ticket states; the greater state wins a conflict."""
+    moment = (at - EPOCH).total_seconds() if at else 0.0
+    if status == "verified":
+        return (STATUS_RANK[status], -moment, -(user_id or 0), status)
+    return (STATUS_RANK.get(status, -1), moment, 0, status)
+
+
+def _current_key(ticket: Ticket) -> tuple:
+    status = getattr(ticket.status, "value", ticket.status)
+    if status == "verified":
+        return state_key(status, ticket.verified_at, ticket.verified_by_user_id)
+    return state_key(status, ticket.updated_at, None)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def pending_changes(db: AsyncSession, after: int, limit: int, node: Optional[str] = None) -> List[dict]:
+    """`node`'s (default: this node's) replicated events with id > `after`, oldest first, as JSON-ready dicts."""
+    result = await db.execute(
+        select(ChangeEvent)
+        .filter(
+            (ChangeEvent.id > after)
+            & ChangeEvent.type.in_(REPLICATED_TYPES)
+            & (ChangeEvent.node == (node or settings.node_name))
+        )
+        .order_by(ChangeEvent.id)
+        .limit(limit)
+    )
+    return [
+        {"id": event.id, "type": event.type, "created_at": event.created_at.isoformat(), "payload": event.payload}
+        for event in result.scalars()
+    ]
+
+
+async def get_watermark(db: AsyncSession, node: str) -> int:
+    watermark = await db.get(SyncWatermark, node)
+    return watermark.last_event_id if watermark else 0
+
+
+async def apply_changes(db: AsyncSession, node: str, events: List[dict]) -> Dict[str, int]:
+    """
+    Apply one batch of `node`'s events and commit.
+
+    Events at or below the node's watermark were applied before and are
+    ignored (duplicate). Events about tickets or scan types central does not
+    know, and status changes that lose a conflict, are skipped but still
+    advance the watermark. Returns the new watermark and the counts.
+    """
+    watermark = (await db.execute(
+        select(SyncWatermark).filter(SyncWatermark.node == node).with_for_update()
+    )).scalars().first()
+    if watermark is None:
+        watermark = SyncWatermark(node=node, last_event_id=0)
+        db.add(watermark)
+    last_event_id = watermark.last_event_id
+    fresh = sorted((event for event in events if event["id"] > last_event_id), key=lambda e: e["id"])
+    counts = {"applied": 0, "skipped": 0, "duplicate": len(events) - len(fresh)}
+    if not fresh:
+        await db.rollback()
+        if counts["duplicate"]:
+            sync_events_total.inc(counts["duplicate"], node=node, result="duplicate")
+        return {"watermark": last_event_id, **counts}
+
+    numbers = {event["payload"]["ticket_number"] for event in fresh}
+    usernames = {event["payload"].get(field) for event in fresh for field in ("scanned_by", "by")} - {None}
+    tickets = {
+        ticket.ticket_number: ticket
+        for ticket in (await db.execute(
+            select(Ticket).filter(Ticket.ticket_number.in_(numbers)).with_for_update()
+        )).scalars()
+    }
+    user_ids = dict((await db.execute(
+        select(User.username, User.id).filter(User.username.in_(usernames))
+    )).all()) if usernames else {}
+
+    scans, logged, rollup = [], [], Counter()
+    changed = {}  # ticket id -> (ticket, status before this batch)
+    for event in fresh:
+        payload = event["payload"]
+        ticket = tickets.get(payload["ticket_number"])
+        if ticket is None or not _apply_event(event, ticket, user_ids, scans, rollup, changed):
+            counts["skipped"] += 1
+            continue
+        counts["applied"] += 1
+        logged.append({
+            "type": event["type"],
+            "node": settings.node_name,
+            "concert_id": ticket.concert_id,
+            "ticket_number": ticket.ticket_number,
+            "payload": {**payload, "ticket_id": ticket.id, "origin": node},
+            "created_at": _parse_time(event.get("created_at")) or datetime.utcnow(),
+        })
+
+    if scans:
+        await db.execute(insert(Scan), scans)
+    for (concert_id, minute, location, scan_type), count in rollup.items():
+        await record_scan(db, concert_id, minute_start(minute), location, scan_type, count)
+    deltas = defaultdict(lambda: defaultdict(int))
+    for ticket, old_status in changed.values():
+        old_column, new_column = inventory.counter_for(old_status), inventory.counter_for(ticket.status)
+        if old_column != new_column:
+            if old_column:
+                deltas[ticket.concert_id][old_column] -= 1
+            if new_column:
+                deltas[ticket.concert_id][new_column] += 1
+    for concert_id, concert_deltas in deltas.items():
+        await inventory.adjust_counters(db, concert_id, concert_deltas)
+    # Central's own change log includes what the edges did, written as
+    # central's rows (so they are never shipped back) with their origin
+    if logged:
+        await lock_change_log(db)
+        await db.execute(insert(ChangeEvent), logged)
+
+    watermark.last_event_id = last_event_id = fresh[-1]["id"]
+    await db.commit()
+    for ticket_id in changed:
+        invalidate_ticket(ticket_id)
+    for result in ("applied", "skipped", "duplicate"):
+        if counts[result]:
+            sync_events_total.inc(counts[result], node=node, result=result)
+    return {"watermark": last_event_id, **counts}
+
+
+def _apply_event(event, ticket, user_ids, scans, rollup, changed) -> bool:
+    """Stage one event against `ticket`; False when it is not applied here."""
+    payload = event["payload"]
+    if event["type"] == SCAN_CREATED:
+        try:
+            scan_type = ScanType(payload["scan_type"])
+        except ValueError:
+            return False
+        scanned_at = _parse_time(payload["scanned_at"])
+        scans.append({
+            "ticket_id": ticket.id,
+            "scan_type": scan_type,
+            "scanned_at": scanned_at,
+            "scanned_by_user_id": user_ids.get(payload.get("scanned_by")),
+            "location": payload.get("location"),
+            "notes": payload.get("notes"),
+        })
+        rollup[(ticket.concert_id, epoch_minute(scanned_at), payload.get("location") or "", scan_type.value)] += 1
+        return True
+
+    if event["type"] == TICKET_STATUS_CHANGED:
+        try:
+            status = TicketStatus(payload["to"])
+        except ValueError:
+            return False
+        at = _parse_time(payload.get("at")) or datetime.utcnow()
+        user_id = user_ids.get(payload.get("by"))
+        if state_key(status.value, at, user_id) <= _current_key(ticket):
+            return False  # lost the conflict; central keeps its state
+        changed.setdefault(ticket.id, (ticket, ticket.status))
+        ticket.status = status
+        ticket.updated_at = at
+        if status == TicketStatus.VERIFIED:
+            ticket.verified_at = at
+            ticket.verified_by_user_id = user_id
+        return True
+
+    return False
+
+
+async def push(client, batch_size: Optional[int] = None, node: Optional[str] = None, session_factory=None) -> int:
+    """
+    Send this node's pending events to central through `client` (an httpx.AsyncClient
+    with central's base URL and an admin Authorization header). Returns events sent.
+    """
+    if session_factory is None:
+        from app.database import async_session as session_factory
+
+    node = node or settings.node_name
+    batch_size = batch_size or settings.sync_batch_size
+    response = await client.get(f"/api/sync/watermark/{node}")
+    response.raise_for_status()
+    watermark, sent = response.json()["watermark"], 0
+    while True:
+        async with session_factory() as db:
+            events = await pending_changes(db, watermark, batch_size, node)
+        if not events:
+            return sent
+        response = await client.post("/api/sync/changes", json={"node": node, "events": events})
+        response.raise_for_status()
+        watermark = response.json()["watermark"]
+        if watermark < events[-1]["id"]:
+            raise RuntimeError(f"Central did not advance {node}'s watermark past {events[-1]['id']}")
+        sent += len(events)
+
+
+async def _main(args) -> int:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.central, headers=headers, timeout=args.timeout) as client:
+        sent = await push(client, args.batch_size, args.node)
+    print(f"Sent {sent} events to {args.central}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replicate this edge node's scans to the central API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    push_parser = commands.add_parser("push", help="send pending change events")
+    push_parser.add_argument("--central", required=True, help="central API base URL")
+    push_parser.add_argument("--token", required=True, help="admin bearer token on central")
+    push_parser.add_argument("--node", help="defaults to settings.node_name")
+    push_parser.add_argument("--batch-size", type=int, help="defaults to settings.sync_batch_size")
+    push_parser.add_argument("--timeout", type=float, default=60)
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Per-minute scan rollup behind the entry-rate timeline.
+
+`scan_minute_counts` holds one row per (concert, minute, location, scan
+type). `record_scan` upserts into it in the same transaction as the scan
+insert, so timelines aggregate a few rows per minute instead of bucketing
+raw `scans`; coarser buckets are integer arithmetic on the minute column.
+
+Deleted tickets keep their minutes: the timeline shows the scans that
+happened. If the rollup ever drifts (manual SQL, a write path that skipped
+`record_scan`), rebuild it from `scans`:
+
+    python -m app.utils.scan_rollup              # all concerts
+    python -m app.utils.scan_rollup 3 7          # selected concerts
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Integer, String, cast, delete, extract, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanMinuteCount
+from app.models.ticket import Ticket
+
+EPOCH = datetime(1970, 1, 1)
+# Query value -> bucket width in minutes
+TIMELINE_BUCKETS = {"1m": 1, "5m": 5, "15m": 15, "1h": 60}
+TIMELINE_GROUPINGS = ("location", "scan_type")
+
+
+def epoch_minute(moment: datetime) -> int:
+    """Minutes since the Unix epoch for a naive UTC or timezone-aware datetime."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((moment - EPOCH).total_seconds() // 60)
+
+
+def minute_start(minute: int) -> datetime:
+    return EPOCH + timedelta(minutes=minute)
+
+
+def _upsert(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(ScanMinuteCount)
+
+
+async def record_scan(
+    db: AsyncSession, concert_id: int, scanned_at: datetime, location: Optional[str], scan_type, count: int = 1
+) -> None:
+    """Count `count` scans in their minute; a single INSERT ... ON CONFLICT DO UPDATE."""
+    statement = _upsert(db).values(
+        concert_id=concert_id,
+        minute=epoch_minute(scanned_at),
+        location=location or "",
+        scan_type=getattr(scan_type, "value", scan_type),
+        count=count,
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=["concert_id", "minute", "location", "scan_type"],
+        set_={"count": ScanMinuteCount.count + statement.excluded.count},
+    ))
+
+
+async def timeline(
+    db: AsyncSession,
+    concert_id: int,
+    bucket: str = "1m",
+    by: Optional[str] = None,
+    scan_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[tuple]:
+    """
+    Scan counts per bucket, ordered by bucket start.
+
+    Returns (bucket_start, key, count) tuples; `key` is the location or scan
+    type for `by`, else None. Empty buckets are omitted.
+    """
+    width = TIMELINE_BUCKETS[bucket]
+    bucket_column = (ScanMinuteCount.minute // width * width).label("bucket")
+    columns = [bucket_column]
+    group = [bucket_column]
+    if by:
+        key_column = getattr(ScanMinuteCount, by)
+        columns.append(key_column)
+        group.append(key_column)
+    query = (
+        select(*columns, func.sum(ScanMinuteCount.count))
+        .filter(ScanMinuteCount.concert_id == concert_id)
+        .group_by(*group)
+        .order_by(*group)
+    )
+    if scan_type:
+        query = query.filter(ScanMinuteCount.scan_type == scan_type)
+    if start is not None:
+        query = query.filter(ScanMinuteCount.minute >= epoch_minute(start))
+    if end is not None:
+        query = query.filter(ScanMinuteCount.minute < epoch_minute(end))
+
+    points = []
+    for row in await db.execute(query):
+        key = (row[1] or None) if by else None
+        points.append((minute_start(row[0]), key, int(row[-1])))
+    return points
+
+
+def _scan_minute_sql(db: AsyncSession):
+    """SQL expression for the epoch minute of `scans.scanned_at`."""
+    if db.bind.dialect.name == "postgresql":
+        return cast(func.floor(extract("epoch", Scan.scanned_at) / 60), Integer)
+    return cast(func.strftime("%s", Scan.scanned_at), Integer) // 60
+
+
+async def rebuild_scan_rollup(db: AsyncSession, concert_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute the rollup from `scans` with one INSERT ... SELECT; returns rows written."""
+    minute = _scan_minute_sql(db)
+    location = func.coalesce(Scan.location, "")
+    # The Enum column stores member names; the rollup keeps values
+    scan_type = func.lower(cast(Scan.scan_type, String))
+    source = (
+        select(Ticket.concert_id, minute, location, scan_type, func.count())
+        .join(Ticket, Scan.ticket_id == Ticket.id)
+        .group_by(Ticket.concert_id, minute, location, scan_type)
+    )
+    clear = delete(ScanMinuteCount)
+    if concert_ids is not None:
+        concert_ids = list(concert_ids)
+        source = source.filter(Ticket.concert_id.in_(concert_ids))
+        clear = clear.where(ScanMinuteCount.concert_id.in_(concert_ids))
+
+    await db.execute(clear)
+    result = await db.execute(insert(ScanMinuteCount).from_select(
+        ["concert_id", "minute", "location", "scan_type", "count"], source
+    ))
+    await db.commit()
+    return result.rowcount
+
+
+async def _main(concert_ids) -> None:
+    from app.database import async_session, engine
+
+    try:
+        async with async_session() as db:
+            rows = await rebuild_scan_rollup(db, concert_ids or None)
+    finally:
+        await engine.dispose()
+    print(f"{rows} rollup row(s) written")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the per-minute scan rollup from scans")
+    parser.add_argument("concert_ids", nargs="*", type=int, help="Concerts to rebuild (default: all)")
+    args = parser.parse_args(argv)
+    asyncio.run(_main(args.concert_ids))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Scanner operator throughput per concert.
+
+For every user that scanned tickets of a concert: scan count, active
+windows (runs of scans with no gap longer than `idle_minutes`), scans per
+active minute, inter-scan gaps inside those windows, duplicate rate (the
+ticket already had a scan of the same type) and reject rate (attempts
+refused by `create_scan`, see `ScanRejection`).
+
+Gaps, windows and duplicates come from window functions over `scans` in a
+single query. Reports are cached per concert for
+`settings.scanner_report_ttl_seconds` and never invalidated by scans, so
+supervisors polling the report add no work to the scan path.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import Float, case, cast, extract, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.scan import Scan, ScanRejection
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.schemas.scan import ScannerReport, ScannerThroughput, ScannerWindow
+from app.settings import settings
+from app.utils.cache import TTLCache
+
+EPOCH = datetime(1970, 1, 1)
+DEFAULT_IDLE_MINUTES = 5
+
+scanner_report_cache = TTLCache("scanner_reports", ttl=settings.scanner_report_ttl_seconds)
+
+
+def _epoch_seconds(db: AsyncSession, column):
+    if db.bind.dialect.name == "postgresql":
+        return cast(extract("epoch", column), Float)
+    return (func.julianday(column) - 2440587.5) * 86400.0
+
+
+def _timestamp(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=round(seconds, 3))
+
+
+def window_statement(db: AsyncSession, concert_id: int, idle_minutes: float):
+    """One row per (user, active window) with its span, scans, duplicates and gaps."""
+    idle = idle_minutes * 60
+    seconds = _epoch_seconds(db, Scan.scanned_at)
+    ordered = (
+        select(
+            Scan.scanned_by_user_id.label("user_id"),
+            seconds.label("t"),
+            (seconds - func.lag(seconds).over(
+                partition_by=Scan.scanned_by_user_id, order_by=(Scan.scanned_at, Scan.id)
+            )).label("gap"),
+            func.row_number().over(
+                partition_by=(Scan.ticket_id, Scan.scan_type), order_by=(Scan.scanned_at, Scan.id)
+            ).label("nth"),
+        )
+        .join(Ticket, Scan.ticket_id == Ticket.id)
+        .filter(Ticket.concert_id == concert_id)
+        .cte("ordered")
+    )
+    starts_window = case((or_(ordered.c.gap.is_(None), ordered.c.gap > idle), 1), else_=0)
+    windowed = select(
+        ordered,
+        func.sum(starts_window).over(
+            partition_by=ordered.c.user_id, order_by=ordered.c.t, rows=(None, 0)
+        ).label("window"),
+    ).cte("windowed")
+    gap = case((windowed.c.gap <= idle, windowed.c.gap), else_=None)
+    return (
+        select(
+            windowed.c.user_id,
+            func.min(windowed.c.t),
+            func.max(windowed.c.t),
+            func.count(),
+            func.sum(case((windowed.c.nth > 1, 1), else_=0)),
+            func.sum(gap),
+            func.count(gap),
+            func.max(gap),
+        )
+        .group_by(windowed.c.user_id, windowed.c.window)
+        .order_by(windowed.c.user_id, windowed.c.window)
+    )
+
+
+async def build_scanner_report(
+    db: AsyncSession, concert_id: int, idle_minutes: float = DEFAULT_IDLE_MINUTES
+) -> ScannerReport:
+    """Compute the report with three queries (windows, rejections, usernames)."""
+    stats: Dict[Optional[int], dict] = {}
+
+    def entry(user_id):
+        if user_id not in stats:
+            stats[user_id] = {
+                "scans": 0, "duplicates": 0, "rejected": 0, "active": 0.0,
+                "gap_total": 0.0, "gap_count": 0, "gap_max": None, "windows": [],
+            }
+        return stats[user_id]
+
+    rows = await db.execute(window_statement(db, concert_id, idle_minutes))
+    for user_id, first, last, scans, duplicates, gap_total, gap_count, gap_max in rows:
+        user = entry(user_id)
+        user["scans"] += scans
+        user["duplicates"] += duplicates or 0
+        user["active"] += last - first
+        user["gap_total"] += gap_total or 0.0
+        user["gap_count"] += gap_count
+        if gap_max is not None:
+            user["gap_max"] = max(user["gap_max"] or 0.0, gap_max)
+        user["windows"].append(ScannerWindow(start=_timestamp(first), end=_timestamp(last), scans=scans))
+
+    rejections = await db.execute(
+        select(ScanRejection.scanned_by_user_id, func.count())
+        .filter(ScanRejection.concert_id == concert_id)
+        .group_by(ScanRejection.scanned_by_user_id)
+    )
+    for user_id, count in rejections:
+        entry(user_id)["rejected"] = count
+
+    user_ids = [user_id for user_id in stats if user_id is not None]
+    usernames = {}
+    if user_ids:
+        usernames = dict((await db.execute(select(User.id, User.username).filter(User.id.in_(user_ids)))).all())
+
+    scanners = []
+    for user_id, user in stats.items():
+        scans, rejected = user["scans"], user["rejected"]
+        # A window with a single scan still took that operator some time
+        active_minutes = max(user["active"] / 60, len(user["windows"]), 1)
+        scanners.append(ScannerThroughput(
+            user_id=user_id,
+            username=usernames.get(user_id),
+            scans=scans,
+            duplicates=user["duplicates"],
+            rejected=rejected,
+            duplicate_rate=user["duplicates"] / scans if scans else 0.0,
+            reject_rate=rejected / (scans + rejected) if scans + rejected else 0.0,
+            scans_per_minute=round(scans / active_minutes, 2),
+            active_seconds=round(user["active"], 1),
+            mean_gap_seconds=round(user["gap_total"] / user["gap_count"], 2) if user["gap_count"] else None,
+            max_gap_seconds=round(user["gap_max"], 2) if user["gap_max"] is not None else None,
+            windows=user["windows"],
+        ))
+    scanners.sort(key=lambda scanner: scanner.scans_per_minute, reverse=True)
+    return ScannerReport(
+        concert_id=concert_id,
+        idle_minutes=idle_minutes,
+        generated_at=datetime.utcnow(),
+        scanners=scanners,
+    )
+
+
+async def get_scanner_report(
+    db: AsyncSession, concert_id: int, idle_minutes: float = DEFAULT_IDLE_MINUTES
+) -> ScannerReport:
+    """Cached `build_scanner_report`; at most `scanner_report_ttl_seconds` old."""
+    key = (concert_id, idle_minutes)
+    report = scanner_report_cache.get(key)
+    if report is None:
+        generation = scanner_report_cache.generation
+        report = await build_scanner_report(db, concert_id, idle_minutes)
+        scanner_report_cache.set(key, report, generation)
+    return report
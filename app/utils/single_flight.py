@@ -0,0 +1,92 @@
+"""
+Single-flight coalescing for idempotent GET handlers.
+
+When many identical requests arrive together (dashboards polling at doors
+open), only the first runs the handler; the rest await its result. The key
+is the handler plus the values of the parameters named in `@coalesce(...)`,
+the caller's user id for per-user handlers, and whether the handler's
+session reads the replica (see app.utils.read_routing), so requests only
+share a result they would have computed identically.
+
+With a `ttl`, a finished result is also reused for that many seconds (a
+micro-cache: staleness is bounded by the ttl, not by invalidation).
+"""
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.settings import settings
+from app.utils.metrics import registry
+from app.utils.read_routing import is_replica_session
+
+single_flight_requests_total = registry.counter(
+    "single_flight_requests_total",
+    "Coalesced handler calls by handler and result (leader, coalesced, cached).",
+    ("handler", "result"),
+)
+
+
+class SingleFlight:
+    """Shares one in-flight call (and optionally its result for `ttl` seconds) per key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, asyncio.Future]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], ttl: float = 0, label: str = "") -> Any:
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                single_flight_requests_total.inc(handler=label, result="cached")
+                return cached[1].result()
+            del self._results[key]
+
+        future = self._calls.get(key)
+        if future is not None:
+            single_flight_requests_total.inc(handler=label, result="coalesced")
+            # Shielded: a follower going away must not cancel the shared call
+            return await asyncio.shield(future)
+
+        single_flight_requests_total.inc(handler=label, result="leader")
+        future = self._calls[key] = asyncio.ensure_future(fn())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+            if ttl > 0 and future.done() and not future.cancelled() and future.exception() is None:
+                self._results[key] = (time.monotonic() + ttl, future)
+
+    def clear(self) -> None:
+        self._results.clear()
+
+
+flights = SingleFlight()
+
+
+def coalesce(*key_params: str, per_user: bool = False, ttl: Optional[float] = None):
+    """
+    Coalesce concurrent calls of a FastAPI handler.
+
+    Args:
+        key_params: handler parameters that identify the result (path/query values)
+        per_user: add `current_user.id` to the key (for handlers whose result depends on the caller)
+        ttl: seconds to reuse a finished result; defaults to settings.single_flight_ttl_seconds
+    """
+    def decorator(handler):
+        label = handler.__name__
+
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            key = (label,) + tuple(kwargs[name] for name in key_params)
+            if per_user:
+                key += (kwargs["current_user"].id,)
+            if "db" in kwargs:
+                # A caller pinned to the primary must not get a replica result
+                key += (is_replica_session(kwargs["db"]),)
+            window = settings.single_flight_ttl_seconds if ttl is None else ttl
+            return await flights.do(key, lambda: handler(**kwargs), window, label)
+
+        return wrapper
+    return decorator
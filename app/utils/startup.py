@@ -0,0 +1,132 @@
+"""
+Cold-start measurement.
+
+In the running app, `install_startup_probe()` records how long after the
+app modules were imported the first HTTP response went out. Run as a
+script, the module starts a fresh interpreter, imports `main` with
+`-X importtime`, sends one request through the ASGI app and reports the
+import time per module and the time to first response:
+
+    python -m app.utils.startup [--path /health] [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from app.utils.metrics import RequestStats, registry, request_listeners
+
+# Modules that should only be imported when a request actually needs them
+LAZY_MODULES = ("qrcode", "PIL", "numpy", "zipfile", "passlib", "argon2", "jose")
+
+_imported_at = time.perf_counter()
+
+app_first_response_seconds = registry.gauge(
+    "app_first_response_seconds",
+    "Seconds from app import to the first completed HTTP response.",
+)
+
+
+def _record_first_response(stats: RequestStats) -> None:
+    app_first_response_seconds.set(time.perf_counter() - _imported_at)
+    request_listeners.remove(_record_first_response)
+
+
+def install_startup_probe() -> None:
+    """Record the time to first response once (idempotent)."""
+    if not app_first_response_seconds._values and _record_first_response not in request_listeners:
+        request_listeners.append(_record_first_response)
+
+
+# Runs in the child interpreter: import the app, serve one request, report.
+_CHILD = """
+import asyncio, json, sys, time
+preloaded = set(sys.modules)
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def first_response(path):
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+    }
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    await main.app(scope, receive, send)
+    return messages[0]["status"]
+
+status = asyncio.run(first_response(sys.argv[1]))
+done = time.perf_counter()
+lazy = json.loads(sys.argv[2])
+print(json.dumps({
+    "import_seconds": imported - start,
+    "first_response_seconds": done - start,
+    "status": status,
+    # zipfile, for one, may already be loaded by site before the app starts
+    "eager_heavy_modules": sorted(m for m in lazy if m in sys.modules and m not in preloaded),
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """Return (cumulative_us, self_us, depth, module) tuples from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        name = module.lstrip()
+        depth = (len(module) - len(name) - 1) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name))
+    return rows
+
+
+def measure_cold_start(path: str = "/health", importtime: bool = True) -> dict:
+    """Start a fresh interpreter and measure import and first-response time."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _CHILD, path, json.dumps(LAZY_MODULES)]
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(cmd, cwd=root, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["modules"] = parse_importtime(result.stderr) if importtime else []
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure application cold start")
+    parser.add_argument("--path", default="/health", help="Path requested as the first response")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = measure_cold_start(args.path)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"import main:        {report['import_seconds'] * 1000:8.1f} ms")
+    print(f"first response:     {report['first_response_seconds'] * 1000:8.1f} ms "
+          f"(GET {args.path} -> {report['status']})")
+    eager = ", ".join(report["eager_heavy_modules"]) or "none"
+    print(f"heavy modules at startup: {eager}")
+    # Direct imports of `main` and below it, one level down; deeper entries
+    # are already part of their parent's cumulative time
+    shallow = [row for row in report["modules"] if row[2] <= 1]
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, depth, module in sorted(shallow, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
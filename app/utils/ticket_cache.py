@@ -0,0 +1,52 @@
+"""
+Cache of ticket number and status per ticket id.
+
+Backs conditional requests on ticket QR endpoints, which only need
+(ticket_number, status) to compute an ETag. Every path that changes a
+ticket's status or deletes it calls `invalidate_ticket()` after committing;
+the same message drops the ticket from the QR ETag number map.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.ticket import Ticket, TicketStatus
+from app.settings import settings
+from app.utils.cache import TTLCache, invalidation_channel
+from app.utils.http_cache import forget_ticket
+
+TICKET_TOPIC = "tickets"
+
+ticket_status_cache = TTLCache("ticket_status", ttl=settings.ticket_status_cache_ttl_seconds)
+
+
+async def get_ticket_status(db: AsyncSession, ticket_id: int) -> Optional[Tuple[str, TicketStatus]]:
+    """Return (ticket_number, status), or None if the ticket does not exist."""
+    entry = ticket_status_cache.get(ticket_id)
+    if entry is not None:
+        return entry
+
+    generation = ticket_status_cache.generation
+    result = await db.execute(
+        select(Ticket.ticket_number, Ticket.status).filter(Ticket.id == ticket_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    entry = (row.ticket_number, row.status)
+    ticket_status_cache.set(ticket_id, entry, generation)
+    return entry
+
+
+def invalidate_ticket(ticket_id: Optional[int] = None) -> None:
+    """Invalidate one ticket, or all tickets, in every subscribed cache."""
+    invalidation_channel.publish(TICKET_TOPIC, ticket_id)
+
+
+def _on_invalidate(ticket_id) -> None:
+    ticket_status_cache.invalidate(ticket_id)
+    forget_ticket(ticket_id)
+
+
+invalidation_channel.subscribe(TICKET_TOPIC, _on_invalidate)
@@ -0,0 +1,223 @@
+"""
+Ticket number generators.
+
+"sequence" (default) numbers tickets from a per-concert counter and maps
+(concert_id, sequence) through a keyed Feistel permutation, so codes are
+unique by construction (no retries, no unique-constraint surprises in a
+batch) yet do not look sequential. The result is written in Crockford
+base32 plus a check symbol: 9 characters for the first 65,536 concerts,
+e.g. "7QK2M9XD4". The check symbol is itself a base32 character, so
+numbers are safe in file names and HTTP headers; it catches every single
+wrong character and every swap of two characters.
+
+"uuid" keeps the original `str(uuid4())[:12].upper()` numbers.
+
+The permutation key (`settings.ticket_number_key`) must never change once
+tickets have been issued: a different key maps new sequences onto
+arbitrary codes, which can collide with issued ones.
+"""
+import hashlib
+import hmac
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.concert import Concert
+from app.settings import settings
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# x^5 + x^2 + 1, primitive: x generates all 31 non-zero elements of GF(32)
+GF32_POLYNOMIAL = 0b100101
+_DECODE = {char: value for value, char in enumerate(CROCKFORD_ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+
+SEQUENCE_BITS = 24  # up to 16.7M tickets per concert
+MIN_BLOCK_BITS = 40  # 8 base32 characters
+FEISTEL_ROUNDS = 4
+
+
+class InvalidTicketNumber(ValueError):
+    """A ticket number is malformed or its check symbol does not match."""
+
+
+class FeistelPermutation:
+    """Keyed bijection on `bits`-bit integers (balanced Feistel network, even `bits`)."""
+
+    def __init__(self, key: bytes, bits: int, rounds: int = FEISTEL_ROUNDS):
+        if bits % 2:
+            raise ValueError("bits must be even")
+        self.key = key
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        self.rounds = rounds
+
+    def _round(self, index: int, value: int) -> int:
+        digest = hmac.new(self.key, bytes([index]) + value.to_bytes(8, "big"), hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], "big") & self.mask
+
+    def encrypt(self, value: int) -> int:
+        left, right = value >> self.half, value & self.mask
+        for index in range(self.rounds):
+            left, right = right, left ^ self._round(index, right)
+        return (left << self.half) | right
+
+    def decrypt(self, value: int) -> int:
+        left, right = value >> self.half, value & self.mask
+        for index in reversed(range(self.rounds)):
+            left, right = right ^ self._round(index, left), left
+        return (left << self.half) | right
+
+
+def block_bits(value: int) -> int:
+    """Smallest permutation width (>= 40, in steps of 10 bits = 2 characters) holding `value`."""
+    bits = MIN_BLOCK_BITS
+    while value >> bits:
+        bits += 10
+    return bits
+
+
+def encode_base32(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def check_symbol(body: str) -> str:
+    """
+    Base32 check character of `body`, so that the digits of body + check,
+    weighted x^n, ..., x^1, 1 over GF(32), sum to zero. The weights are
+    distinct and non-zero for up to 30 body digits, so one wrong character
+    or two swapped characters (the check symbol included) never sum to zero.
+    """
+    check = 0
+    for char in body:
+        check ^= _DECODE[char]
+        check <<= 1  # times x
+        if check & 32:
+            check ^= GF32_POLYNOMIAL
+    return CROCKFORD_ALPHABET[check]
+
+
+def normalize_ticket_number(code: str) -> str:
+    """Uppercase, drop hyphens/spaces and map the ambiguous O, I, L to 0, 1, 1."""
+    code = code.strip().upper().replace("-", "").replace(" ", "")
+    return "".join(CROCKFORD_ALPHABET[_DECODE[char]] if char in _DECODE else char for char in code)
+
+
+def is_legacy_ticket_number(code: str) -> bool:
+    """`str(uuid4())[:12]` numbers ("1A2B3C4D-5E6"), issued before the sequence generator."""
+    return len(code) == 12 and code[8] == "-"
+
+
+class TicketNumberGenerator:
+    """Allocates `count` new ticket numbers for a concert inside the caller's transaction."""
+
+    name = ""
+
+    async def allocate(self, db: AsyncSession, concert_id: int, count: int = 1) -> List[str]:
+        raise NotImplementedError
+
+    def canonical(self, code: str) -> str:
+        """The stored form of a typed or scanned number; raises InvalidTicketNumber."""
+        return code.strip().upper()
+
+
+class UuidTicketNumbers(TicketNumberGenerator):
+    """Legacy random numbers; uniqueness is left to the database constraint."""
+
+    name = "uuid"
+
+    async def allocate(self, db: AsyncSession, concert_id: int, count: int = 1) -> List[str]:
+        return [str(uuid4())[:12].upper() for _ in range(count)]
+
+
+class SequenceTicketNumbers(TicketNumberGenerator):
+    """Per-concert sequence through a keyed permutation, Crockford base32 with check symbol."""
+
+    name = "sequence"
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self._permutations: Dict[int, FeistelPermutation] = {}
+
+    def _permutation(self, bits: int) -> FeistelPermutation:
+        permutation = self._permutations.get(bits)
+        if permutation is None:
+            permutation = self._permutations[bits] = FeistelPermutation(self.key, bits)
+        return permutation
+
+    def format(self, concert_id: int, sequence: int) -> str:
+        if not 0 <= sequence < (1 << SEQUENCE_BITS):
+            raise ValueError(f"sequence {sequence} out of range for concert {concert_id}")
+        plain = (concert_id << SEQUENCE_BITS) | sequence
+        bits = block_bits(plain)
+        body = encode_base32(self._permutation(bits).encrypt(plain), bits // 5)
+        return body + check_symbol(body)
+
+    def parse(self, code: str) -> Tuple[int, int]:
+        """Return (concert_id, sequence); raises InvalidTicketNumber."""
+        code = normalize_ticket_number(code)
+        body, check = code[:-1], code[-1:]
+        if len(body) < MIN_BLOCK_BITS // 5 or len(body) % 2 or any(char not in _DECODE for char in body):
+            raise InvalidTicketNumber(f"malformed ticket number {code!r}")
+        if check_symbol(body) != check:
+            raise InvalidTicketNumber(f"check symbol mismatch in {code!r}")
+        value = 0
+        for char in body:
+            value = value * 32 + _DECODE[char]
+        bits = len(body) * 5
+        plain = self._permutation(bits).decrypt(value)
+        if bits > MIN_BLOCK_BITS and block_bits(plain) != bits:
+            raise InvalidTicketNumber(f"non-canonical ticket number {code!r}")
+        return plain >> SEQUENCE_BITS, plain & ((1 << SEQUENCE_BITS) - 1)
+
+    def canonical(self, code: str) -> str:
+        """Normalized sequence number, checked before any lookup; legacy numbers pass through."""
+        upper = code.strip().upper()
+        if is_legacy_ticket_number(upper):
+            return upper
+        self.parse(code)
+        return normalize_ticket_number(code)
+
+    async def allocate(self, db: AsyncSession, concert_id: int, count: int = 1) -> List[str]:
+        # Reserves the range with one UPDATE ... RETURNING; the concert row stays
+        # locked until commit, so concurrent batches for one concert get disjoint
+        # ranges, and a rollback hands the range back.
+        result = await db.execute(
+            update(Concert)
+            .where(Concert.id == concert_id)
+            .values(ticket_number_seq=Concert.ticket_number_seq + count)
+            .returning(Concert.ticket_number_seq)
+            .execution_options(synchronize_session=False)
+        )
+        last = result.scalar_one()
+        return [self.format(concert_id, sequence) for sequence in range(last - count, last)]
+
+
+def _generators() -> Dict[str, TicketNumberGenerator]:
+    return {
+        "sequence": SequenceTicketNumbers(settings.ticket_number_key.encode()),
+        "uuid": UuidTicketNumbers(),
+    }
+
+
+TICKET_NUMBER_GENERATORS = _generators()
+
+
+def get_ticket_number_generator(name: Optional[str] = None) -> TicketNumberGenerator:
+    name = name or settings.ticket_number_generator
+    try:
+        return TICKET_NUMBER_GENERATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown ticket number generator {name!r}; expected one of {tuple(TICKET_NUMBER_GENERATORS)}"
+        ) from None
+
+
+async def allocate_ticket_numbers(db: AsyncSession, concert_id: int, count: int = 1) -> List[str]:
+    """Allocate `count` ticket numbers with the configured generator."""
+    return await get_ticket_number_generator().allocate(db, concert_id, count)
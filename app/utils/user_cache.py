@@ -0,0 +1,45 @@
+"""
+Cache of authenticated users.
+
+`get_current_user` runs on every authenticated request; the user row is
+looked up by the username in the token, so it is cached per username.
+Anything that changes a user (role, active flag, password) must call
+`invalidate_user()` after committing.
+"""
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.user import User
+from app.settings import settings
+from app.utils.cache import TTLCache, invalidation_channel
+
+USER_TOPIC = "users"
+
+user_cache = TTLCache("users", ttl=settings.user_cache_ttl_seconds)
+
+
+async def get_user_cached(db: AsyncSession, username: str) -> Optional[User]:
+    """Return the user (detached from any session), loading it on a miss."""
+    user = user_cache.get(username)
+    if user is not None:
+        return user
+
+    generation = user_cache.generation
+    result = await db.execute(select(User).filter(User.username == username))
+    user = result.scalars().first()
+    if user is None:
+        return None
+    # Shared across requests, so it must not stay attached to this session
+    db.expunge(user)
+    user_cache.set(username, user, generation)
+    return user
+
+
+def invalidate_user(username: Optional[str] = None) -> None:
+    """Invalidate one user, or all users, in every subscribed cache."""
+    invalidation_channel.publish(USER_TOPIC, username)
+
+
+invalidation_channel.subscribe(USER_TOPIC, user_cache.invalidate)
@@ -0,0 +1 @@
+"""In-process performance benchmarks. Run modules with `python -m benchmarks.<name>`."""
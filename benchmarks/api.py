@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Endpoint benchmark suite driving the FastAPI app in-process over ASGI.
+
+Runs login, scan, ticket lookup, batch creation, attendance and ZIP download
+against a throwaway SQLite database (or --database-url), reports throughput
+and p50/p95/p99 latency as JSON and compares p95 against a checked-in
+baseline.
+
+Usage:
+    python -m benchmarks.api
+    python -m benchmarks.api --iterations 200 --concurrency 4 --output bench.json
+    python -m benchmarks.api --threshold 0.5          # allow 50% p95 regression
+    python -m benchmarks.api --update-baseline        # rewrite benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+PASSWORD = "bench-password"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, wall_time):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / wall_time, 2) if wall_time else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+async def setup_database():
+    from app.database import engine, async_session
+    from app.models.base import Base
+    from app.models.user import User, UserRole
+    from app.utils.auth import get_password_hash
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    hashed = get_password_hash(PASSWORD)
+    async with async_session() as session:
+        session.add_all([
+            User(username="bench_admin", email="admin@bench.local", hashed_password=hashed, role=UserRole.ADMIN),
+            User(username="sales1", email="sales1@bench.local", hashed_password=hashed, role=UserRole.SCANNER),
+        ])
+        await session.commit()
+
+
+async def run_scenario(name, make_request, iterations, concurrency, warmup):
+    """Issue `iterations` requests with `concurrency` workers and summarize latency."""
+    for i in range(warmup):
+        response = await make_request(i)
+        response.raise_for_status()
+
+    latencies = []
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run_suite(args):
+    import httpx
+    from main import app
+
+    await setup_database()
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(username):
+            response = await client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        admin = await login("bench_admin")
+        sales = await login("sales1")
+        response = await client.post(
+            "/api/concerts/",
+            json={"name": "Bench Concert", "date": "2026-01-01T20:00:00", "venue": "Bench Arena"},
+            headers=admin,
+        )
+        response.raise_for_status()
+        concert_id = response.json()["id"]
+        response = await client.post(
+            f"/api/tickets/batch/create/{concert_id}", json={"quantity": args.tickets}, headers=admin
+        )
+        response.raise_for_status()
+        numbers = response.json()["ticket_numbers"]
+        # Scans go to the first 50 tickets; lookups use the rest so every
+        # lookup sees the same (unscanned) row shape.
+        scan_numbers, lookup_numbers = numbers[:50], numbers[50:] or numbers
+        ids = [
+            (await client.get(f"/api/tickets/number/{number}")).json()["id"] for number in scan_numbers
+        ]
+
+        scenarios = {
+            "login": (
+                lambda i: client.post("/api/auth/login", json={"username": "sales1", "password": PASSWORD}),
+                max(1, args.iterations // 10),
+            ),
+            "create_scan": (
+                lambda i: client.post(
+                    "/api/scans/",
+                    json={"ticket_id": ids[i % len(ids)], "scan_type": "sale_confirmation", "location": "gate-a"},
+                    headers=sales,
+                ),
+                args.iterations,
+            ),
+            "ticket_by_number": (
+                lambda i: client.get(f"/api/tickets/number/{lookup_numbers[i % len(lookup_numbers)]}"),
+                args.iterations,
+            ),
+            "batch_create": (
+                lambda i: client.post(
+                    f"/api/tickets/batch/create/{concert_id}", json={"quantity": args.batch_size}, headers=admin
+                ),
+                max(1, args.iterations // 20),
+            ),
+            "attendance": (
+                lambda i: client.get(f"/api/scans/concert/{concert_id}/attendance"),
+                args.iterations,
+            ),
+            "zip_download": (
+                lambda i: client.get(f"/api/tickets/concert/{concert_id}/qr-codes/download", headers=admin),
+                max(1, args.iterations // 20),
+            ),
+        }
+        selected = args.scenarios or list(scenarios)
+        for name in selected:
+            make_request, iterations = scenarios[name]
+            results[name] = await run_scenario(
+                name, make_request, iterations, args.concurrency, warmup=min(2, iterations)
+            )
+            print(f"{name:>18}: {results[name]}", file=sys.stderr)
+
+    from app.database import engine
+    await engine.dispose()
+    return results
+
+
+def compare(results, baseline, default_threshold):
+    """Return a list of human-readable regressions against the baseline p95."""
+    regressions = []
+    thresholds = baseline.get("thresholds", {})
+    for name, result in results.items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if not reference:
+            continue
+        threshold = thresholds.get(name, default_threshold)
+        limit = reference["p95_ms"] * (1 + threshold)
+        if result["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.2f}ms > {limit:.2f}ms "
+                f"(baseline {reference['p95_ms']:.2f}ms +{threshold:.0%})"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--tickets", type=int, default=200, help="tickets created before the run")
+    parser.add_argument("--batch-size", type=int, default=50, help="quantity per batch_create request")
+    parser.add_argument("--scenarios", nargs="*", help="subset of scenarios to run")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed p95 regression as a fraction (per-scenario overrides in baseline)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Must happen before the app (and its engine) is imported
+    os.environ["DATABASE_URL"] = args.database_url or (
+        f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='otf-bench-'), 'bench.db')}"
+    )
+    # The suite logs in far more often than the login bucket allows
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    # batch_create trips the N+1 detector on every request; keep stderr readable
+    logging.getLogger("app.utils.query_budget").setLevel(logging.ERROR)
+
+    results = asyncio.run(run_suite(args))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        existing = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        report["thresholds"] = existing.get("thresholds", {})
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+
+    regressions = []
+    if baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+    report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
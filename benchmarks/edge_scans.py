@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Scans per second on a venue edge node (SQLite), edge profile vs default.
+
+Drives POST /api/scans/ in-process over ASGI with many concurrent gates
+while a dashboard polls attendance, against a throwaway SQLite file. Each
+profile runs in its own process, since the engine is configured at import.
+Failed scans (e.g. "database is locked") are counted, not retried.
+
+Usage:
+    python -m benchmarks.edge_scans
+    python -m benchmarks.edge_scans --scans 5000 --concurrency 32
+    python -m benchmarks.edge_scans --profiles edge --output edge.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.api import PASSWORD, setup_database, summarize
+
+
+async def run_profile(args):
+    import httpx
+    from main import app
+
+    await setup_database()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(username):
+            response = await client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        admin = await login("bench_admin")
+        sales = await login("sales1")
+        response = await client.post(
+            "/api/concerts/",
+            json={"name": "Edge Concert", "date": "2026-01-01T20:00:00", "venue": "Edge Arena"},
+            headers=admin,
+        )
+        response.raise_for_status()
+        concert_id = response.json()["id"]
+        response = await client.post(
+            f"/api/tickets/batch/create/{concert_id}", json={"quantity": args.tickets}, headers=admin
+        )
+        response.raise_for_status()
+        ids = [
+            (await client.get(f"/api/tickets/number/{number}")).json()["id"]
+            for number in response.json()["ticket_numbers"]
+        ]
+
+        latencies, errors = [], {}
+        counter = iter(range(args.scans))
+        done = asyncio.Event()
+
+        async def gate(lane):
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/scans/",
+                    json={"ticket_id": ids[i % len(ids)], "scan_type": "sale_confirmation", "location": f"gate-{lane}"},
+                    headers=sales,
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+        async def dashboard():
+            while not done.is_set():
+                await client.get(f"/api/scans/concert/{concert_id}/attendance")
+                await asyncio.sleep(0.05)
+
+        poller = asyncio.create_task(dashboard())
+        started = time.perf_counter()
+        await asyncio.gather(*(gate(lane) for lane in range(args.concurrency)))
+        wall_time = time.perf_counter() - started
+        done.set()
+        await poller
+
+    from app.database import engine
+    await engine.dispose()
+    result = summarize(latencies, wall_time)
+    result["scans_per_second"] = round((len(latencies) - sum(errors.values())) / wall_time, 2)
+    result["errors"] = errors
+    return result
+
+
+def run_in_subprocess(profile, args):
+    command = [
+        sys.executable, "-m", "benchmarks.edge_scans", "--profiles", profile,
+        "--scans", str(args.scans), "--concurrency", str(args.concurrency), "--tickets", str(args.tickets),
+    ]
+    completed = subprocess.run(
+        command, capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent.parent
+    )
+    return json.loads(completed.stdout)["profiles"][profile]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["edge", "default"], choices=["edge", "default"])
+    parser.add_argument("--scans", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16, help="gates scanning at once")
+    parser.add_argument("--tickets", type=int, default=500, help="tickets created before the run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if len(args.profiles) > 1:
+        for profile in args.profiles:
+            results[profile] = run_in_subprocess(profile, args)
+            print(f"{profile:>8}: {results[profile]}", file=sys.stderr)
+    else:
+        # Must happen before the app (and its engine) is imported
+        os.environ["DATABASE_PROFILE"] = args.profiles[0]
+        os.environ["DATABASE_URL"] = (
+            f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='otf-edge-'), 'edge.db')}"
+        )
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+        logging.getLogger("app.utils.query_budget").setLevel(logging.ERROR)
+        results[args.profiles[0]] = asyncio.run(run_profile(args))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scans": args.scans,
+        "concurrency": args.concurrency,
+        "profiles": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Per-ticket QR render benchmark: qrcode's PIL factory vs the 1-bit rasterizer.
+
+Reports encode time (shared by both paths), render+PNG time and PNG size.
+
+Usage:
+    python -m benchmarks.qr_render
+    python -m benchmarks.qr_render --tickets 2000 --compress-level 9
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.settings import settings  # noqa: E402
+from app.utils.qr_generator import QR_RENDERERS, build_qr_payload, make_qr, render_qr_png  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--compress-level", type=int, help="override settings.qr_png_compress_level")
+    args = parser.parse_args(argv)
+    if args.compress_level is not None:
+        settings.qr_png_compress_level = args.compress_level
+
+    payloads = [build_qr_payload(i, str(uuid4())[:12].upper(), 1) for i in range(args.tickets)]
+
+    start = time.perf_counter()
+    codes = [make_qr(payload) for payload in payloads]
+    encode = (time.perf_counter() - start) / args.tickets
+
+    print(f"{args.tickets} tickets, QR version {codes[0].version}")
+    print(f"encode          {encode * 1000:8.3f} ms/ticket")
+    results = {}
+    for renderer in QR_RENDERERS:
+        start = time.perf_counter()
+        sizes = [len(render_qr_png(qr, renderer)) for qr in codes]
+        elapsed = (time.perf_counter() - start) / args.tickets
+        results[renderer] = elapsed
+        print(f"render {renderer:<8} {elapsed * 1000:8.3f} ms/ticket  {sum(sizes) / len(sizes):8.1f} bytes/ticket")
+    print(f"render speedup  {results['pil'] / results['fast']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: vectorized random QR generator vs the original list/draw loop.
+
+Usage:
+    python -m benchmarks.random_qr
+    python -m benchmarks.random_qr --size 57 --module-size 20 --repeat 20
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils import random_qr  # noqa: E402
+
+
+def legacy_generate(size=29, module_size=10, border=4):
+    """The original implementation: nested lists and one rectangle per module."""
+    total_size = size + (border * 2)
+    img_size = total_size * module_size
+    img = Image.new('RGB', (img_size, img_size), 'white')
+    draw = ImageDraw.Draw(img)
+    pattern = [[random.choice([0, 1]) for _ in range(size)] for _ in range(size)]
+    random_qr.add_position_pattern(pattern, 0, 0)
+    random_qr.add_position_pattern(pattern, size - 7, 0)
+    random_qr.add_position_pattern(pattern, 0, size - 7)
+    for y in range(size):
+        for x in range(size):
+            if pattern[y][x] == 1:
+                x_pos = (x + border) * module_size
+                y_pos = (y + border) * module_size
+                draw.rectangle(
+                    [x_pos, y_pos, x_pos + module_size - 1, y_pos + module_size - 1],
+                    fill='black'
+                )
+    return img
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=29)
+    parser.add_argument("--module-size", type=int, default=10)
+    parser.add_argument("--border", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    params = dict(size=args.size, module_size=args.module_size, border=args.border)
+
+    legacy = best_of(lambda: legacy_generate(**params), args.repeat)
+    vectorized = best_of(lambda: random_qr.generate_random_qr_pattern(**params), args.repeat)
+    batch = best_of(lambda: random_qr.generate_random_qr_batch(args.batch, **params), max(1, args.repeat // 5))
+
+    print(f"params: {params}")
+    print(f"legacy      {legacy * 1000:9.3f} ms/image")
+    print(f"vectorized  {vectorized * 1000:9.3f} ms/image  ({legacy / vectorized:.1f}x)")
+    print(f"batch({args.batch}) {batch / args.batch * 1000:9.3f} ms/image  ({legacy * args.batch / batch:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
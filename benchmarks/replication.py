@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Edge -> central replication throughput on a scan backlog.
+
+Builds a central database with one concert of --tickets tickets and an edge
+change log holding --scans verify scans (each with its status change) that
+never reached central, then drains it with `app.utils.replication.push`
+through the central API in-process over ASGI. Both databases are throwaway
+SQLite files. Reports events and scans per second and the batch latency.
+
+Usage:
+    python -m benchmarks.replication
+    python -m benchmarks.replication --scans 100000 --batch-size 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.api import PASSWORD, setup_database, summarize
+
+NODE = "venue-bench"
+
+
+async def build_backlog(args, edge_url):
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.database import async_session
+    from app.models.change_event import ChangeEvent
+    from app.models.concert import Concert
+    from app.models.ticket import Ticket, TicketStatus
+
+    await setup_database()
+    numbers = [f"BENCH{i:07d}" for i in range(args.tickets)]
+    async with async_session() as db:
+        concert = Concert(name="Replication Concert", date=datetime(2026, 1, 1, 20), venue="Edge Arena",
+                          tickets_total=args.tickets)
+        db.add(concert)
+        await db.flush()
+        await db.execute(insert(Ticket), [
+            {"concert_id": concert.id, "ticket_number": number, "qr_code_data": number, "status": TicketStatus.CREATED}
+            for number in numbers
+        ])
+        await db.commit()
+
+    edge = create_async_engine(edge_url)
+    async with edge.begin() as conn:
+        await conn.run_sync(ChangeEvent.__table__.create)
+    opened = datetime(2026, 1, 1, 18)
+    rows = []
+    for i in range(args.scans):
+        number, at = numbers[i % len(numbers)], (opened + timedelta(milliseconds=40 * i)).isoformat()
+        rows.append({"type": "scan.created", "node": NODE, "ticket_number": number, "payload": {
+            "ticket_number": number, "scan_type": "attendance_verify", "scanned_at": at,
+            "scanned_by": "sales1", "location": f"gate-{i % 8}", "notes": None,
+        }})
+        rows.append({"type": "ticket.status_changed", "node": NODE, "ticket_number": number, "payload": {
+            "ticket_number": number, "from": "created", "to": "verified", "at": at, "by": "sales1",
+        }})
+    async with edge.begin() as conn:
+        for start in range(0, len(rows), 10000):
+            await conn.execute(insert(ChangeEvent), rows[start:start + 10000])
+    return edge, async_sessionmaker(edge)
+
+
+async def run(args):
+    import httpx
+    from main import app
+    from app.utils.replication import push
+
+    edge_url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='otf-edge-'), 'edge.db')}"
+    started = time.perf_counter()
+    edge, edge_session = await build_backlog(args, edge_url)
+    print(f"backlog built in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    latencies = []
+
+    async def timed(request):
+        request.extensions["started"] = time.perf_counter()
+
+    async def record(response):
+        if response.request.url.path == "/api/sync/changes":
+            latencies.append(time.perf_counter() - response.request.extensions["started"])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://central", timeout=None,
+        event_hooks={"request": [timed], "response": [record]},
+    ) as client:
+        response = await client.post("/api/auth/login", json={"username": "bench_admin", "password": PASSWORD})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        started = time.perf_counter()
+        sent = await push(client, args.batch_size, NODE, edge_session)
+        wall_time = time.perf_counter() - started
+        # Draining again finds nothing: central's watermark covers the backlog
+        assert await push(client, args.batch_size, NODE, edge_session) == 0
+
+    from app.database import engine
+    await engine.dispose()
+    await edge.dispose()
+    batches = summarize(latencies, wall_time)
+    return {
+        "events": sent,
+        "seconds": round(wall_time, 2),
+        "events_per_second": round(sent / wall_time, 1),
+        "scans_per_second": round(args.scans / wall_time, 1),
+        "batches": batches["requests"],
+        "batch_p50_ms": batches["p50_ms"],
+        "batch_p95_ms": batches["p95_ms"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=100_000, help="scans in the edge backlog")
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000, help="events per push request")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Must happen before the app (and its engine) is imported
+    os.environ["DATABASE_URL"] = (
+        f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='otf-central-'), 'central.db')}"
+    )
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    logging.getLogger("app.utils.query_budget").setLevel(logging.ERROR)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scans": args.scans,
+        "batch_size": args.batch_size,
+        "result": asyncio.run(run(args)),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Shared pytest fixtures: an in-process app backed by a throwaway SQLite database."""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix="otf-test-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+# The suite drives many requests through one token; test_rate_limit.py enables limiting
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+# Manual scripts that need a running server or the local dev database
+collect_ignore = ["test_api.py", "test_password.py", "test_simple.py", "test_random_qr.py", "test_frontend_qr.py"]
+
+PASSWORD = "test-password"
+
+
+async def _create_schema():
+    from app.database import engine, async_session
+    from app.models.base import Base
+    from app.models.user import User, UserRole
+    from app.utils.auth import get_password_hash
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    hashed = get_password_hash(PASSWORD)
+    async with async_session() as session:
+        session.add_all([
+            User(username="admin", email="admin@test.local", hashed_password=hashed, role=UserRole.ADMIN),
+            User(username="sales1", email="sales1@test.local", hashed_password=hashed, role=UserRole.SCANNER),
+            User(username="verify1", email="verify1@test.local", hashed_password=hashed, role=UserRole.SCANNER),
+        ])
+        await session.commit()
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    asyncio.run(_create_schema())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _login(client, username):
+    response = client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    return _login(client, "admin")
+
+
+@pytest.fixture(scope="session")
+def sales_headers(client):
+    return _login(client, "sales1")
+
+
+@pytest.fixture(scope="session")
+def verify_headers(client):
+    return _login(client, "verify1")
+
+
+@pytest.fixture(scope="session")
+def concert_id(client, admin_headers):
+    response = client.post(
+        "/api/concerts/",
+        json={"name": "Test Concert", "date": "2026-01-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture(scope="session")
+def ticket_numbers(client, admin_headers, concert_id):
+    response = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 5}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["ticket_numbers"]
+
+
+
+
+@pytest.fixture(scope="session")
+def qr_modules():
+    """
+    Read a rendered QR (PNG/WebP bytes or SVG) of `size` x `size` modules back
+    into its module matrix, quiet zone included. Two images encode the same
+    payload exactly when they read back to `make_qr(payload).get_matrix()`.
+    """
+    import io
+    import re
+
+    import numpy as np
+    from PIL import Image
+
+    def read(content: bytes, fmt: str, size: int) -> list:
+        if fmt == "svg":
+            text = content.decode()
+            assert f'viewBox="0 0 {size} {size}"' in text
+            modules = np.zeros((size, size), dtype=bool)
+            for x, y, width in re.findall(r"M(\d+) (\d+)h(\d+)", text):
+                modules[int(y), int(x):int(x) + int(width)] = True
+            return modules.tolist()
+        pixels = np.array(Image.open(io.BytesIO(content)).convert("L")) < 128
+        box, remainder = divmod(pixels.shape[0], size)
+        assert remainder == 0 and pixels.shape[0] == pixels.shape[1], pixels.shape
+        # Every module must be a solid box x box square
+        blocks = pixels.reshape(size, box, size, box)
+        assert (blocks.all(axis=(1, 3)) == blocks.any(axis=(1, 3))).all()
+        return blocks[:, 0, :, 0].tolist()
+
+    return read
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import (
@@ -5,36 +6,26 @@ from app.routes import (
     concert_router,
     ticket_router,
     scan_router,
-    transfer_router
+    transfer_router,
+    metrics_router,
+    sync_router,
+    event_router
 )
+from app.settings import settings
+from app.utils.cache import invalidation_channel, make_transport
+from app.utils.metrics import MetricsMiddleware, monitor_event_loop_lag
+from app.utils.query_budget import install_detector
+from app.utils.print_sheets import shutdown_print_pool
+from app.utils.edge import EdgeWriteMiddleware, writer as edge_writer
+from app.utils.lanes import LaneMiddleware
+from app.utils.rate_limit import RateLimitMiddleware
+from app.utils.read_routing import ReadYourWritesMiddleware
+from app.utils.startup import install_startup_probe
 
 # Simple startup event to ensure db is initialized
 startup_done = False
 
-app = FastAPI(
-    title="Concert Ticket QR System",
-    description="API for managing concert tickets with QR codes, authentication, and attendance tracking",
-    version="2.0.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routes
-app.include_router(auth_router)
-app.include_router(concert_router)
-app.include_router(ticket_router)
-app.include_router(scan_router)
-app.include_router(transfer_router)
-
 
-@app.get("/")
 def read_root():
     """Root endpoint."""
     print("DEBUG: Root endpoint called")
@@ -52,9 +43,91 @@ def read_root():
     }
 
 
-@app.get("/health")
 def health_check():
     """Health check endpoint."""
     print("DEBUG: Health endpoint called")
     return {"status": "healthy"}
 
+
+def create_app() -> FastAPI:
+    """
+    Build the application.
+
+    Heavy dependencies (qrcode, PIL, numpy, zipfile, passlib/argon2,
+    python-jose) are not imported here; the modules that need them load
+    them on first use, so a fresh worker can answer requests sooner.
+    """
+    app = FastAPI(
+        title="Concert Ticket QR System",
+        description="API for managing concert tickets with QR codes, authentication, and attendance tracking",
+        version="2.0.0"
+    )
+
+    # Innermost: edge nodes queue writes for the single writer task while
+    # holding their lane slot, so queued writes stay bounded by the lanes
+    app.add_middleware(EdgeWriteMiddleware)
+    # Only requests that passed the rate limits queue for a lane slot
+    app.add_middleware(LaneMiddleware)
+    # Inside CORS so 429/503 responses still carry the CORS headers
+    app.add_middleware(RateLimitMiddleware)
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Pins writers to the primary when a read replica is configured
+    app.add_middleware(ReadYourWritesMiddleware)
+    # Outermost so latency includes CORS handling
+    app.add_middleware(MetricsMiddleware)
+    install_detector()
+    install_startup_probe()
+
+    # Include routes
+    app.include_router(auth_router)
+    app.include_router(concert_router)
+    app.include_router(ticket_router)
+    app.include_router(scan_router)
+    app.include_router(transfer_router)
+    app.include_router(metrics_router)
+    app.include_router(sync_router)
+    app.include_router(event_router)
+
+    app.add_api_route("/", read_root, methods=["GET"])
+    app.add_api_route("/health", health_check, methods=["GET"])
+
+    @app.on_event("startup")
+    async def start_loop_lag_monitor():
+        """Start sampling event loop lag for /metrics."""
+        app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+    @app.on_event("startup")
+    async def start_cache_bus():
+        """Connect the cache invalidation channel to the other workers, if configured."""
+        invalidation_channel.transport = make_transport(
+            settings.cache_bus, settings.cache_bus_url or settings.database_url
+        )
+        await invalidation_channel.start()
+
+    @app.on_event("shutdown")
+    async def stop_loop_lag_monitor():
+        app.state.loop_lag_task.cancel()
+
+    @app.on_event("shutdown")
+    async def stop_cache_bus():
+        await invalidation_channel.stop()
+
+    @app.on_event("shutdown")
+    async def stop_edge_writer():
+        await edge_writer.stop()
+
+    @app.on_event("shutdown")
+    async def stop_print_workers():
+        shutdown_print_pool()
+
+    return app
+
+
+app = create_app()
@@ -1,3 +1,19 @@
 #!/bin/bash
-cd "c:\Users\Donfrass\Desktop\otf\qr code\backend"
-python -m uvicorn main:app --host 0.0.0.0 --port 8000 --workers 1
+cd "$(dirname "$0")"
+
+# One worker per core by default. In-process caches stay coherent across
+# workers only through the PostgreSQL LISTEN/NOTIFY bus, so several workers
+# need CACHE_BUS=postgres (picked automatically for a PostgreSQL database);
+# anything else runs a single worker.
+WORKERS="${WEB_CONCURRENCY:-$(nproc 2>/dev/null || echo 1)}"
+if [ -z "$CACHE_BUS" ]; then
+    case "$DATABASE_URL" in
+        postgresql*) export CACHE_BUS=postgres ;;
+        *) export CACHE_BUS=local ;;
+    esac
+fi
+if [ "$CACHE_BUS" = "local" ]; then
+    WORKERS=1
+fi
+
+python -m uvicorn main:app --host 0.0.0.0 --port "${PORT:-8000}" --workers "$WORKERS"
@@ -0,0 +1,50 @@
+"""Bulk mark-sold from a CSV upload."""
+from app.settings import settings
+
+
+def _upload(client, headers, text):
+    return client.post(
+        "/api/tickets/mark-sold/upload",
+        files={"file": ("sales.csv", text.encode(), "text/csv")},
+        headers=headers,
+    )
+
+
+def test_bulk_mark_sold_reports_bad_rows(client, admin_headers, concert_id, monkeypatch):
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 5}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    before = client.get(f"/api/concerts/{concert_id}/inventory").json()["sold_confirmed"]
+    # Small chunks so the upload spans several lookups and UPDATEs
+    monkeypatch.setattr(settings, "bulk_sale_chunk_size", 2)
+
+    lines = ["ticket_number,buyer_name,buyer_email,price"]
+    lines += [f"{number},Buyer {i},buyer{i}@example.com,2500" for i, number in enumerate(numbers[:4])]
+    lines += [
+        "NOPE-0000,Ghost,ghost@example.com,100",       # line 6: unknown ticket
+        f"{numbers[0]},Again,again@example.com,100",  # line 7: duplicate in file
+        f"{numbers[4]},No Price,np@example.com,",     # line 8: missing price
+    ]
+    response = _upload(client, admin_headers, "\n".join(lines))
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["processed"], report["updated"]) == (7, 4)
+    assert [(e["row"], e["error"]) for e in report["errors"]] == [
+        (6, "ticket not found"),
+        (7, "duplicate ticket_number in upload"),
+        (8, "price is required"),
+    ]
+    assert client.get(f"/api/concerts/{concert_id}/inventory").json()["sold_confirmed"] == before + 4
+    # The same status a single mark-sold sets
+    assert {client.get(f"/api/tickets/number/{number}").json()["status"] for number in numbers[:4]} == {"sold"}
+
+    # Uploading the same file again sells nothing twice
+    again = _upload(client, admin_headers, "\n".join(lines[:5])).json()
+    assert again["updated"] == 0
+    assert all("not sellable" in e["error"] for e in again["errors"])
+
+
+def test_bulk_mark_sold_requires_columns(client, admin_headers):
+    response = _upload(client, admin_headers, "ticket_number,buyer_name\nX,Y\n")
+    assert response.status_code == 400
+    assert "buyer_email" in response.json()["detail"]
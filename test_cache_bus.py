@@ -0,0 +1,88 @@
+"""Cache invalidation bus: messages reach other workers' caches, and writes invalidate."""
+import asyncio
+
+import pytest
+
+from app.utils.cache import (
+    InvalidationChannel,
+    MemoryBroker,
+    MemoryTransport,
+    PostgresNotifyTransport,
+    TTLCache,
+    make_transport,
+    postgres_dsn,
+)
+from app.utils.query_budget import capture_queries
+
+
+def _worker(broker, name):
+    """A channel plus one subscribed cache, standing in for one uvicorn worker."""
+    channel = InvalidationChannel(MemoryTransport(broker))
+    cache = TTLCache(name, ttl=60)
+    channel.subscribe("concerts", cache.invalidate)
+    asyncio.run(channel.start())
+    return channel, cache
+
+
+def test_publish_reaches_other_workers():
+    broker = MemoryBroker()
+    (channel_a, cache_a), (channel_b, cache_b) = _worker(broker, "a"), _worker(broker, "b")
+    cache_a.set(1, "one")
+    cache_b.set(1, "one")
+    cache_b.set(2, "two")
+
+    channel_a.publish("concerts", 1)
+
+    assert cache_a.get(1) is None
+    assert cache_b.get(1) is None
+    assert cache_b.get(2) == "two"
+
+
+def test_own_messages_are_delivered_once():
+    broker = MemoryBroker()
+    channel, _ = _worker(broker, "a")
+    received = []
+    channel.subscribe("tickets", received.append)
+    channel.publish("tickets", 7)
+    assert received == [7]
+
+
+def test_reset_and_malformed_messages():
+    channel, cache = _worker(MemoryBroker(), "a")
+    cache.set(1, "one")
+    channel._receive("not json")
+    assert cache.get(1) == "one"
+    channel._reset()
+    assert cache.get(1) is None
+
+
+def test_transport_selection():
+    assert make_transport("local", "sqlite+aiosqlite:///x.db") is None
+    transport = make_transport("postgres", "postgresql+asyncpg://u:p@db:5432/app")
+    assert isinstance(transport, PostgresNotifyTransport)
+    assert transport.dsn == "postgresql://u:p@db:5432/app"
+    assert postgres_dsn("postgresql://h/db") == "postgresql://h/db"
+    with pytest.raises(ValueError):
+        make_transport("redis", "")
+
+
+def test_authenticated_user_is_cached(client, admin_headers):
+    client.get("/api/transfers/pending", headers=admin_headers)
+    with capture_queries() as capture:
+        assert client.get("/api/transfers/pending", headers=admin_headers).status_code == 200
+    assert not any("FROM users" in statement for stats in capture.requests for statement in stats.statements)
+
+
+def test_scan_invalidates_ticket_status(client, verify_headers, ticket_numbers):
+    ticket = client.get(f"/api/tickets/number/{ticket_numbers[-1]}").json()
+    etag = client.get(f"/api/tickets/{ticket['id']}/qr-code").headers["ETag"]
+    assert client.get(f"/api/tickets/{ticket['id']}/qr-code", headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.post(
+        "/api/scans/", json={"ticket_id": ticket["id"], "scan_type": "sale_confirmation"}, headers=verify_headers
+    )
+    assert response.status_code == 200
+
+    refreshed = client.get(f"/api/tickets/{ticket['id']}/qr-code", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["status"] == "verified"
@@ -0,0 +1,37 @@
+"""Concert read-through cache: hits skip the database, writes invalidate."""
+from app.utils.concert_cache import concert_cache
+from app.utils.query_budget import assert_query_budget
+
+
+def test_repeat_reads_are_served_from_cache(client, concert_id):
+    client.get(f"/api/concerts/{concert_id}")
+    client.get("/api/concerts/")
+    hits = concert_cache.hits
+    with assert_query_budget(0):
+        assert client.get(f"/api/concerts/{concert_id}").status_code == 200
+        assert client.get("/api/concerts/").status_code == 200
+    assert concert_cache.hits > hits
+
+
+def test_update_invalidates(client, admin_headers, concert_id):
+    client.get(f"/api/concerts/{concert_id}")
+    response = client.put(
+        f"/api/concerts/{concert_id}",
+        json={"name": "Renamed", "date": "2026-01-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert client.get(f"/api/concerts/{concert_id}").json()["name"] == "Renamed"
+    assert any(c["name"] == "Renamed" for c in client.get("/api/concerts/").json())
+
+
+def test_delete_invalidates(client, admin_headers):
+    created = client.post(
+        "/api/concerts/",
+        json={"name": "Doomed", "date": "2026-02-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()
+    assert client.get(f"/api/concerts/{created['id']}").status_code == 200
+    assert client.delete(f"/api/concerts/{created['id']}", headers=admin_headers).status_code == 200
+    assert client.get(f"/api/concerts/{created['id']}").status_code == 404
+    assert all(c["id"] != created["id"] for c in client.get("/api/concerts/").json())
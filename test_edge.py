@@ -0,0 +1,151 @@
+"""Edge profile: SQLite pragmas on connect, writes serialized on one task."""
+import asyncio
+import os
+import tempfile
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.settings import settings
+from app.utils.edge import EdgeWriteMiddleware, SerialWriter, edge_write_wait_seconds, install_pragmas, writer
+
+
+def test_pragmas_applied_on_connect():
+    async def scenario():
+        path = os.path.join(tempfile.mkdtemp(prefix="otf-edge-"), "edge.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        install_pragmas(engine, settings.edge_sqlite_pragmas)
+        try:
+            async with engine.connect() as conn:
+                values = {
+                    name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                    for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+                }
+        finally:
+            await engine.dispose()
+        assert values == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "cache_size": -65536}
+
+    asyncio.run(scenario())
+
+
+def test_writer_runs_jobs_one_at_a_time():
+    async def scenario():
+        writer = SerialWriter("test-writer")
+        running, peak, order = 0, 0, []
+
+        async def job(name):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            order.append(name)
+            running -= 1
+            return name
+
+        async def failing():
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(writer.run(lambda name=name: job(name)) for name in range(5)),
+            writer.run(failing),
+            return_exceptions=True,
+        )
+        assert results[:5] == list(range(5)) and isinstance(results[5], ValueError)
+        assert peak == 1 and order == list(range(5))
+
+        # A caller that gives up mid-write does not cut the write short
+        caller = asyncio.create_task(writer.run(lambda: job("abandoned")))
+        await asyncio.sleep(0.001)
+        caller.cancel()
+        await writer.run(lambda: job("next"))
+        assert order[-2:] == ["abandoned", "next"]
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def _body(data, more=False):
+    return {"type": "http.request", "body": data, "more_body": more}
+
+
+def test_writer_is_not_held_by_slow_uploads_or_clients(monkeypatch):
+    """Only the handler runs on the writer: not the body upload, not the response send."""
+    monkeypatch.setattr(settings, "database_profile", "edge")
+
+    async def echo(scope, receive, send):
+        body, more = b"", True
+        while more:
+            message = await receive()
+            body, more = body + message["body"], message["more_body"]
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    middleware = EdgeWriteMiddleware(echo)
+    scope = {"type": "http", "method": "POST", "route_template": "/api/scans/"}
+
+    async def request(messages, sent, send_gate=None):
+        async def send(message):
+            if send_gate is not None:
+                await send_gate.wait()
+            sent.append(message)
+
+        await middleware(scope, messages.get, send)
+
+    async def scenario():
+        # A slow upload: one chunk now, the rest later
+        upload, upload_sent = asyncio.Queue(), []
+        upload.put_nowait(_body(b"part", more=True))
+        slow_upload = asyncio.create_task(request(upload, upload_sent))
+        # A slow client: the handler is done but the response cannot be sent yet
+        slow, slow_sent, gate = asyncio.Queue(), [], asyncio.Event()
+        slow.put_nowait(_body(b"slow"))
+        slow_client = asyncio.create_task(request(slow, slow_sent, gate))
+        await asyncio.sleep(0.01)
+
+        quick, quick_sent = asyncio.Queue(), []
+        quick.put_nowait(_body(b"quick"))
+        await asyncio.wait_for(request(quick, quick_sent), timeout=1)
+        assert quick_sent[-1]["body"] == b"quick" and not upload_sent and not slow_sent
+
+        upload.put_nowait(_body(b"!"))
+        gate.set()
+        await asyncio.wait_for(asyncio.gather(slow_upload, slow_client), timeout=1)
+        assert upload_sent[-1]["body"] == b"part!" and slow_sent[-1]["body"] == b"slow"
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_scans_on_edge_profile(client, monkeypatch, admin_headers, sales_headers):
+    from main import app
+
+    response = client.post(
+        "/api/concerts/",
+        json={"name": "Edge Concert", "date": "2026-03-01T20:00:00", "venue": "Edge Hall"},
+        headers=admin_headers,
+    )
+    concert = response.json()["id"]
+    response = client.post(f"/api/tickets/batch/create/{concert}", json={"quantity": 20}, headers=admin_headers)
+    ids = [client.get(f"/api/tickets/number/{n}").json()["id"] for n in response.json()["ticket_numbers"]]
+    monkeypatch.setattr(settings, "database_profile", "edge")
+    before = edge_write_wait_seconds.count()
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post(
+                    "/api/scans/",
+                    json={"ticket_id": ticket_id, "scan_type": "sale_confirmation", "location": "Gate E"},
+                    headers=sales_headers,
+                )
+                for ticket_id in ids
+            ))
+
+    responses = asyncio.run(burst())
+    assert [response.status_code for response in responses] == [200] * len(ids)
+    assert edge_write_wait_seconds.count() == before + len(ids)
+    inventory = client.get(f"/api/concerts/{concert}/inventory", headers=admin_headers).json()
+    assert inventory["sold_confirmed"] == len(ids)
@@ -0,0 +1,154 @@
+"""Transactional outbox: events written with their change, paged through GET /api/events."""
+import asyncio
+
+from sqlalchemy.future import select
+
+from app.database import async_session
+from app.models.user import User
+from app.settings import settings
+
+
+def _cursor(client, headers):
+    """Current end of the log: events written after this are the test's own."""
+    after = 0
+    while True:
+        page = client.get("/api/events", params={"after": after, "limit": 5000}, headers=headers).json()
+        after = page["next_after"]
+        if not page["has_more"]:
+            return after
+
+
+def _drain(client, headers, after, **params):
+    events = []
+    while True:
+        response = client.get("/api/events", params={"after": after, **params}, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        events += page["events"]
+        assert page["next_after"] == (page["events"][-1]["id"] if page["events"] else after)
+        after = page["next_after"]
+        if not page["has_more"]:
+            return events, after
+
+
+def test_changes_are_logged_and_paged_in_order(client, admin_headers, verify_headers, concert_id):
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 3}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    ids = [client.get(f"/api/tickets/number/{number}").json()["id"] for number in numbers]
+    start = _cursor(client, admin_headers)
+
+    response = client.post(
+        f"/api/tickets/{ids[0]}/mark-sold",
+        json={"buyer_name": "Ada", "buyer_email": "ada@example.com", "price": 4200},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    scan = {"ticket_id": ids[1], "scan_type": "sale_confirmation"}
+    assert client.post("/api/scans/", json=scan, headers=verify_headers).status_code == 200
+    # A rejected rescan changes nothing, so it logs nothing
+    assert client.post("/api/scans/", json=scan, headers=verify_headers).status_code == 400
+    assert client.delete(f"/api/tickets/{ids[2]}", headers=admin_headers).status_code == 200
+    upload = "ticket_number,buyer_name,buyer_email,price\nNOPE-0000,Ghost,ghost@example.com,100\n"
+    client.post(
+        "/api/tickets/mark-sold/upload",
+        files={"file": ("sales.csv", upload.encode(), "text/csv")},
+        headers=admin_headers,
+    )
+
+    events, end = _drain(client, admin_headers, start, limit=2)
+    assert [(e["type"], e["ticket_number"]) for e in events] == [
+        ("ticket.status_changed", numbers[0]),
+        ("ticket.sold", numbers[0]),
+        ("scan.created", numbers[1]),
+        ("ticket.status_changed", numbers[1]),
+        ("ticket.deleted", numbers[2]),
+    ]
+    assert [e["id"] for e in events] == sorted(e["id"] for e in events)
+    assert {e["node"] for e in events} == {settings.node_name}
+    assert {e["concert_id"] for e in events} == {concert_id}
+    assert events[0]["payload"]["from"] == "created" and events[0]["payload"]["to"] == "sold"
+    assert events[1]["payload"]["buyer_email"] == "ada@example.com"
+    assert events[1]["payload"]["price"] == 4200 and events[1]["payload"]["by"] == "admin"
+    assert events[3]["payload"]["to"] == "verified" and events[3]["payload"]["by"] == "verify1"
+
+    # Resuming from the last cursor finds nothing new; filters narrow the feed
+    assert _drain(client, admin_headers, end) == ([], end)
+    sold, _ = _drain(client, admin_headers, start, type="ticket.sold")
+    assert [e["ticket_number"] for e in sold] == [numbers[0]]
+
+
+def test_bulk_sales_log_each_ticket(client, admin_headers, concert_id):
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 2}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    start = _cursor(client, admin_headers)
+    lines = ["ticket_number,buyer_name,buyer_email,price"]
+    lines += [f"{number},Buyer {i},buyer{i}@example.com,2500" for i, number in enumerate(numbers)]
+    response = client.post(
+        "/api/tickets/mark-sold/upload",
+        files={"file": ("sales.csv", "\n".join(lines).encode(), "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.json()["updated"] == 2
+
+    events, _ = _drain(client, admin_headers, start, concert_id=concert_id)
+    assert [(e["type"], e["ticket_number"]) for e in events] == [
+        ("ticket.status_changed", numbers[0]),
+        ("ticket.sold", numbers[0]),
+        ("ticket.status_changed", numbers[1]),
+        ("ticket.sold", numbers[1]),
+    ]
+    assert events[0]["payload"]["to"] == "sold" and events[1]["payload"]["by"] == "admin"
+
+
+def test_transfers_are_logged(client, admin_headers, sales_headers, verify_headers, concert_id):
+    async def user_ids():
+        async with async_session() as db:
+            rows = await db.execute(select(User.username, User.id).filter(User.username.in_(["sales1", "verify1"])))
+            return dict(rows.all())
+    ids = asyncio.run(user_ids())
+    number = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 1}, headers=admin_headers
+    ).json()["ticket_numbers"][0]
+    ticket_id = client.get(f"/api/tickets/number/{number}").json()["id"]
+    sale = {"buyer_name": "Ada", "buyer_email": "ada@example.com", "price": 4200}
+    assert client.post(f"/api/tickets/{ticket_id}/mark-sold", json=sale, headers=admin_headers).status_code == 200
+    start = _cursor(client, admin_headers)
+
+    def initiate(headers, to_user):
+        response = client.post(
+            "/api/transfers/initiate", json={"ticket_id": ticket_id, "to_user_id": ids[to_user]}, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    accepted = initiate(admin_headers, "sales1")
+    assert client.post(f"/api/transfers/{accepted}/accept", headers=sales_headers).status_code == 200
+    rejected = initiate(sales_headers, "verify1")
+    assert client.post(f"/api/transfers/{rejected}/reject", headers=verify_headers).status_code == 200
+
+    events, _ = _drain(client, admin_headers, start, concert_id=concert_id)
+    assert [(e["type"], e["payload"].get("from"), e["payload"].get("to")) for e in events] == [
+        ("transfer.initiated", None, None),
+        ("ticket.status_changed", "sold", "transferred"),
+        ("transfer.accepted", None, None),
+        ("ticket.status_changed", "transferred", "sold"),
+        ("transfer.initiated", None, None),
+        ("ticket.status_changed", "sold", "transferred"),
+        ("transfer.rejected", None, None),
+        ("ticket.status_changed", "transferred", "sold"),
+    ]
+    assert {e["ticket_number"] for e in events} == {number}
+    transfers = [e["payload"] for e in events if e["type"].startswith("transfer.")]
+    assert [(t["transfer_id"], t["to_user_id"], t["by"]) for t in transfers] == [
+        (accepted, ids["sales1"], "admin"),
+        (accepted, ids["sales1"], "sales1"),
+        (rejected, ids["verify1"], "sales1"),
+        (rejected, ids["verify1"], "verify1"),
+    ]
+
+
+def test_feed_is_admin_only(client, sales_headers):
+    assert client.get("/api/events", headers=sales_headers).status_code == 403
+    assert client.get("/api/events").status_code in (401, 403)
@@ -0,0 +1,49 @@
+"""Streaming concert export in CSV and NDJSON."""
+import csv
+import io
+import json
+
+
+def test_csv_export(client, admin_headers, concert_id, ticket_numbers):
+    response = client.get(f"/api/concerts/{concert_id}/export", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert {row["ticket_number"] for row in rows} >= set(ticket_numbers)
+    assert "scan_id" not in rows[0]
+
+
+def test_ndjson_export_with_scans(client, admin_headers, sales_headers, concert_id):
+    # A ticket of our own: the shared ones must stay unscanned for other tests
+    number = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 1}, headers=admin_headers
+    ).json()["ticket_numbers"][0]
+    ticket = client.get(f"/api/tickets/number/{number}").json()
+    for _ in range(2):
+        client.post(
+            "/api/scans/", json={"ticket_id": ticket["id"], "scan_type": "sale_confirmation"},
+            headers=sales_headers,
+        )
+
+    response = client.get(
+        f"/api/concerts/{concert_id}/export?format=ndjson&include=scans", headers=admin_headers
+    )
+    assert response.status_code == 200
+    tickets = [json.loads(line) for line in response.text.splitlines()]
+    assert len({t["ticket_id"] for t in tickets}) == len(tickets)
+    scanned = next(t for t in tickets if t["ticket_id"] == ticket["id"])
+    assert len(scanned["scans"]) >= 2
+    assert all(s["scan_type"] == "sale_confirmation" for s in scanned["scans"])
+
+
+def test_csv_export_with_scans_has_row_per_scan(client, admin_headers, concert_id):
+    response = client.get(f"/api/concerts/{concert_id}/export?include=scans", headers=admin_headers)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert "scan_id" in rows[0]
+    assert len(rows) >= len({row["ticket_id"] for row in rows})
+
+
+def test_export_rejects_unknown_options(client, admin_headers, concert_id):
+    assert client.get(f"/api/concerts/{concert_id}/export?format=xml", headers=admin_headers).status_code == 400
+    assert client.get(f"/api/concerts/{concert_id}/export?include=refunds", headers=admin_headers).status_code == 400
+    assert client.get("/api/concerts/999999/export", headers=admin_headers).status_code == 404
@@ -0,0 +1,63 @@
+"""ETag revalidation of single QR downloads: 304s, per-variant ETags and Vary."""
+import pytest
+
+from app.utils.http_cache import IMMUTABLE_CACHE_CONTROL, forget_ticket
+
+
+@pytest.fixture(scope="module")
+def ticket_id(client, admin_headers, concert_id):
+    return client.post(f"/api/tickets/create/{concert_id}", headers=admin_headers).json()["id"]
+
+
+def _download(client, ticket_id, params=None, **headers):
+    return client.get(f"/api/tickets/{ticket_id}/download-qr", params=params or {}, headers=headers)
+
+
+def test_download_is_cacheable_and_revalidates(client, ticket_id):
+    response = _download(client, ticket_id)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept"
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        revalidated = _download(client, ticket_id, **{"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.content == b"" and revalidated.headers["etag"] == etag
+        assert revalidated.headers["vary"] == "Accept"
+    assert _download(client, ticket_id, **{"If-None-Match": '"other"'}).status_code == 200
+
+    # Without the in-process ticket number map, one probe query still answers 304
+    forget_ticket()
+    assert _download(client, ticket_id, **{"If-None-Match": etag}).status_code == 304
+    assert _download(client, 10**9, **{"If-None-Match": etag}).status_code == 404
+
+
+def test_etag_depends_on_the_variant(client, ticket_id):
+    variants = [
+        ({}, {}),
+        ({"format": "svg"}, {}),
+        ({"format": "png", "scale": 3}, {}),
+        ({"format": "png", "scale": 4}, {}),
+        ({}, {"Accept": "image/webp"}),
+    ]
+    etags = [_download(client, ticket_id, params, **headers).headers["etag"] for params, headers in variants]
+    assert len(set(etags)) == len(etags)
+    # The negotiated format counts, not how it was asked for
+    assert _download(client, ticket_id, {"format": "webp"}).headers["etag"] == etags[-1]
+    # A cached PNG does not satisfy a request for SVG
+    response = _download(client, ticket_id, {"format": "svg"}, **{"If-None-Match": etags[0]})
+    assert response.status_code == 200 and response.headers["content-type"] == "image/svg+xml"
+
+
+def test_deleted_concert_tickets_are_not_revalidated(client, admin_headers):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Deleted", "date": "2026-07-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    ticket_id = client.post(f"/api/tickets/create/{concert_id}", headers=admin_headers).json()["id"]
+    etag = _download(client, ticket_id).headers["etag"]
+    assert _download(client, ticket_id, **{"If-None-Match": etag}).status_code == 304
+
+    assert client.delete(f"/api/concerts/{concert_id}", headers=admin_headers).status_code == 200
+    assert _download(client, ticket_id, **{"If-None-Match": etag}).status_code == 404
@@ -0,0 +1,85 @@
+"""EXPLAIN checks: the hot queries are answered from an index, not a table scan."""
+import pytest
+from sqlalchemy import create_engine, distinct, func, inspect, select
+
+from app.models import Scan, ScanMinuteCount, Ticket, Transfer
+from app.models.base import Base
+from app.models.scan import ScanType
+from app.models.ticket import TicketStatus
+from app.models.transfer import is_pending
+
+HOT_QUERIES = {
+    "tickets by concert and status": (
+        select(func.count()).select_from(Ticket).filter(
+            (Ticket.concert_id == 1)
+            & Ticket.status.in_([TicketStatus.SOLD_CONFIRMED, TicketStatus.VERIFIED])
+        ),
+        ["ix_tickets_concert_id_status"],
+    ),
+    "attendance scans by concert": (
+        select(func.count(distinct(Scan.ticket_id))).join(Ticket).filter(
+            (Ticket.concert_id == 1) & (Scan.scan_type == ScanType.ATTENDANCE_VERIFY)
+        ),
+        ["ix_tickets_concert_id_status", "ix_scans_ticket_id_scan_type"],
+    ),
+    "scans of a ticket": (
+        select(Scan).filter(Scan.ticket_id == 1),
+        ["ix_scans_ticket_id_scan_type"],
+    ),
+    "pending transfers": (
+        select(Transfer).filter((Transfer.to_user_id == 1) & is_pending()),
+        ["ix_transfers_pending_to_user_id"],
+    ),
+    "ticket by number": (
+        select(Ticket).filter(Ticket.ticket_number == "T-1"),
+        ["sqlite_autoindex_tickets_1"],
+    ),
+    "scan timeline rollup": (
+        select(ScanMinuteCount.minute // 5 * 5, ScanMinuteCount.location, func.sum(ScanMinuteCount.count))
+        .filter((ScanMinuteCount.concert_id == 1) & (ScanMinuteCount.minute >= 29000000))
+        .group_by(ScanMinuteCount.minute // 5 * 5, ScanMinuteCount.location),
+        ["sqlite_autoindex_scan_minute_counts_1"],
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(engine, name):
+    statement, indexes = HOT_QUERIES[name]
+    plan = _plan(engine, statement)
+    for index in indexes:
+        assert f"INDEX {index}" in plan, f"{name}: expected {index}\n{plan}"
+    assert not any(line.startswith("SCAN ") for line in plan.splitlines()), f"{name}: table scan\n{plan}"
+
+
+def test_no_duplicate_indexes(engine):
+    """Every index must differ from the others on its table by its leading columns."""
+    inspector = inspect(engine)
+    for table in inspector.get_table_names():
+        column_sets = [tuple(index["column_names"]) for index in inspector.get_indexes(table)]
+        column_sets += [tuple(u["column_names"]) for u in inspector.get_unique_constraints(table)]
+        for columns in column_sets:
+            prefixes = [other for other in column_sets if other != columns and other[:len(columns)] == columns]
+            assert column_sets.count(columns) == 1 and not prefixes, (table, columns)
+
+
+def test_pending_filter_is_inlined_for_the_partial_index(engine):
+    """A bound status would keep PostgreSQL's generic plans off the partial index."""
+    statement = select(Transfer.id).filter((Transfer.to_user_id == 1) & is_pending())
+    compiled = str(statement.compile(engine, compile_kwargs={"render_postcompile": True}))
+    assert "transfers.status = 'PENDING'" in compiled and "to_user_id = ?" in compiled
@@ -0,0 +1,63 @@
+"""Concert inventory counters follow ticket writes and can be rebuilt from tickets."""
+import asyncio
+
+from sqlalchemy import update
+
+from app.database import async_session
+from app.models.concert import Concert
+from app.utils.inventory import repair_inventory
+
+
+def _inventory(client, concert_id):
+    response = client.get(f"/api/concerts/{concert_id}/inventory")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _new_concert(client, admin_headers, quantity):
+    concert = client.post(
+        "/api/concerts/",
+        json={"name": "Inventory", "date": "2026-03-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert['id']}", json={"quantity": quantity}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    return concert["id"], numbers
+
+
+def test_counters_follow_ticket_writes(client, admin_headers, sales_headers, verify_headers):
+    concert_id, numbers = _new_concert(client, admin_headers, 4)
+    assert _inventory(client, concert_id) == {
+        "concert_id": concert_id, "total": 4, "sold_confirmed": 0, "verified": 0,
+        "transferred": 0, "sold": 0, "available": 4,
+    }
+
+    ids = [client.get(f"/api/tickets/number/{number}").json()["id"] for number in numbers]
+    scan = {"scan_type": "sale_confirmation"}
+    assert client.post("/api/scans/", json={**scan, "ticket_id": ids[0]}, headers=sales_headers).status_code == 200
+    assert client.post("/api/scans/", json={**scan, "ticket_id": ids[1]}, headers=sales_headers).status_code == 200
+    assert client.post("/api/scans/", json={**scan, "ticket_id": ids[1]}, headers=verify_headers).status_code == 200
+    inventory = _inventory(client, concert_id)
+    assert (inventory["sold_confirmed"], inventory["verified"], inventory["sold"]) == (1, 1, 2)
+
+    assert client.delete(f"/api/tickets/{ids[1]}", headers=admin_headers).status_code == 200
+    inventory = _inventory(client, concert_id)
+    assert (inventory["total"], inventory["verified"], inventory["available"]) == (3, 0, 2)
+
+
+def test_repair_rebuilds_drifted_counters(client, admin_headers):
+    concert_id, _ = _new_concert(client, admin_headers, 3)
+
+    async def drift_and_repair():
+        async with async_session() as db:
+            await db.execute(
+                update(Concert).where(Concert.id == concert_id).values(tickets_total=99, tickets_verified=5)
+            )
+            await db.commit()
+            assert await repair_inventory(db, [concert_id], dry_run=True)
+            return await repair_inventory(db, [concert_id])
+
+    drift = asyncio.run(drift_and_repair())
+    assert drift == {concert_id: {"tickets_total": (99, 3), "tickets_verified": (5, 0)}}
+    assert _inventory(client, concert_id)["total"] == 3
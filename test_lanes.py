@@ -0,0 +1,50 @@
+"""Priority lanes: heavy endpoints have fixed slots, gate scans keep their own."""
+import asyncio
+
+import pytest
+
+from app.utils import lanes
+from app.utils.lanes import Lane, LaneFull, lane_rejections_total, lane_wait_seconds
+
+
+def test_lane_queues_then_times_out():
+    async def scenario():
+        lane = Lane("test-lane", slots=1, queue_timeout=0.05)
+        order = []
+
+        async def job(name, hold):
+            async with lane.slot():
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        await asyncio.gather(job("first", 0.02), job("second", 0))
+        assert order == ["first", "second"]
+        assert lane_wait_seconds.count(lane="test-lane") == 1
+
+        await lane.acquire()
+        with pytest.raises(LaneFull):
+            await lane.acquire()
+        lane.release()
+        assert lane_rejections_total.value(lane="test-lane") == 1
+
+    asyncio.run(scenario())
+
+
+def test_full_heavy_lane_does_not_block_scans(client, monkeypatch, admin_headers, sales_headers, concert_id):
+    heavy = Lane("heavy", slots=1, queue_timeout=0.05)
+    monkeypatch.setitem(lanes.lanes, "heavy", heavy)
+    asyncio.run(heavy.acquire())  # a long ZIP download is in progress
+    try:
+        before = lane_rejections_total.value(lane="heavy")
+        response = client.get(f"/api/concerts/{concert_id}/export", headers=admin_headers)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert lane_rejections_total.value(lane="heavy") == before + 1
+
+        response = client.post(
+            "/api/scans/", json={"ticket_id": 999999, "scan_type": "sale_confirmation"}, headers=sales_headers
+        )
+        assert response.status_code == 404
+    finally:
+        heavy.release()
+    assert client.get(f"/api/concerts/{concert_id}/export", headers=admin_headers).status_code == 200
@@ -0,0 +1,61 @@
+"""GET /metrics: Prometheus text format, route-template labels, counters and histograms."""
+import re
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def _scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples, types = {}, {}
+    for line in response.text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"not a sample line: {line!r}"
+        name, labels, value = match.groups()
+        family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+        assert family in types, f"{name} has no # TYPE line before it"
+        samples[(name, frozenset(LABEL.findall(labels or "")))] = float(value)
+    return samples, types
+
+
+def _value(samples, name, **labels):
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+def test_metrics_exposition(client, ticket_numbers):
+    ids = [client.get(f"/api/tickets/number/{number}").json()["id"] for number in ticket_numbers[:2]]
+    before, _ = _scrape(client)
+    for ticket_id in ids:
+        assert client.get(f"/api/tickets/{ticket_id}").status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+    samples, types = _scrape(client)
+
+    route = "/api/tickets/{ticket_id}"
+    assert types["http_requests_total"] == "counter"
+    assert types["http_request_duration_seconds"] == "histogram"
+    ok = {"method": "GET", "route": route, "status": "200"}
+    assert _value(samples, "http_requests_total", **ok) - _value(before, "http_requests_total", **ok) == 2
+    assert _value(samples, "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    # Templates only: no label carries a raw ticket id
+    routes = {value for (_, labels) in samples for key, value in labels if key == "route"}
+    assert not any(f"/api/tickets/{ticket_id}" in routes for ticket_id in ids)
+
+    # Histogram: cumulative buckets ending in +Inf, which equals _count
+    buckets = sorted(
+        (float("inf") if dict(labels)["le"] == "+Inf" else float(dict(labels)["le"]), value)
+        for (name, labels), value in samples.items()
+        if name == "http_request_duration_seconds_bucket" and {("method", "GET"), ("route", route)} <= labels
+    )
+    counts = [value for _, value in buckets]
+    assert buckets[-1][0] == float("inf") and counts == sorted(counts)
+    assert counts[-1] == _value(samples, "http_request_duration_seconds_count", method="GET", route=route)
+    assert _value(samples, "http_request_duration_seconds_sum", method="GET", route=route) > 0
+    assert _value(samples, "db_queries_total") > _value(before, "db_queries_total")
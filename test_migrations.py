@@ -0,0 +1,82 @@
+"""Data migrations run against a SQLite database holding rows written by the app."""
+import importlib.util
+import io
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, insert, select
+
+from app.models import Concert, Ticket
+from app.models.base import Base
+from app.models.ticket import TicketStatus
+
+VERSIONS = Path(__file__).resolve().parent / "alembic" / "versions"
+
+
+def _migration(name):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(connection, step):
+    with Operations.context(MigrationContext.configure(connection)):
+        step()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_inventory_backfill_counts_stored_statuses(engine):
+    migration = _migration("003_concert_inventory_counters")
+    statuses = [TicketStatus.CREATED, TicketStatus.SOLD, TicketStatus.SOLD_CONFIRMED, TicketStatus.SOLD_CONFIRMED,
+                TicketStatus.VERIFIED, TicketStatus.TRANSFERRED]
+    with engine.begin() as connection:
+        # The schema as it was before 003
+        for column in migration.COUNTERS:
+            connection.exec_driver_sql(f"ALTER TABLE concerts DROP COLUMN {column}")
+        connection.exec_driver_sql(
+            "INSERT INTO concerts (id, name, date, venue) VALUES (1, 'Backfill', '2026-01-01 20:00:00', 'Hall')"
+        )
+        # Through the model, so statuses are stored the way the app stores them
+        connection.execute(insert(Ticket), [
+            {"concert_id": 1, "ticket_number": f"B{i}", "qr_code_data": f"B{i}", "status": status}
+            for i, status in enumerate(statuses)
+        ])
+        _run(connection, migration.upgrade)
+        counters = connection.execute(select(
+            Concert.tickets_total, Concert.tickets_sold_confirmed, Concert.tickets_verified, Concert.tickets_transferred
+        )).one()
+    assert tuple(counters) == (6, 3, 1, 1)
+
+
+def _postgresql_sql(step) -> str:
+    buffer = io.StringIO()
+    context = MigrationContext.configure(dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buffer})
+    with Operations.context(context):
+        step()
+    return buffer.getvalue()
+
+
+def test_ticket_status_values_added_on_postgresql():
+    sql = _postgresql_sql(_migration("008_ticket_status_values").upgrade)
+    for value in ("SOLD", "TRANSFERRED"):
+        assert f"ALTER TYPE ticketstatus ADD VALUE IF NOT EXISTS '{value}'" in sql
+        assert value in TicketStatus.__members__
+
+
+def test_pending_transfers_partial_index():
+    sql = _postgresql_sql(_migration("009_partial_indexes").upgrade)
+    assert (
+        "CREATE INDEX CONCURRENTLY ix_transfers_pending_to_user_id ON transfers (to_user_id) "
+        "WHERE status = 'PENDING'" in sql
+    )
+    assert "DROP INDEX CONCURRENTLY ix_transfers_to_user_id_status" in sql
@@ -0,0 +1,95 @@
+"""Print sheets: streamed PDF and ZIP output, page count, and QR payloads matching the stored ones."""
+import asyncio
+import base64
+import io
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.settings import settings
+from app.utils.print_sheets import render_page, stream_sheets
+from app.utils.qr_generator import build_qr_payload, make_qr
+
+PER_PAGE, DPI = 2, 72
+
+
+@pytest.fixture(scope="module")
+def sheet_run(client, admin_headers, qr_modules):
+    """A concert of 5 tickets, with the payload each stored QR was checked to encode."""
+    concert = client.post(
+        "/api/concerts/",
+        json={"name": "Sheets", "date": "2026-07-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    client.post(f"/api/tickets/batch/create/{concert}", json={"quantity": 5}, headers=admin_headers)
+    tickets = []
+    for ticket in sorted(client.get(f"/api/tickets/concert/{concert}").json(), key=lambda t: t["id"]):
+        payload = build_qr_payload(ticket["id"], ticket["ticket_number"], concert)
+        expected = make_qr(payload).get_matrix()
+        stored = base64.b64decode(ticket["qr_code_data"])
+        assert qr_modules(stored, "png", len(expected)) == expected
+        tickets.append((ticket["ticket_number"], payload))
+    # Sheets hold the same payloads, so render the expected pages directly
+    pages = [
+        render_page("Sheets", tickets[start:start + PER_PAGE], PER_PAGE, DPI, "png")
+        for start in range(0, len(tickets), PER_PAGE)
+    ]
+    return concert, [np.array(Image.open(io.BytesIO(page)).convert("L")) for page in pages]
+
+
+def _get_sheets(client, admin_headers, concert, fmt):
+    response = client.get(
+        f"/api/tickets/concert/{concert}/print-sheets",
+        params={"format": fmt, "per_page": PER_PAGE, "dpi": DPI},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_pdf_sheets(client, admin_headers, sheet_run):
+    # Test-only dependency, not in requirements.txt
+    pypdf = pytest.importorskip("pypdf")
+    concert, expected = sheet_run
+    response = _get_sheets(client, admin_headers, concert, "pdf")
+    assert response.headers["content-type"] == "application/pdf"
+    reader = pypdf.PdfReader(io.BytesIO(response.content))
+    assert len(reader.pages) == len(expected) == 3
+    for page, pixels in zip(reader.pages, expected):
+        image, = page.images
+        assert (np.array(image.image.convert("L")) == pixels).all()
+
+
+def test_png_sheets_zip(client, admin_headers, sheet_run):
+    concert, expected = sheet_run
+    response = _get_sheets(client, admin_headers, concert, "png")
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["sheet_00001.png", "sheet_00002.png", "sheet_00003.png"]
+        for name, pixels in zip(archive.namelist(), expected):
+            assert (np.array(Image.open(io.BytesIO(archive.read(name))).convert("L")) == pixels).all()
+
+
+def test_sheets_stream_with_bounded_lookahead(monkeypatch):
+    monkeypatch.setattr(settings, "print_pages_in_flight", 2)
+    fetched = []
+
+    async def fetch_page(page_number):
+        fetched.append(page_number)
+        return [(f"T{page_number}", build_qr_payload(page_number, f"T{page_number}", 1))] if page_number < 6 else []
+
+    async def run():
+        chunks, fetched_at_first_page = [], None
+        async for chunk in stream_sheets(fetch_page, "Stream", "png", 1, DPI):
+            chunks.append(chunk)
+            if fetched_at_first_page is None and chunk:
+                fetched_at_first_page = len(fetched)
+        return chunks, fetched_at_first_page
+
+    chunks, fetched_at_first_page = asyncio.run(run())
+    # The first page went out after reading only the window (plus one refill), not the run
+    assert fetched_at_first_page <= 3
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert len(archive.namelist()) == 6
@@ -0,0 +1,75 @@
+"""QR variants (stored PNG, PNG at a scale, SVG, WebP, ZIP) all encode the ticket's payload."""
+import base64
+import io
+import zipfile
+
+import pytest
+
+from app.utils.qr_generator import build_qr_payload, make_qr, negotiate_qr_format
+
+
+@pytest.fixture(scope="module")
+def tickets(client, admin_headers):
+    concert = client.post(
+        "/api/concerts/",
+        json={"name": "Formats", "date": "2026-06-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    single = client.post(f"/api/tickets/create/{concert}", headers=admin_headers).json()
+    client.post(f"/api/tickets/batch/create/{concert}", json={"quantity": 2}, headers=admin_headers)
+    listed = client.get(f"/api/tickets/concert/{concert}").json()
+    assert single["id"] in {ticket["id"] for ticket in listed}
+    return concert, [(ticket["id"], ticket["ticket_number"]) for ticket in listed]
+
+
+def _expected(concert, ticket_id, number):
+    return make_qr(build_qr_payload(ticket_id, number, concert)).get_matrix()
+
+
+@pytest.mark.parametrize("params", [{}, {"format": "png", "scale": 3}, {"format": "svg"}, {"format": "webp"}])
+def test_every_variant_encodes_the_ticket_payload(client, tickets, qr_modules, params):
+    concert, rows = tickets
+    for ticket_id, number in rows:
+        expected = _expected(concert, ticket_id, number)
+        response = client.get(f"/api/tickets/{ticket_id}/download-qr", params=params)
+        assert response.status_code == 200, response.text
+        fmt = params.get("format", "png")
+        assert response.headers["content-type"].startswith(f"image/{'svg+xml' if fmt == 'svg' else fmt}")
+        assert qr_modules(response.content, fmt, len(expected)) == expected
+
+
+def test_stored_qr_and_zip_encode_the_ticket_payload(client, admin_headers, tickets, qr_modules):
+    concert, rows = tickets
+    for ticket_id, number in rows:
+        stored = client.get(f"/api/tickets/{ticket_id}/qr-code").json()["qr_code"]
+        expected = _expected(concert, ticket_id, number)
+        assert qr_modules(base64.b64decode(stored), "png", len(expected)) == expected
+
+    for fmt in ("png", "svg"):
+        response = client.get(
+            f"/api/tickets/concert/{concert}/qr-codes/download", params={"format": fmt}, headers=admin_headers
+        )
+        assert response.status_code == 200, response.text
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == sorted(f"QR_{number}.{fmt}" for _, number in rows)
+            for ticket_id, number in rows:
+                expected = _expected(concert, ticket_id, number)
+                assert qr_modules(archive.read(f"QR_{number}.{fmt}"), fmt, len(expected)) == expected
+
+
+def test_accept_negotiation(client, tickets):
+    _, rows = tickets
+    ticket_id = rows[0][0]
+    for accept, media_type in (
+        ("image/webp", "image/webp"),
+        ("image/svg+xml;q=0.9, image/webp;q=0.5", "image/svg+xml"),
+        ("*/*", "image/png"),
+        ("text/html", "image/png"),
+    ):
+        response = client.get(f"/api/tickets/{ticket_id}/download-qr", headers={"Accept": accept})
+        assert response.headers["content-type"] == media_type, accept
+    # The query parameter wins over the header; unknown formats are refused
+    response = client.get(f"/api/tickets/{ticket_id}/download-qr?format=svg", headers={"Accept": "image/webp"})
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert client.get(f"/api/tickets/{ticket_id}/download-qr?format=gif").status_code == 400
+    assert negotiate_qr_format("image/png;q=0, image/webp;q=bad, image/svg+xml;q=0.1") == "svg"
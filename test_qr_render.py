@@ -0,0 +1,87 @@
+"""QR rasterizing: the fast 1-bit renderer, and random QR-like patterns (bounds, batches, determinism)."""
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.utils import random_qr
+from app.utils.qr_generator import build_qr_payload, generate_qr_code, make_qr, render_qr_png
+
+
+def _pixels(image):
+    return np.array(image, dtype=bool)
+
+
+PAYLOADS = [build_qr_payload(i, number, 3) for i, number in ((1, "7QK2M9XD4"), (4242, "ABCDEFGH"), (10**6, "X" * 40))]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_fast_renderer_matches_pil_module_for_module(payload, qr_modules):
+    qr = make_qr(payload)
+    fast, pil = (Image.open(io.BytesIO(render_qr_png(qr, renderer))) for renderer in ("fast", "pil"))
+    assert fast.mode == "1" and fast.size == pil.size
+    assert (_pixels(fast) == _pixels(pil.convert("1"))).all()
+    expected = qr.get_matrix()
+    assert qr_modules(render_qr_png(qr, "fast"), "png", len(expected)) == expected
+
+
+def test_generate_qr_code_with_fast_renderer(qr_modules):
+    image, payload = generate_qr_code(7, "7QK2M9XD4", 3, renderer="fast")
+    assert payload == build_qr_payload(7, "7QK2M9XD4", 3)
+    expected = make_qr(payload).get_matrix()
+    assert qr_modules(base64.b64decode(image), "png", len(expected)) == expected
+    with pytest.raises(ValueError):
+        render_qr_png(make_qr(payload), "nope")
+
+
+@pytest.mark.parametrize("params", [
+    {"size": random_qr.MIN_SIZE - 1},
+    {"size": random_qr.MAX_SIZE + 1},
+    {"module_size": random_qr.MIN_MODULE_SIZE - 1},
+    {"module_size": random_qr.MAX_MODULE_SIZE + 1},
+    {"border": random_qr.MIN_BORDER - 1},
+    {"border": random_qr.MAX_BORDER + 1},
+    {"count": 0},
+    {"count": random_qr.MAX_BATCH + 1},
+])
+def test_batch_rejects_out_of_bounds_params(params):
+    with pytest.raises(ValueError):
+        random_qr.generate_random_qr_batch(**{"count": 1, **params})
+
+
+def test_batch_is_deterministic_for_a_seed():
+    def batch(seed):
+        images = random_qr.generate_random_qr_batch(4, size=25, module_size=3, border=2,
+                                                    rng=np.random.default_rng(seed))
+        return [_pixels(image) for image in images]
+
+    first, again, other = batch(7), batch(7), batch(8)
+    assert all((a == b).all() for a, b in zip(first, again))
+    assert any((a != b).any() for a, b in zip(first, other))
+    # Frames within one batch are independent draws
+    assert (first[0] != first[1]).any()
+
+
+def test_batch_images_have_finders_and_quiet_zone():
+    size, module_size, border = 21, 2, 3
+    images = random_qr.generate_random_qr_batch(3, size, module_size, border, rng=np.random.default_rng(1))
+    finder = random_qr._finder()
+    for image in images:
+        assert image.mode == "1" and image.size == ((size + 2 * border) * module_size,) * 2
+        black = ~_pixels(image)
+        modules = black[::module_size, ::module_size]
+        assert not modules[:border].any() and not modules[:, :border].any()
+        assert not modules[-border:].any() and not modules[:, -border:].any()
+        inner = modules[border:-border, border:-border]
+        for corner in (inner[:7, :7], inner[:7, -7:], inner[-7:, :7]):
+            assert (corner == finder).all()
+
+    pngs = random_qr.get_png_bytes_batch(2, size, module_size, border)
+    assert [Image.open(io.BytesIO(png)).size for png in pngs] == [images[0].size] * 2
+
+
+def test_dev_endpoint_enforces_bounds(client):
+    assert client.get("/api/tickets/dev/random-qr", params={"size": 21, "module_size": 2}).status_code == 200
+    assert client.get("/api/tickets/dev/random-qr", params={"size": random_qr.MAX_SIZE + 1}).status_code == 422
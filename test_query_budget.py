@@ -0,0 +1,73 @@
+"""Per-endpoint SQL query budgets; a new N+1 or extra round trip fails here."""
+import pytest
+
+from app.utils.metrics import RequestStats
+from app.utils.query_budget import (
+    QueryBudgetExceeded,
+    assert_query_budget,
+    repeated_statements,
+)
+
+
+@pytest.fixture
+def ticket_id(client, ticket_numbers):
+    return client.get(f"/api/tickets/number/{ticket_numbers[0]}").json()["id"]
+
+
+def test_repeated_statements_flags_n_plus_one():
+    stats = RequestStats("GET", "/x")
+    for _ in range(3):
+        stats.record("SELECT * FROM scans WHERE ticket_id = ?", 0.001)
+    stats.record("SELECT * FROM tickets WHERE id = ?", 0.001)
+    assert repeated_statements(stats, threshold=3) == [("SELECT * FROM scans WHERE ticket_id = ?", 3)]
+
+
+def test_budget_violation_raises(client, ticket_numbers):
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_query_budget(0):
+            client.get(f"/api/tickets/number/{ticket_numbers[0]}")
+
+
+def test_get_concert_budget(client, concert_id):
+    with assert_query_budget(1):
+        assert client.get(f"/api/concerts/{concert_id}").status_code == 200
+
+
+def test_ticket_lookup_by_number_budget(client, ticket_numbers):
+    with assert_query_budget(1):
+        assert client.get(f"/api/tickets/number/{ticket_numbers[0]}").status_code == 200
+
+
+def test_get_ticket_scans_budget(client, ticket_id):
+    with assert_query_budget(2):
+        assert client.get(f"/api/scans/ticket/{ticket_id}").status_code == 200
+
+
+def test_attendance_budget(client, concert_id):
+    with assert_query_budget(2):
+        assert client.get(f"/api/scans/concert/{concert_id}/attendance").status_code == 200
+
+
+def test_create_scan_budget(client, sales_headers, ticket_id):
+    # user, ticket, scan insert, ticket update, inventory counters, timeline rollup
+    # upsert, change log insert (both events in one statement)
+    with assert_query_budget(7):
+        response = client.post(
+            "/api/scans/",
+            json={"ticket_id": ticket_id, "scan_type": "sale_confirmation"},
+            headers=sales_headers,
+        )
+        assert response.status_code == 200, response.text
+
+
+def test_pending_transfers_budget(client, admin_headers):
+    with assert_query_budget(2):
+        assert client.get("/api/transfers/pending", headers=admin_headers).status_code == 200
+
+
+def test_zip_download_budget(client, admin_headers, concert_id, ticket_numbers):
+    with assert_query_budget(3):
+        response = client.get(
+            f"/api/tickets/concert/{concert_id}/qr-codes/download", headers=admin_headers
+        )
+        assert response.status_code == 200
@@ -0,0 +1,88 @@
+"""Token-bucket rate limits per caller and route group, and load shedding on pool pressure."""
+import pytest
+
+from app.settings import settings
+from app.utils import rate_limit
+from app.utils.metrics import DecayingAverage, db_pool_checkout_seconds
+from app.utils.rate_limit import TokenBucket, limiter, rate_limit_rejections_total
+from app.utils.read_routing import client_address
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    limiter.reset()
+    yield lambda **groups: monkeypatch.setattr(settings, "rate_limits", groups)
+    limiter.reset()
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2, now=0)
+    assert bucket.take(0) == bucket.take(0) == 0
+    assert bucket.take(0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+
+def test_login_is_limited_per_address(client, limits):
+    limits(login=(60, 2))
+    before = rate_limit_rejections_total.value(group="login", reason="rate")
+    credentials = {"username": "admin", "password": "wrong"}
+    assert client.post("/api/auth/login", json=credentials).status_code == 401
+    assert client.post("/api/auth/login", json=credentials).status_code == 401
+    response = client.post("/api/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert rate_limit_rejections_total.value(group="login", reason="rate") == before + 1
+
+
+def test_users_share_an_address_bucket(client, limits, monkeypatch, admin_headers, sales_headers, verify_headers):
+    limits(listing=(60, 1))
+    monkeypatch.setattr(settings, "rate_limit_ip_multiplier", 2)
+    assert client.get("/api/concerts/", headers=admin_headers).status_code == 200
+    assert client.get("/api/concerts/", headers=admin_headers).status_code == 429
+    assert client.get("/api/concerts/", headers=sales_headers).status_code == 200
+    # Own bucket is full, but the address has used its 2 tokens
+    assert client.get("/api/concerts/", headers=verify_headers).status_code == 429
+    # Routes outside the limited groups are never refused
+    assert client.get("/health", headers=verify_headers).status_code == 200
+
+
+def test_sheds_heavy_groups_when_pool_checkout_is_slow(client, limits, monkeypatch, sales_headers):
+    limits()
+    assert db_pool_checkout_seconds.count() > 0
+    slow = DecayingAverage()
+    for _ in range(20):
+        slow.observe(2.0)
+    monkeypatch.setattr(rate_limit, "pool_checkout_wait", slow)
+    before = rate_limit_rejections_total.value(group="listing", reason="overload")
+
+    response = client.get("/api/concerts/")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 2
+    assert rate_limit_rejections_total.value(group="listing", reason="overload") == before + 1
+    # Scans are not in admission_shed_groups
+    response = client.post("/api/scans/", json={"ticket_id": 999999, "scan_type": "sale_confirmation"}, headers=sales_headers)
+    assert response.status_code == 404
+
+    monkeypatch.setattr(rate_limit, "pool_checkout_wait", DecayingAverage())
+    assert client.get("/api/concerts/").status_code == 200
+
+
+def test_anonymous_callers_behind_a_proxy_get_their_own_bucket(client, limits, monkeypatch):
+    limits(login=(60, 1))
+    monkeypatch.setattr(settings, "trusted_proxy_hops", 1)
+    credentials = {"username": "admin", "password": "wrong"}
+
+    def login(forwarded_for):
+        return client.post("/api/auth/login", json=credentials, headers={"X-Forwarded-For": forwarded_for})
+
+    assert login("198.51.100.1").status_code == 401
+    assert login("198.51.100.1").status_code == 429
+    assert login("198.51.100.2").status_code == 401
+    # Entries before the trusted hop are client-supplied and cannot pick a fresh bucket
+    assert login("203.0.113.9, 198.51.100.2").status_code == 429
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies():
+    scope = {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", b"198.51.100.1")]}
+    assert client_address(scope) == "10.0.0.1"
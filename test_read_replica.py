@@ -0,0 +1,68 @@
+"""Read-replica routing: heavy GETs read the replica unless the caller just wrote."""
+import os
+import shutil
+
+import pytest
+
+from app import database
+from app.settings import settings
+from app.utils.read_routing import db_read_routing_total, recent_writers
+
+
+@pytest.fixture
+def replica(client, monkeypatch, tmp_path):
+    """Point the read session at a snapshot of the primary (a replica frozen in time)."""
+    def snapshot():
+        primary_path = settings.database_url.split("///", 1)[1]
+        replica_path = os.path.join(tmp_path, "replica.db")
+        shutil.copyfile(primary_path, replica_path)
+        url = f"sqlite+aiosqlite:///{replica_path}"
+        monkeypatch.setattr(settings, "read_database_url", url)
+        monkeypatch.setattr(database, "read_session", database.create_read_session(url))
+    recent_writers.invalidate()
+    yield snapshot
+    recent_writers.invalidate()
+
+
+def _ticket_count(client, concert_id, headers=None):
+    response = client.get(f"/api/tickets/concert/{concert_id}", headers=headers)
+    assert response.status_code == 200
+    return len(response.json())
+
+
+def test_reads_go_to_replica_except_after_own_write(client, admin_headers, replica):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Replica", "date": "2026-07-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    client.post(f"/api/tickets/batch/create/{concert_id}", json={"quantity": 2}, headers=admin_headers)
+    replica()
+
+    # Written to the primary only; the replica still has 2 tickets
+    client.post(f"/api/tickets/batch/create/{concert_id}", json={"quantity": 3}, headers=admin_headers)
+
+    before = db_read_routing_total.value(target="replica")
+    assert _ticket_count(client, concert_id) == 2
+    assert db_read_routing_total.value(target="replica") == before + 1
+
+    # The writer reads its own write from the primary...
+    assert _ticket_count(client, concert_id, admin_headers) == 5
+    # ...until the read-your-writes window is over
+    recent_writers.invalidate()
+    assert _ticket_count(client, concert_id, admin_headers) == 2
+
+
+def test_failed_writes_do_not_pin(client, admin_headers, replica, concert_id):
+    replica()
+    assert client.post("/api/tickets/batch/create/999999", json={"quantity": 1}, headers=admin_headers).status_code == 404
+    before = db_read_routing_total.value(target="replica")
+    _ticket_count(client, concert_id, admin_headers)
+    assert db_read_routing_total.value(target="replica") == before + 1
+
+
+def test_without_replica_reads_use_primary(client, concert_id):
+    assert database.read_session is None
+    before = db_read_routing_total.value(target="primary")
+    _ticket_count(client, concert_id)
+    assert db_read_routing_total.value(target="primary") == before + 1
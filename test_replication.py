@@ -0,0 +1,121 @@
+"""Edge -> central replication: idempotent batches and deterministic conflicts."""
+import asyncio
+import itertools
+from datetime import datetime
+
+import httpx
+from sqlalchemy.future import select
+
+from app.database import async_session
+from app.models.ticket import Ticket
+from app.settings import settings
+from app.utils.replication import push, state_key
+
+T0, T1, T2 = (datetime(2026, 5, 1, 20, minute).isoformat() for minute in (0, 5, 10))
+
+
+def _tickets(client, admin_headers, quantity):
+    concert = client.post(
+        "/api/concerts/",
+        json={"name": "Sync Concert", "date": "2026-05-01T20:00:00", "venue": "Edge Arena"},
+        headers=admin_headers,
+    ).json()["id"]
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert}", json={"quantity": quantity}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    return concert, numbers
+
+
+def _ticket(number):
+    async def load():
+        async with async_session() as db:
+            return (await db.execute(select(Ticket).filter(Ticket.ticket_number == number))).scalars().first()
+    return asyncio.run(load())
+
+
+def _scan(event_id, number, at, by):
+    return {"id": event_id, "type": "scan.created", "payload": {
+        "ticket_number": number, "scan_type": "attendance_verify", "scanned_at": at, "scanned_by": by,
+        "location": "Gate A", "notes": None,
+    }}
+
+
+def _verified(event_id, number, at, by):
+    return {"id": event_id, "type": "ticket.status_changed", "payload": {
+        "ticket_number": number, "from": "created", "to": "verified", "at": at, "by": by,
+    }}
+
+
+def test_state_order_is_total_and_prefers_first_verification():
+    states = [
+        ("created", datetime(2026, 5, 1, 20, 9), None),
+        ("sold_confirmed", datetime(2026, 5, 1, 20, 8), None),
+        ("verified", datetime(2026, 5, 1, 20, 5), 2),
+        ("verified", datetime(2026, 5, 1, 20, 5), 1),
+        ("verified", datetime(2026, 5, 1, 20, 7), 1),
+    ]
+    winners = {max(order, key=lambda state: state_key(*state)) for order in itertools.permutations(states)}
+    assert winners == {("verified", datetime(2026, 5, 1, 20, 5), 1)}
+
+
+def test_batches_are_idempotent_and_conflicts_deterministic(client, admin_headers):
+    concert, numbers = _tickets(client, admin_headers, 2)
+    batch = {"node": "venue-a", "events": [
+        _scan(1, numbers[0], T1, "verify1"),
+        _verified(2, numbers[0], T1, "verify1"),
+        {"id": 3, "type": "ticket.status_changed", "payload": {
+            "ticket_number": numbers[1], "from": "created", "to": "sold_confirmed", "at": T1, "by": "sales1",
+        }},
+        _scan(4, "NO-SUCH-TICKET", T1, "verify1"),
+    ]}
+    response = client.post("/api/sync/changes", json=batch, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"node": "venue-a", "watermark": 4, "applied": 3, "skipped": 1, "duplicate": 0}
+
+    # A retried push changes nothing
+    response = client.post("/api/sync/changes", json=batch, headers=admin_headers)
+    assert response.json() == {"node": "venue-a", "watermark": 4, "applied": 0, "skipped": 0, "duplicate": 4}
+    ticket = _ticket(numbers[0])
+    assert ticket.status.value == "verified"
+    assert len(client.get(f"/api/scans/ticket/{ticket.id}").json()) == 1
+    assert client.get("/api/sync/watermark/venue-a", headers=admin_headers).json()["watermark"] == 4
+
+    # Another gate let the holder in earlier: its verification wins; a later one loses
+    for node, at, by in (("venue-b", T0, "sales1"), ("venue-c", T2, "admin")):
+        response = client.post(
+            "/api/sync/changes",
+            json={"node": node, "events": [_scan(1, numbers[0], at, by), _verified(2, numbers[0], at, by)]},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200, response.text
+    ticket = _ticket(numbers[0])
+    assert ticket.verified_at.isoformat() == T0
+    assert len(client.get(f"/api/scans/ticket/{ticket.id}").json()) == 3
+
+    inventory = client.get(f"/api/concerts/{concert}/inventory").json()
+    assert (inventory["verified"], inventory["sold_confirmed"]) == (1, 1)
+    assert client.post(
+        "/api/sync/changes", json={"node": settings.node_name, "events": []}, headers=admin_headers
+    ).status_code == 400
+
+
+def test_push_sends_pending_events_once(client, monkeypatch, admin_headers, verify_headers):
+    from main import app
+
+    _, numbers = _tickets(client, admin_headers, 2)
+    monkeypatch.setattr(settings, "node_name", "venue-push")
+    for number in numbers:
+        ticket_id = client.get(f"/api/tickets/number/{number}").json()["id"]
+        response = client.post(
+            "/api/scans/", json={"ticket_id": ticket_id, "scan_type": "sale_confirmation"}, headers=verify_headers
+        )
+        assert response.status_code == 200, response.text
+    monkeypatch.setattr(settings, "node_name", "central")
+
+    async def sync():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=admin_headers) as http:
+            return await push(http, batch_size=3, node="venue-push"), await push(http, node="venue-push")
+
+    # Two scans, each with a status change; nothing left on the second run
+    assert asyncio.run(sync()) == (4, 0)
@@ -0,0 +1,119 @@
+"""Entry-rate timeline: the per-minute rollup follows scans and matches a rebuild from raw scans."""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import text, update
+
+from app.database import async_session
+from app.models.scan import Scan
+from app.models.scan_rollup import ScanMinuteCount
+from app.utils.scan_rollup import epoch_minute, rebuild_scan_rollup
+from sqlalchemy.future import select
+
+
+def _concert_with_tickets(client, admin_headers, quantity):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Timeline", "date": "2026-05-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": quantity}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    ids = [client.get(f"/api/tickets/number/{number}").json()["id"] for number in numbers]
+    return concert_id, ids
+
+
+async def _rollup(concert_id):
+    async with async_session() as db:
+        rows = await db.execute(
+            select(ScanMinuteCount.minute, ScanMinuteCount.location, ScanMinuteCount.scan_type, ScanMinuteCount.count)
+            .filter(ScanMinuteCount.concert_id == concert_id)
+            .order_by(ScanMinuteCount.minute, ScanMinuteCount.location)
+        )
+        return [tuple(row) for row in rows]
+
+
+def test_timeline_buckets_scans_by_location(client, admin_headers, sales_headers):
+    concert_id, ids = _concert_with_tickets(client, admin_headers, 5)
+    for ticket_id, location in zip(ids, ["Gate A", "Gate A", "Gate B", None, "Gate B"]):
+        response = client.post(
+            "/api/scans/",
+            json={"ticket_id": ticket_id, "scan_type": "sale_confirmation", "location": location},
+            headers=sales_headers,
+        )
+        assert response.status_code == 200, response.text
+
+    # Spread the scans over known minutes, then rebuild the rollup from them
+    base = datetime(2026, 5, 1, 19, 0)
+    async def spread():
+        async with async_session() as db:
+            for offset, ticket_id in enumerate(ids):
+                await db.execute(
+                    update(Scan).where(Scan.ticket_id == ticket_id).values(scanned_at=base + timedelta(minutes=offset * 4))
+                )
+            await db.commit()
+            await rebuild_scan_rollup(db, [concert_id])
+    asyncio.run(spread())
+
+    response = client.get(f"/api/scans/concert/{concert_id}/timeline?bucket=5m&by=location")
+    assert response.status_code == 200
+    points = [(p["start"], p["key"], p["count"]) for p in response.json()["points"]]
+    assert points == [
+        ("2026-05-01T19:00:00", "Gate A", 2),
+        ("2026-05-01T19:05:00", "Gate B", 1),
+        ("2026-05-01T19:10:00", None, 1),
+        ("2026-05-01T19:15:00", "Gate B", 1),
+    ]
+
+    response = client.get(
+        f"/api/scans/concert/{concert_id}/timeline?bucket=1h&start=2026-05-01T19:05:00&end=2026-05-01T19:15:00"
+    )
+    assert [(p["start"], p["count"]) for p in response.json()["points"]] == [("2026-05-01T19:00:00", 2)]
+
+    # Aware bounds are converted to UTC
+    for start, end in [("2026-05-01T19:05:00Z", "2026-05-01T19:15:00Z"),
+                       ("2026-05-01T21:05:00%2B02:00", "2026-05-01T21:15:00%2B02:00")]:
+        response = client.get(f"/api/scans/concert/{concert_id}/timeline?bucket=1h&start={start}&end={end}")
+        assert response.status_code == 200, response.text
+        assert [(p["start"], p["count"]) for p in response.json()["points"]] == [("2026-05-01T19:00:00", 2)]
+
+
+def test_rollup_is_maintained_incrementally(client, admin_headers, sales_headers):
+    concert_id, ids = _concert_with_tickets(client, admin_headers, 3)
+    before = epoch_minute(datetime.utcnow())
+    for ticket_id in ids:
+        client.post(
+            "/api/scans/",
+            json={"ticket_id": ticket_id, "scan_type": "sale_confirmation", "location": "North"},
+            headers=sales_headers,
+        )
+    incremental = asyncio.run(_rollup(concert_id))
+    assert sum(row[3] for row in incremental) == 3
+    assert all(row[0] >= before and row[1:3] == ("North", "sale_confirmation") for row in incremental)
+
+    async def rebuild():
+        async with async_session() as db:
+            await rebuild_scan_rollup(db, [concert_id])
+    asyncio.run(rebuild())
+    assert asyncio.run(_rollup(concert_id)) == incremental
+
+
+def test_timeline_rejects_bad_parameters(client, concert_id):
+    assert client.get(f"/api/scans/concert/{concert_id}/timeline?bucket=7m").status_code == 400
+    assert client.get(f"/api/scans/concert/{concert_id}/timeline?by=user").status_code == 400
+    assert client.get("/api/scans/concert/999999/timeline").status_code == 404
+
+
+def test_deleting_a_concert_removes_its_rollup(client, admin_headers, sales_headers):
+    concert_id, ids = _concert_with_tickets(client, admin_headers, 1)
+    client.post("/api/scans/", json={"ticket_id": ids[0], "scan_type": "sale_confirmation"}, headers=sales_headers)
+    assert asyncio.run(_rollup(concert_id))
+
+    assert client.delete(f"/api/concerts/{concert_id}", headers=admin_headers).status_code == 200
+    assert asyncio.run(_rollup(concert_id)) == []
+
+    async def orphans():
+        async with async_session() as db:
+            return (await db.execute(text("PRAGMA foreign_key_check(scan_minute_counts)"))).all()
+    assert asyncio.run(orphans()) == []
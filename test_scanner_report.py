@@ -0,0 +1,100 @@
+"""Scanner throughput report: windows, gaps, duplicates and rejects per operator."""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text, update
+from sqlalchemy.future import select
+
+from app.database import async_session
+from app.models.scan import Scan, ScanRejection
+from app.utils.scanner_report import scanner_report_cache
+
+
+def _scan(client, headers, ticket_id):
+    return client.post(
+        "/api/scans/", json={"ticket_id": ticket_id, "scan_type": "sale_confirmation"}, headers=headers
+    )
+
+
+def test_scanner_report(client, admin_headers, sales_headers, verify_headers):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Gates", "date": "2026-06-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    numbers = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 4}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    ids = [client.get(f"/api/tickets/number/{number}").json()["id"] for number in numbers]
+
+    sales_scans = [_scan(client, sales_headers, ticket_id).json()["id"] for ticket_id in (ids[0], ids[1], ids[2], ids[0])]
+    assert _scan(client, verify_headers, ids[3]).status_code == 200
+    assert _scan(client, verify_headers, ids[3]).status_code == 400
+
+    base = datetime(2026, 6, 1, 19, 0)
+    offsets = (0, 30, 60, 20 * 60)
+
+    async def place_scans():
+        async with async_session() as db:
+            for scan_id, offset in zip(sales_scans, offsets):
+                await db.execute(
+                    update(Scan).where(Scan.id == scan_id).values(scanned_at=base + timedelta(seconds=offset))
+                )
+            await db.commit()
+    asyncio.run(place_scans())
+    scanner_report_cache.invalidate()
+
+    response = client.get(f"/api/scans/concert/{concert_id}/scanners", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    scanners = {scanner["username"]: scanner for scanner in response.json()["scanners"]}
+
+    sales = scanners["sales1"]
+    assert (sales["scans"], sales["duplicates"], sales["rejected"]) == (4, 1, 0)
+    assert sales["duplicate_rate"] == 0.25
+    assert [(w["start"], w["end"], w["scans"]) for w in sales["windows"]] == [
+        ("2026-06-01T19:00:00", "2026-06-01T19:01:00", 3),
+        ("2026-06-01T19:20:00", "2026-06-01T19:20:00", 1),
+    ]
+    assert (sales["mean_gap_seconds"], sales["max_gap_seconds"], sales["active_seconds"]) == (30, 30, 60)
+    assert sales["scans_per_minute"] == 2.0
+
+    verify = scanners["verify1"]
+    assert (verify["scans"], verify["rejected"], verify["reject_rate"]) == (1, 1, 0.5)
+
+    # Served from the per-concert cache until the TTL runs out
+    _scan(client, sales_headers, ids[1])
+    cached = client.get(f"/api/scans/concert/{concert_id}/scanners", headers=admin_headers).json()
+    assert {s["username"]: s["scans"] for s in cached["scanners"]}["sales1"] == 4
+
+
+def test_scanner_report_requires_admin(client, sales_headers, concert_id):
+    assert client.get(f"/api/scans/concert/{concert_id}/scanners", headers=sales_headers).status_code == 403
+
+
+def test_deleting_a_concert_removes_its_rejections(client, admin_headers, verify_headers):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Rejected", "date": "2026-06-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    number = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 1}, headers=admin_headers
+    ).json()["ticket_numbers"][0]
+    ticket_id = client.get(f"/api/tickets/number/{number}").json()["id"]
+    assert _scan(client, verify_headers, ticket_id).status_code == 200
+    assert _scan(client, verify_headers, ticket_id).status_code == 400
+
+    async def rejections():
+        async with async_session() as db:
+            return await db.scalar(
+                select(func.count()).select_from(ScanRejection).filter(ScanRejection.concert_id == concert_id)
+            )
+    assert asyncio.run(rejections()) == 1
+
+    assert client.delete(f"/api/concerts/{concert_id}", headers=admin_headers).status_code == 200
+    assert asyncio.run(rejections()) == 0
+
+    async def orphans():
+        async with async_session() as db:
+            return (await db.execute(text("PRAGMA foreign_key_check(scan_rejections)"))).all()
+    assert asyncio.run(orphans()) == []
@@ -0,0 +1,77 @@
+"""Single-flight: concurrent identical GETs share one handler call."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils.single_flight import SingleFlight, single_flight_requests_total
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return {"value": 42}
+
+        waiters = [asyncio.create_task(flight.do("k", compute, label="t1")) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        assert len(calls) == 1 and all(result == {"value": 42} for result in results)
+        assert single_flight_requests_total.value(handler="t1", result="coalesced") == 4
+
+        # Nothing in flight and no ttl: the next call runs again
+        await flight.do("k", compute, label="t1")
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_ttl_reuses_results_but_not_errors():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("k", compute, ttl=60, label="t2") == 1
+        assert await flight.do("k", compute, ttl=60, label="t2") == 1
+        assert single_flight_requests_total.value(handler="t2", result="cached") == 1
+
+        async def fail():
+            raise ValueError("boom")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await flight.do("e", fail, ttl=60, label="t2")
+        assert single_flight_requests_total.value(handler="t2", result="leader") == 3
+
+    asyncio.run(scenario())
+
+
+def test_dashboard_burst_on_attendance_is_coalesced(client, concert_id):
+    from main import app
+
+    labels = {"handler": "get_concert_attendance"}
+    before = {result: single_flight_requests_total.value(result=result, **labels) for result in ("leader", "coalesced")}
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.get(f"/api/scans/concert/{concert_id}/attendance") for _ in range(20)
+            ))
+
+    responses = asyncio.run(burst())
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.text for response in responses}) == 1
+    leaders = single_flight_requests_total.value(result="leader", **labels) - before["leader"]
+    coalesced = single_flight_requests_total.value(result="coalesced", **labels) - before["coalesced"]
+    assert leaders + coalesced == 20 and leaders < 20
@@ -0,0 +1,86 @@
+"""Sequence ticket numbers: unique by construction, short, with a working check symbol."""
+import asyncio
+
+import pytest
+
+from app.utils.qr_generator import build_qr_payload, make_qr
+from app.utils.ticket_numbers import (
+    CROCKFORD_ALPHABET,
+    InvalidTicketNumber,
+    SequenceTicketNumbers,
+    UuidTicketNumbers,
+)
+
+generator = SequenceTicketNumbers(b"test-key")
+
+
+def test_codes_are_unique_and_round_trip():
+    codes = {generator.format(concert_id, sequence) for concert_id in (1, 2, 70000) for sequence in range(5000)}
+    assert len(codes) == 15000
+    assert generator.parse(generator.format(42, 1234)) == (42, 1234)
+    assert generator.parse(generator.format(70000, 7)) == (70000, 7)
+
+
+def test_codes_are_short_and_non_sequential():
+    first, second = generator.format(1, 0), generator.format(1, 1)
+    assert len(first) == 9 and len(generator.format(70000, 0)) == 11
+    assert first[:4] != second[:4]
+    # Check symbol included: codes go into file names and headers unquoted
+    assert all(char in CROCKFORD_ALPHABET for n in range(2000) for char in generator.format(1, n))
+    legacy, = asyncio.run(UuidTicketNumbers().allocate(None, 1))
+    payload = build_qr_payload(1, first, 1)
+    assert len(payload) < len(build_qr_payload(1, legacy, 1))
+    assert make_qr(payload).version <= 4
+
+
+def test_check_symbol_catches_typos_and_normalizes_lookalikes():
+    code = generator.format(3, 99)
+    for index in range(len(code) - 1):
+        replacement = "0" if code[index] != "0" else "1"
+        with pytest.raises(InvalidTicketNumber):
+            generator.parse(code[:index] + replacement + code[index + 1:])
+    for i in range(len(code)):
+        for j in range(i + 1, len(code)):
+            if code[i] != code[j]:
+                swapped = list(code)
+                swapped[i], swapped[j] = code[j], code[i]
+                with pytest.raises(InvalidTicketNumber):
+                    generator.parse("".join(swapped))
+    lowered = code[:4].lower() + "-" + code[4:]
+    assert generator.parse(lowered.replace("0", "o").replace("1", "l")) == (3, 99)
+
+
+def test_batches_get_disjoint_sequence_numbers(client, admin_headers):
+    concert_id = client.post(
+        "/api/concerts/",
+        json={"name": "Numbers", "date": "2026-04-01T20:00:00", "venue": "Test Venue"},
+        headers=admin_headers,
+    ).json()["id"]
+    batch = client.post(
+        f"/api/tickets/batch/create/{concert_id}", json={"quantity": 50}, headers=admin_headers
+    ).json()["ticket_numbers"]
+    single = client.post(f"/api/tickets/create/{concert_id}", headers=admin_headers).json()["ticket_number"]
+
+    from app.utils.ticket_numbers import get_ticket_number_generator
+
+    sequence = get_ticket_number_generator("sequence")
+    parsed = [sequence.parse(number) for number in batch + [single]]
+    assert parsed == [(concert_id, n) for n in range(51)]
+    assert client.get(f"/api/tickets/number/{single}").status_code == 200
+
+
+def test_lookup_normalizes_typed_numbers_and_rejects_typos(client, admin_headers, concert_id, monkeypatch):
+    from app.settings import settings
+
+    number = client.post(f"/api/tickets/create/{concert_id}", headers=admin_headers).json()["ticket_number"]
+    typed = (number[:4] + "-" + number[4:]).lower().replace("0", "o").replace("1", "l")
+    assert client.get(f"/api/tickets/number/{typed}").json()["ticket_number"] == number
+    typo = number[:2] + ("0" if number[2] != "0" else "1") + number[3:]
+    response = client.get(f"/api/tickets/number/{typo}")
+    assert response.status_code == 400 and "check symbol" in response.json()["detail"]
+
+    # Numbers issued by the legacy generator still resolve
+    monkeypatch.setattr(settings, "ticket_number_generator", "uuid")
+    legacy = client.post(f"/api/tickets/create/{concert_id}", headers=admin_headers).json()["ticket_number"]
+    monkeypatch.setattr(settings, "ticket_number_generator", "sequence")
+    assert client.get(f"/api/tickets/number/{legacy.lower()}").json()["ticket_number"] == legacy